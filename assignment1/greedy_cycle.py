@@ -11,28 +11,15 @@ def greedy_cycle_solve(tsp: TSP, starting_node: int = None) -> SolutionTSP:
     chosen_nodes = [starting_node]
     remaining_nodes = tsp.get_nodes(without_nodes=chosen_nodes)
 
-    # todo - into TSP? (pass remaining nodes?)
-    # note - could be done better by avoiding unnecessary calculations - only need to update
-    # actually touching the currently removed node(?)
-    def get_smallest_move_cost_node_between(start_node: int, end_node: int):
-        remaining_nodes_move_costs_between = [
-            tsp.insertion_costs[start_node][end_node][inserted_node]
-            for inserted_node in remaining_nodes
-        ]
-        smallest_move_cost = min(remaining_nodes_move_costs_between)
-        # first occurrence in case of tie
-        smallest_move_cost_node_idx = remaining_nodes_move_costs_between.index(smallest_move_cost)
-
-        return remaining_nodes[smallest_move_cost_node_idx], smallest_move_cost
-
     required_number_of_nodes = tsp.get_required_number_of_nodes_in_solution()
     while len(chosen_nodes) < required_number_of_nodes and remaining_nodes:
-        best_choices_between = [
-            ((start, end), get_smallest_move_cost_node_between(start, end))
-            for start, end in pairwise(chosen_nodes + [chosen_nodes[0]])  # also pairwise between start and end
-        ]
-
-        (_, end), (next_node, _) = min(best_choices_between, key=lambda x: x[1][1])
+        # [edge_idx][remaining_node_idx], edges also pairwise between start and end
+        insertion_costs = tsp.insertion_costs.for_edges(list(pairwise(chosen_nodes + [chosen_nodes[0]])),
+                                                        remaining_nodes)
+        # first occurrence in case of tie - first edge, then first node
+        best_edge_idx, next_node_idx = divmod(int(insertion_costs.argmin()), len(remaining_nodes))
+        end = chosen_nodes[(best_edge_idx + 1) % len(chosen_nodes)]
+        next_node = remaining_nodes[next_node_idx]
         chosen_nodes.insert(chosen_nodes.index(end), next_node)
         remaining_nodes.remove(next_node)
 
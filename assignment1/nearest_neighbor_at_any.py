@@ -36,29 +36,21 @@ def nearest_neighbor_at_any_solve(
 
         return remaining_nodes[smallest_move_cost_node_idx], smallest_move_cost
 
-    # todo - into TSP? (pass remaining nodes?)
-    # note - could be done better by avoiding unnecessary calculations - only need to update
-    # actually touching the currently removed node(?)
-    def get_smallest_move_cost_node_between(start_node: int, end_node: int):
-        remaining_nodes_move_costs_between = [
-            tsp.insertion_costs[start_node][end_node][inserted_node]
-            for inserted_node in remaining_nodes
-        ]
-        smallest_move_cost = min(remaining_nodes_move_costs_between)
-        # first occurrence in case of tie
-        smallest_move_cost_node_idx = remaining_nodes_move_costs_between.index(smallest_move_cost)
+    def get_smallest_move_cost_edge_and_node_between(edges: list[tuple[int, int]]):
+        # [edge_idx][remaining_node_idx]
+        insertion_costs = tsp.insertion_costs.for_edges(edges, remaining_nodes)
+        # first occurrence in case of tie - first edge, then first node
+        best_edge_idx, smallest_move_cost_node_idx = divmod(int(insertion_costs.argmin()), len(remaining_nodes))
 
-        return remaining_nodes[smallest_move_cost_node_idx], smallest_move_cost
+        return edges[best_edge_idx], (remaining_nodes[smallest_move_cost_node_idx],
+                                      insertion_costs[best_edge_idx, smallest_move_cost_node_idx])
 
     required_number_of_nodes = tsp.get_required_number_of_nodes_in_solution() if desired_number_of_nodes is None else desired_number_of_nodes
     while len(chosen_nodes) < required_number_of_nodes and remaining_nodes:
         best_from_start = (0, get_smallest_move_cost_node_directly_from(chosen_nodes[0]))
         best_from_end = (-1, get_smallest_move_cost_node_directly_from(chosen_nodes[-1]))
-        best_choices_between = [
-            ((start, end), get_smallest_move_cost_node_between(start, end))
-            for start, end in pairwise(chosen_nodes)
-            if (start, end) not in except_edges
-        ]
+        edges_between = [(start, end) for start, end in pairwise(chosen_nodes) if (start, end) not in except_edges]
+        best_choices_between = [get_smallest_move_cost_edge_and_node_between(edges_between)] if edges_between else []
 
         best_place, (next_node, _) = min([best_from_start, best_from_end] + best_choices_between, key=lambda x: x[1][1])
         if best_place == 0:
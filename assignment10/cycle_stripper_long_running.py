@@ -37,15 +37,9 @@ def cycle_stripper_long_running_solve(
         nodes = solution.nodes
 
         def remove_worst_node(nodes: list[int]) -> list[int]:
-            nodes_with_neighbors = [nodes[-1]] + nodes + [nodes[0]]
-            worst_node, worst_node_change = -1, INF
-            options = dict()
-            for i in range(1, len(nodes_with_neighbors)-1):
-                start, removed, end = nodes_with_neighbors[i-1], nodes_with_neighbors[i], nodes_with_neighbors[i+1]
-                node_removal_change = tsp.removal_changes[start][end][removed]
-                options[removed] = int(node_removal_change)
-                if node_removal_change < worst_node_change:
-                    worst_node, worst_node_change = removed, node_removal_change
+            # change of objective after removing each node from between its neighbors
+            nodes_removal_changes = tsp.removal_changes.for_cycle(nodes)
+            worst_node = nodes[nodes_removal_changes.argmin()]  # first occurrence in case of tie
             nodes.remove(worst_node)
 
             return nodes
@@ -1,6 +1,7 @@
 from data_loader import TSP, SolutionTSP
 from itertools import pairwise, groupby, permutations, product
 from time import time
+import numpy as np
 
 from assignment1.nearest_neighbor_at_any import nearest_neighbor_at_any_solve
 
@@ -13,8 +14,8 @@ def segment_joiner_solve(
         # todo - should_use_local_search ???
 ) -> SolutionTSP:
     def calculate_segment_cost(segment: list[int]) -> int:
-        return (sum(tsp.additional_costs[n] for n in segment) +
-                sum(tsp.distances_matrix[s][d] for s, d in pairwise(segment)))
+        return (sum((tsp.additional_costs[n] for n in segment), np.int64(0)) +
+                sum((tsp.distances_matrix[s, d] for s, d in pairwise(segment)), np.int64(0)))
 
     # todo - this may not be optimal at all (?) - what if joining_segment should be in between?
     #   e.g. segments that form a "T" ??? -> (talk with mom) "1 common division place" (???)
@@ -78,13 +79,9 @@ def segment_joiner_solve(
         solution, _ = calculate_optimal_segments_join(base_segment=solution, joining_segment=initial_segments.pop())
 
     def remove_worst_node(solution: list[int]) -> list[int]:
-        nodes_with_neighbors = [solution[-1]] + solution + [solution[0]]
-        worst_node, worst_node_change = -1, INF
-        for i in range(1, len(nodes_with_neighbors)-1):
-            start, removed, end = nodes_with_neighbors[i-1], nodes_with_neighbors[i], nodes_with_neighbors[i+1]
-            node_removal_change = tsp.removal_changes[start][end][removed]
-            if node_removal_change < worst_node_change:
-                worst_node, worst_node_change = removed, node_removal_change
+        # change of objective after removing each node from between its neighbors
+        nodes_removal_changes = tsp.removal_changes.for_cycle(solution)
+        worst_node = solution[nodes_removal_changes.argmin()]  # first occurrence in case of tie
         solution.remove(worst_node)
 
         return solution
@@ -15,15 +15,12 @@ def greedy_2_regret_variation_solve(tsp: TSP, starting_node: int = None) -> Solu
     remaining_nodes = tsp.get_nodes(without_nodes=chosen_nodes)
 
     def get_smallest_move_cost_node_between(start_node: int, end_node: int, current_remaining_nodes: List):
-        remaining_nodes_move_costs_between = [
-            tsp.insertion_costs[start_node][end_node][inserted_node]
-            for inserted_node in current_remaining_nodes
-        ]
-        smallest_move_cost = min(remaining_nodes_move_costs_between)
+        remaining_nodes_move_costs_between = tsp.insertion_costs.for_edge(start_node, end_node, current_remaining_nodes)
         # first occurrence in case of tie
-        smallest_move_cost_node_idx = remaining_nodes_move_costs_between.index(smallest_move_cost)
+        smallest_move_cost_node_idx = remaining_nodes_move_costs_between.argmin()
 
-        return current_remaining_nodes[smallest_move_cost_node_idx], smallest_move_cost
+        return (current_remaining_nodes[smallest_move_cost_node_idx],
+                remaining_nodes_move_costs_between[smallest_move_cost_node_idx])
 
     required_number_of_nodes = tsp.get_required_number_of_nodes_in_solution()
     while len(chosen_nodes) < required_number_of_nodes and remaining_nodes:
@@ -2,9 +2,7 @@ from data_loader import TSP, SolutionTSP
 from random import choice
 from itertools import pairwise
 from time import time
-import heapq
-
-INF = 10**18
+import numpy as np
 
 
 def greedy_2_regret_weighted_objective_solve(tsp: TSP, starting_node: int = None) -> SolutionTSP:
@@ -18,31 +16,23 @@ def greedy_2_regret_weighted_objective_solve(tsp: TSP, starting_node: int = None
     while len(chosen_nodes) < required_number_of_nodes and remaining_nodes:
         possible_insertions = list(pairwise(chosen_nodes + [chosen_nodes[0]]))
 
-        insertion_costs = [list() for _ in possible_insertions]
-        best_insertion_places = [(INF, (-1, -1)) for _ in remaining_nodes]  # (insertion_cost, (start, end))
-        for insertion_place_idx, next_node in enumerate(remaining_nodes):
-            for insertion_costs_idx, (start, end) in enumerate(possible_insertions):
-                insertion_cost = tsp.insertion_costs[start][end][next_node]
-
-                heapq.heappush(insertion_costs[insertion_costs_idx],
-                               (tsp.insertion_costs[start][end][next_node], next_node))
-
-                if insertion_cost < best_insertion_places[insertion_place_idx][0]:
-                    best_insertion_places[insertion_place_idx] = (insertion_cost, (start, end))
-
-        highest_weighted_objective = (-INF, -1, (-1, -1))  # (regret, next_node, (start, end))
-        for insertion_costs_idx, _ in enumerate(possible_insertions):
-            best_1st_move_cost, best_1st_move_node = heapq.heappop(insertion_costs[insertion_costs_idx])
-            best_2nd_move_cost, best_2nd_move_node = heapq.heappop(insertion_costs[insertion_costs_idx])
-            regret = best_2nd_move_cost - best_1st_move_cost
-            best_1st_move_node_insertion_cost, best_1st_move_node_insertion_place =\
-                best_insertion_places[remaining_nodes.index(best_1st_move_node)]
-            weighted_objective = (regret - best_1st_move_node_insertion_cost) / 2  # "-" because then we maximize
-            if weighted_objective > highest_weighted_objective[0]:
-                highest_weighted_objective = (weighted_objective, best_1st_move_node,
-                                              best_1st_move_node_insertion_place)
-
-        _, next_node, (_, end) = highest_weighted_objective
+        # [insertion_place_idx][next_node_idx]
+        insertion_costs = tsp.insertion_costs.for_edges(possible_insertions, remaining_nodes)
+        # ties are broken by the lower node, as when popping (insertion_cost, next_node) from a heap
+        nodes_order = np.argsort(remaining_nodes, kind='stable')
+        best_2_moves_idx = nodes_order[np.argsort(insertion_costs[:, nodes_order], axis=1, kind='stable')[:, :2]]
+        best_2_moves_costs = np.take_along_axis(insertion_costs, best_2_moves_idx, axis=1)
+        best_insertion_places_idx = insertion_costs.argmin(axis=0)  # first insertion place in case of tie
+
+        regrets = best_2_moves_costs[:, 1] - best_2_moves_costs[:, 0]
+        best_1st_move_nodes_idx = best_2_moves_idx[:, 0]
+        best_1st_move_nodes_insertion_costs = insertion_costs[best_insertion_places_idx[best_1st_move_nodes_idx],
+                                                              best_1st_move_nodes_idx]
+        weighted_objectives = (regrets - best_1st_move_nodes_insertion_costs) / 2  # "-" because then we maximize
+        # first insertion place with the highest weighted objective
+        next_node_idx = best_1st_move_nodes_idx[weighted_objectives.argmax()]
+        _, end = possible_insertions[best_insertion_places_idx[next_node_idx]]
+        next_node = remaining_nodes[next_node_idx]
         chosen_nodes.insert(chosen_nodes.index(end), next_node)
         remaining_nodes.remove(next_node)
 
@@ -1,6 +1,7 @@
 from data_loader import TSP, SolutionTSP
-from random import choice
+from random import randrange
 from itertools import combinations, pairwise
+from math import isqrt
 import heapq
 from typing import List, Tuple
 from time import time
@@ -13,6 +14,7 @@ from assignment3.local_search_types import (
     IntraRouteMovesType,
     MoveType,
 )
+from assignment3.local_search_telemetry import LocalSearchTelemetry
 
 
 def local_search_solve(
@@ -21,12 +23,14 @@ def local_search_solve(
         starting_solution_type: StartingSolutionType = StartingSolutionType.RANDOM,
         intra_route_move_type: IntraRouteMovesType = IntraRouteMovesType.TWO_NODES,
         starting_node: int = None,  # in case of RANDOM start - initial seed
+        collect_telemetry: bool = False,
 ) -> tuple[SolutionTSP, dict]:
     return LocalSearch(tsp=tsp,
                        local_search_type=local_search_type,
                        starting_solution_type=starting_solution_type,
                        intra_route_move_type=intra_route_move_type,
-                       starting_node=starting_node).solve()
+                       starting_node=starting_node,
+                       collect_telemetry=collect_telemetry).solve()
 
 
 class LocalSearch:
@@ -35,6 +39,7 @@ class LocalSearch:
                  starting_solution_type: StartingSolutionType = StartingSolutionType.RANDOM,
                  intra_route_move_type: IntraRouteMovesType = IntraRouteMovesType.TWO_NODES,
                  starting_node: int = None,  # in case of RANDOM start - initial seed
+                 collect_telemetry: bool = False,
                  ):
         self.tsp: TSP = tsp
         self.local_search_type: LocalSearchType = local_search_type
@@ -53,23 +58,45 @@ class LocalSearch:
 
         self.cycle = self.initial_solution.nodes
         self.objective = self.initial_solution.objective_function
-        self.not_selected_nodes = [node for node in tsp.nodes if node not in self.cycle]
         self.last_cycle_idx = len(self.cycle) - 1
+        # note - position of every node in cycle (-1 if not selected) and selected nodes bitmap, kept up to date
+        #  with every move made, so that cycle is never searched
+        self.node_positions: List[int] = [-1] * len(tsp.nodes)
+        self.is_selected = bytearray(len(tsp.nodes))
+        for position, node in enumerate(self.cycle):
+            self.node_positions[node] = position
+            self.is_selected[node] = True
+        # note - dict as ordered set, iterated in the same order as the list used to be
+        self.not_selected_nodes = dict.fromkeys(node for node in tsp.nodes if not self.is_selected[node])
         self.moves: List[Tuple[int, int, MoveType, Tuple]] = list()
 
         self.inter_nodes_exchanges_count: int = 0
         self.intra_two_nodes_count: int = 0
         self.intra_two_edges_count: int = 0
         self.moves_evaluated_count: int = 0
+        self.telemetry = LocalSearchTelemetry(enabled=collect_telemetry)
 
     def solve(self) -> tuple[SolutionTSP, dict]:
-        self.initialize_moves()
-        while self.moves:
-            self.make_move_if_possible(self.get_move())
+        match self.local_search_type:
+            case LocalSearchType.STEEPEST:
+                timer_start = self.telemetry.start_timer()
+                self.initialize_moves()
+                self.telemetry.stop_timer('initialize_moves', timer_start)
+                timer_start = self.telemetry.start_timer()
+                while self.moves:
+                    self.telemetry.measure_move(lambda: self.make_move_if_possible(self.get_move()),
+                                                self.get_made_moves_counts, queue_size=len(self.moves))
+                self.telemetry.stop_timer('main_loop', timer_start)
+            case LocalSearchType.GREEDY:
+                timer_start = self.telemetry.start_timer()
+                self.search_first_improvement()
+                self.telemetry.stop_timer('main_loop', timer_start)
+            case _:
+                raise Exception('no such local_search_type')
 
         total_moves = self.inter_nodes_exchanges_count + self.intra_two_nodes_count + self.intra_two_edges_count
 
-        return self.tsp.calculate_solution(self.cycle), {
+        return self.tsp.calculate_solution(self.cycle, objective_function=self.objective), {
             'total_moves': total_moves,
             'moves_evaluated': self.moves_evaluated_count,
             'inter_nodes_exchanges_count': self.inter_nodes_exchanges_count,
@@ -78,15 +105,19 @@ class LocalSearch:
             'inter_nodes_exchanges_percentage': None if total_moves == 0 else round(self.inter_nodes_exchanges_count / total_moves, 2),
             'intra_two_nodes_percentage': None if total_moves == 0 else round(self.intra_two_nodes_count / total_moves, 2),
             'intra_two_edges_percentage': None if total_moves == 0 else round(self.intra_two_edges_count / total_moves, 2),
+            **self.telemetry.get_stats(self.moves_evaluated_count),
         }
 
+    def get_made_moves_counts(self) -> Tuple[int, int, int]:
+        return self.inter_nodes_exchanges_count, self.intra_two_nodes_count, self.intra_two_edges_count
+
     def add_move_if_improves(self, move: Tuple[int, MoveType, Tuple]):
         self.moves_evaluated_count += 1
         objective_change, move_type, move_specification = move
         if objective_change >= 0:
             return
         move_on_queue = (objective_change, self.moves_evaluated_count, move_type, move_specification)
-        if self.local_search_type.STEEPEST:
+        if self.local_search_type == LocalSearchType.STEEPEST:
             heapq.heappush(self.moves, move_on_queue)
         else:
             self.moves.append(move_on_queue)
@@ -97,7 +128,7 @@ class LocalSearch:
         self.moves.append(move_on_queue)
 
     def get_connected_nodes(self, node: int):
-        place_in_cycle = self.cycle.index(node)
+        place_in_cycle = self.node_positions[node]
         if place_in_cycle == 0:
             return self.cycle[-1], self.cycle[1]
         elif place_in_cycle == self.last_cycle_idx:
@@ -105,6 +136,33 @@ class LocalSearch:
         else:
             return self.cycle[place_in_cycle - 1], self.cycle[place_in_cycle + 1]
 
+    def is_cycle_edge(self, edge_nodes: tuple[int, int]) -> bool:
+        # same as edge_nodes in pairwise(self.cycle + [self.cycle[-1]])
+        start_idx = self.node_positions[edge_nodes[0]]
+        if start_idx == -1:
+            return False
+        if start_idx == self.last_cycle_idx:
+            return edge_nodes[1] == edge_nodes[0]
+        return self.cycle[start_idx + 1] == edge_nodes[1]
+
+    def exchange_node(self, old_node: int, new_node: int):
+        exchange_idx = self.node_positions[old_node]
+        self.cycle[exchange_idx] = new_node
+        self.node_positions[new_node], self.node_positions[old_node] = exchange_idx, -1
+        self.is_selected[new_node], self.is_selected[old_node] = True, False
+        del self.not_selected_nodes[new_node]
+        self.not_selected_nodes[old_node] = None
+
+    def swap_nodes(self, node1: int, node2: int):
+        node1_idx, node2_idx = self.node_positions[node1], self.node_positions[node2]
+        self.cycle[node1_idx], self.cycle[node2_idx] = node2, node1
+        self.node_positions[node1], self.node_positions[node2] = node2_idx, node1_idx
+
+    def update_node_positions(self, start_idx: int, end_idx: int):
+        # after nodes in cycle[start_idx:end_idx] changed places
+        for idx in range(start_idx, end_idx):
+            self.node_positions[self.cycle[idx]] = idx
+
     def initialize_moves(self):
         # - generate all possible inter nodes exchange
         for node_in_cycle in self.cycle:
@@ -124,23 +182,16 @@ class LocalSearch:
         match move_type:
             case MoveType.INTER_NODES_EXCHANGE:
                 old_node, new_node, move_neighbors = move_specification
-                try:
-                    current_neighbors = self.get_connected_nodes(old_node)
-                except ValueError:
-                    return
                 # check if still valid
-                if (old_node in self.cycle) and (new_node not in self.cycle) and \
-                   (move_neighbors == current_neighbors):
+                if self.is_selected[old_node] and (not self.is_selected[new_node]) and \
+                   (move_neighbors == self.get_connected_nodes(old_node)):
                     if self.local_search_type == LocalSearchType.GREEDY:
                         objective_change = self.calculate_inter_nodes_move_objective_change(old_node, new_node, move_neighbors)
                         self.moves_evaluated_count += 1
                         if objective_change >= 0:
                             return
                     # make move
-                    exchange_idx = self.cycle.index(old_node)
-                    self.cycle[exchange_idx] = new_node
-                    self.not_selected_nodes.remove(new_node)
-                    self.not_selected_nodes.append(old_node)
+                    self.exchange_node(old_node, new_node)
                     self.objective += objective_change
                     self.inter_nodes_exchanges_count += 1
 
@@ -161,22 +212,17 @@ class LocalSearch:
                                 self.add_intra_edges(edge1_nodes=new_edge_nodes, edge2_nodes=edge_nodes)
             case MoveType.INTRA_TWO_NODES:
                 node1, node2, node1_neighbors, node2_neighbors = move_specification
-                try:
-                    current_node1_neighbors = self.get_connected_nodes(node1)
-                    current_node2_neighbors = self.get_connected_nodes(node2)
-                except ValueError:
-                    return
                 # check if still valid
-                if (node1 in self.cycle) and (node2 in self.cycle) and \
-                   (node1_neighbors == current_node1_neighbors) and (node2_neighbors == current_node2_neighbors):
+                if self.is_selected[node1] and self.is_selected[node2] and \
+                   (node1_neighbors == self.get_connected_nodes(node1)) and \
+                   (node2_neighbors == self.get_connected_nodes(node2)):
                     if self.local_search_type == LocalSearchType.GREEDY:
                         objective_change = self.calculate_intra_nodes_objective_change(node1, node1_neighbors, node2, node2_neighbors)
                         self.moves_evaluated_count += 1
                         if objective_change >= 0:
                             return
                     # make move
-                    node1_idx, node2_idx = self.cycle.index(node1), self.cycle.index(node2)
-                    self.cycle[node1_idx], self.cycle[node2_idx] = node2, node1
+                    self.swap_nodes(node1, node2)
                     self.objective += objective_change
                     self.intra_two_nodes_count += 1
                     # update neighbors
@@ -206,16 +252,15 @@ class LocalSearch:
                                 self.add_intra_edges(edge1_nodes=node2_edge, edge2_nodes=edge)
             case MoveType.INTRA_TWO_EDGES:
                 edge1_nodes, edge2_nodes = move_specification
-                cycle_edges = list(pairwise(self.cycle + [self.cycle[-1]]))
                 # check if still valid
-                if (edge1_nodes in cycle_edges) and (edge2_nodes in cycle_edges):
+                if self.is_cycle_edge(edge1_nodes) and self.is_cycle_edge(edge2_nodes):
                     if self.local_search_type == LocalSearchType.GREEDY:
                         objective_change = self.calculate_intra_edges_objective_change(edge1_nodes, edge2_nodes)
                         self.moves_evaluated_count += 1
                         if objective_change >= 0:
                             return
                     # make move
-                    edge1_idx, edge2_idx = self.cycle.index(edge1_nodes[0]), self.cycle.index(edge2_nodes[0])
+                    edge1_idx, edge2_idx = self.node_positions[edge1_nodes[0]], self.node_positions[edge2_nodes[0]]
                     if edge1_idx < edge2_idx:
                         left_idx, right_idx = edge1_idx, edge2_idx
                     else:
@@ -229,6 +274,7 @@ class LocalSearch:
                         else:
                             right.append(node)
                     self.cycle = left + middle[::-1] + right
+                    self.update_node_positions(left_idx + 1, right_idx + 1)
                     self.objective += objective_change
                     self.intra_two_edges_count += 1
                     # add resulting new moves
@@ -236,6 +282,88 @@ class LocalSearch:
                     self.moves = []
                     self.initialize_moves()
 
+    def search_first_improvement(self):
+        """
+        Greedy local search - moves of the neighborhood are drawn at random (without replacement) and evaluated one
+        by one, the first improving one is made. Until all moves of the neighborhood were drawn with none improving.
+
+        Neighborhood is never materialized - a move is identified just by its index:
+        - [0, cycle length * not selected count) - inter nodes exchange, (position in cycle, index of not selected)
+        - then - intra move, (position i, position j) for i < j, as two nodes swap or exchange of edges starting at
+          positions i and j (including the one closing the cycle)
+        and random permutation of indices is drawn lazily - Fisher-Yates shuffle, with only the swapped indices kept.
+        """
+        not_selected_nodes = list(self.not_selected_nodes)
+        while self.telemetry.measure_move(lambda: self.make_first_improving_move(not_selected_nodes),
+                                          self.get_made_moves_counts):
+            pass
+
+    def make_first_improving_move(self, not_selected_nodes: List[int]) -> bool:
+        cycle_length = len(self.cycle)
+        inter_moves_count = cycle_length * len(not_selected_nodes)
+        neighborhood_size = inter_moves_count + cycle_length * (cycle_length - 1) // 2
+        swapped_indices = dict()
+        for drawn_count in range(neighborhood_size):
+            drawn_index = randrange(drawn_count, neighborhood_size)
+            move_index = swapped_indices.get(drawn_index, drawn_index)
+            swapped_indices[drawn_index] = swapped_indices.get(drawn_count, drawn_count)
+            self.moves_evaluated_count += 1
+            if move_index < inter_moves_count:
+                made_move = self.make_inter_nodes_move_if_improves(
+                    *divmod(move_index, len(not_selected_nodes)), not_selected_nodes)
+            else:
+                made_move = self.make_intra_move_if_improves(
+                    *self.get_positions_pair(move_index - inter_moves_count, cycle_length))
+            if made_move:
+                return True
+        return False
+
+    @staticmethod
+    def get_positions_pair(pair_index: int, cycle_length: int) -> tuple[int, int]:
+        # pair_index-th of (i, j) for i < j, in order of combinations(range(cycle_length), 2)
+        index_from_end = cycle_length * (cycle_length - 1) // 2 - 1 - pair_index
+        # (k - 1) * k / 2 <= index_from_end, for the largest k - the last k pairs belong to k-th row from the end
+        k = (isqrt(8 * index_from_end + 1) - 1) // 2
+        i = cycle_length - 2 - k
+        return i, cycle_length - 1 - (index_from_end - k * (k + 1) // 2)
+
+    def make_inter_nodes_move_if_improves(self, position: int, not_selected_idx: int,
+                                          not_selected_nodes: List[int]) -> bool:
+        old_node, new_node = self.cycle[position], not_selected_nodes[not_selected_idx]
+        neighbors = self.get_connected_nodes(old_node)
+        objective_change = self.calculate_inter_nodes_move_objective_change(old_node, new_node, neighbors)
+        if objective_change >= 0:
+            return False
+        self.exchange_node(old_node, new_node)
+        not_selected_nodes[not_selected_idx] = old_node
+        self.objective += objective_change
+        self.inter_nodes_exchanges_count += 1
+        return True
+
+    def make_intra_move_if_improves(self, position1: int, position2: int) -> bool:
+        node1, node2 = self.cycle[position1], self.cycle[position2]
+        match self.intra_route_move_type:
+            case IntraRouteMovesType.TWO_NODES:
+                objective_change = self.calculate_intra_nodes_objective_change(
+                    node1, self.get_connected_nodes(node1), node2, self.get_connected_nodes(node2))
+                if objective_change >= 0:
+                    return False
+                self.swap_nodes(node1, node2)
+                self.intra_two_nodes_count += 1
+            case IntraRouteMovesType.TWO_EDGES:
+                # edges starting at both positions - the last one closes the cycle
+                objective_change = self.calculate_intra_edges_objective_change(
+                    (node1, self.get_connected_nodes(node1)[1]), (node2, self.get_connected_nodes(node2)[1]))
+                if objective_change >= 0:
+                    return False
+                self.cycle[position1 + 1:position2 + 1] = self.cycle[position1 + 1:position2 + 1][::-1]
+                self.update_node_positions(position1 + 1, position2 + 1)
+                self.intra_two_edges_count += 1
+            case _:
+                raise Exception('no such intra_route_move_type')
+        self.objective += objective_change
+        return True
+
     def calculate_intra_nodes_objective_change(self, node1, node1_neighbors, node2, node2_neighbors) -> int:
         # ..., node1_neighbors[0], node1, node2, node2_neighbors[1]
         # 1                - n1n[0]_n1   - n1_n2
@@ -346,9 +474,6 @@ class LocalSearch:
             case LocalSearchType.STEEPEST:
                 objective_change, _, move_type, move_specification = heapq.heappop(self.moves)
                 return objective_change, move_type, move_specification
-            case LocalSearchType.GREEDY:
-                objective_change, _, move_type, move_specification = self.moves.pop(choice(range(len(self.moves))))
-                return objective_change, move_type, move_specification
             case _:
                 raise Exception('no such local_search_type')
 
@@ -0,0 +1,77 @@
+from time import perf_counter
+from collections import defaultdict
+from typing import Callable, Dict, Tuple, TypeVar
+
+from assignment3.local_search_types import MoveType
+
+T = TypeVar('T')
+
+# order of counts returned by get_made_moves_counts of local searches
+MADE_MOVES_TYPES = (MoveType.INTER_NODES_EXCHANGE, MoveType.INTRA_TWO_NODES, MoveType.INTRA_TWO_EDGES)
+
+
+class LocalSearchTelemetry:
+    """
+    Timers and counters of a single local search run, returned as a part of its stats.
+
+    When not enabled, nothing is measured - timers don't even read the clock, and moves are just made - so it
+    can stay in the hot path of every run.
+    """
+    def __init__(self, enabled: bool = False):
+        self.enabled: bool = enabled
+        self.times: Dict[str, float] = defaultdict(float)
+        self.made_moves_times: Dict[MoveType, float] = defaultdict(float)
+        self.made_moves_counts: Dict[MoveType, int] = defaultdict(int)
+        self.moves_popped_count: int = 0
+        self.stale_moves_popped_count: int = 0
+        self.queue_high_water_mark: int = 0
+
+    def start_timer(self) -> float:
+        return perf_counter() if self.enabled else 0.
+
+    def stop_timer(self, name: str, start: float):
+        if self.enabled:
+            self.times[name] += perf_counter() - start
+
+    def measure_move(self, make_move: Callable[[], T], get_made_moves_counts: Callable[[], Tuple[int, int, int]],
+                     queue_size: int | None = None) -> T:
+        """
+        Makes (or tries to make) a move - time spent is added to the type of move made. queue_size is the size of
+        moves queue before the move was popped from it, None if there is no queue. Popped move not made is stale
+        (or with greedy, no longer improving).
+        """
+        if not self.enabled:
+            return make_move()
+        made_moves_counts = get_made_moves_counts()
+        start = perf_counter()
+        result = make_move()
+        elapsed = perf_counter() - start
+        for move_type, count_before, count_after in zip(MADE_MOVES_TYPES, made_moves_counts, get_made_moves_counts()):
+            if count_after != count_before:
+                self.made_moves_times[move_type] += elapsed
+                self.made_moves_counts[move_type] += count_after - count_before
+                break
+        else:
+            if queue_size is not None:
+                self.stale_moves_popped_count += 1
+        if queue_size is not None:
+            self.moves_popped_count += 1
+            self.queue_high_water_mark = max(self.queue_high_water_mark, queue_size)
+        return result
+
+    def get_stats(self, moves_evaluated_count: int) -> dict:
+        if not self.enabled:
+            return {}
+        total_time = sum(self.times.values())
+        return {
+            'initialize_moves_time': self.times['initialize_moves'],
+            'main_loop_time': self.times['main_loop'],
+            'moves_popped': self.moves_popped_count,
+            'stale_moves_popped': self.stale_moves_popped_count,
+            'queue_high_water_mark': self.queue_high_water_mark,
+            'evaluations_per_second': None if total_time == 0 else round(moves_evaluated_count / total_time),
+            'time_per_move_type': {
+                move_type.name: self.made_moves_times[move_type] / self.made_moves_counts[move_type]
+                for move_type in MADE_MOVES_TYPES if self.made_moves_counts[move_type]
+            },
+        }
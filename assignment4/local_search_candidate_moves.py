@@ -1,8 +1,10 @@
 from data_loader import TSP, SolutionTSP
-from random import choice
-from itertools import pairwise, product
+from random import randrange
+from collections import deque
+from itertools import product
 import heapq
-from typing import List, Tuple
+import numpy as np
+from typing import List, Sequence, Tuple
 from time import time
 
 from assignment1.random_solution import random_solve
@@ -13,6 +15,7 @@ from assignment3.local_search_types import (
     IntraRouteMovesType,
     MoveType,
 )
+from assignment3.local_search_telemetry import LocalSearchTelemetry
 
 
 def local_search_candidate_moves_solve(
@@ -22,13 +25,17 @@ def local_search_candidate_moves_solve(
         intra_route_move_type: IntraRouteMovesType = IntraRouteMovesType.TWO_NODES,
         candidates_number: int = 10,
         starting_node: int = None,  # in case of RANDOM start - initial seed
+        use_dont_look_bits: bool = False,
+        collect_telemetry: bool = False,
 ) -> tuple[SolutionTSP, dict]:
     return LocalSearchCandidateMoves(tsp=tsp,
                                      local_search_type=local_search_type,
                                      starting_solution_type=starting_solution_type,
                                      intra_route_move_type=intra_route_move_type,
                                      candidates_number=candidates_number,
-                                     starting_node=starting_node).solve()
+                                     starting_node=starting_node,
+                                     use_dont_look_bits=use_dont_look_bits,
+                                     collect_telemetry=collect_telemetry).solve()
 
 
 class LocalSearchCandidateMoves:
@@ -38,6 +45,8 @@ class LocalSearchCandidateMoves:
                  intra_route_move_type: IntraRouteMovesType = IntraRouteMovesType.TWO_NODES,
                  candidates_number: int = 10,
                  starting_node: int = None,  # in case of RANDOM start - initial seed
+                 use_dont_look_bits: bool = False,
+                 collect_telemetry: bool = False,
                  ):
         self.tsp: TSP = tsp
         self.local_search_type: LocalSearchType = local_search_type
@@ -63,37 +72,58 @@ class LocalSearchCandidateMoves:
 
         self.cycle = self.initial_solution.nodes
         self.objective = self.initial_solution.objective_function
-        self.not_selected_nodes = [node for node in tsp.nodes if node not in self.cycle]
         self.last_cycle_idx = len(self.cycle) - 1
+        # note - position of every node in cycle (-1 if not selected) and selected nodes bitmap, kept up to date
+        #  with every move made, so that cycle is never searched
+        self.node_positions: List[int] = [-1] * len(tsp.nodes)
+        self.is_selected = bytearray(len(tsp.nodes))
+        for position, node in enumerate(self.cycle):
+            self.node_positions[node] = position
+            self.is_selected[node] = True
+        # note - dict as ordered set, iterated in the same order as the list used to be
+        self.not_selected_nodes = dict.fromkeys(node for node in tsp.nodes if not self.is_selected[node])
         self.moves: List[Tuple[int, int, MoveType, Tuple]] = list()
+        # moves which edges are in cycle, but not in the same relative direction
+        self.preserved_moves: List[Tuple[int, int, MoveType, Tuple]] = list()
 
         # todo - 10 BUT in case of tie, include both??
-        vertices_closest_to = [
-            sorted([
-                (self.tsp.total_move_costs[origin_node][candidate_node], candidate_node)
-                for candidate_node in range(len(self.tsp.nodes))
-                if candidate_node != origin_node
-            ])[:self.candidates_number]
-            for origin_node in range(len(self.tsp.nodes))
-        ]
-        self.vertices_closest_to = [
-            [node for _, node in vertices_closest_to_node]
-            for vertices_closest_to_node in vertices_closest_to
-        ]
+        self.vertices_closest_to = self.tsp.get_nearest_nodes(self.candidates_number).tolist()
 
         self.inter_nodes_exchanges_count: int = 0
         self.intra_two_nodes_count: int = 0
         self.intra_two_edges_count: int = 0
         self.moves_evaluated_count: int = 0
+        self.telemetry = LocalSearchTelemetry(enabled=collect_telemetry)
+
+        # don't look bits - instead of re-initializing all moves after every move made, candidate moves of a single
+        # active node (both as origin and as close node) are evaluated at a time. Node stays inactive (its bit set)
+        # until a move changes its neighbors, or takes it out of cycle
+        self.use_dont_look_bits: bool = use_dont_look_bits
+        self.dont_look_bits = bytearray(len(tsp.nodes))
+        self.active_nodes: deque[int] = deque(self.cycle)
+        self.vertices_having_as_closest: List[List[int]] = [[] for _ in tsp.nodes]
+        for origin_node, close_nodes in enumerate(self.vertices_closest_to):
+            for close_node in close_nodes:
+                self.vertices_having_as_closest[close_node].append(origin_node)
 
     def solve(self) -> tuple[SolutionTSP, dict]:
-        self.initialize_moves()
-        while self.moves:
-            self.make_move_if_possible(self.get_move())
+        if self.use_dont_look_bits:
+            timer_start = self.telemetry.start_timer()
+            self.search_active_nodes()
+            self.telemetry.stop_timer('main_loop', timer_start)
+        else:
+            timer_start = self.telemetry.start_timer()
+            self.initialize_moves()
+            self.telemetry.stop_timer('initialize_moves', timer_start)
+            timer_start = self.telemetry.start_timer()
+            while self.moves:
+                self.telemetry.measure_move(lambda: self.make_move_if_possible(self.get_move()),
+                                            self.get_made_moves_counts, queue_size=len(self.moves))
+            self.telemetry.stop_timer('main_loop', timer_start)
 
         total_moves = self.inter_nodes_exchanges_count + self.intra_two_nodes_count + self.intra_two_edges_count
 
-        return self.tsp.calculate_solution(self.cycle), {
+        return self.tsp.calculate_solution(self.cycle, objective_function=self.objective), {
             'total_moves': total_moves,
             'moves_evaluated': self.moves_evaluated_count,
             'inter_nodes_exchanges_count': self.inter_nodes_exchanges_count,
@@ -102,26 +132,77 @@ class LocalSearchCandidateMoves:
             'inter_nodes_exchanges_percentage': None if total_moves == 0 else round(self.inter_nodes_exchanges_count / total_moves, 2),
             'intra_two_nodes_percentage': None if total_moves == 0 else round(self.intra_two_nodes_count / total_moves, 2),
             'intra_two_edges_percentage': None if total_moves == 0 else round(self.intra_two_edges_count / total_moves, 2),
+            **self.telemetry.get_stats(self.moves_evaluated_count),
         }
 
+    def search_active_nodes(self):
+        while self.active_nodes:
+            node = self.active_nodes.popleft()
+            self.dont_look_bits[node] = True
+            # all candidate moves of the node - the best one is made (or random improving one, with greedy)
+            self.moves, self.preserved_moves = [], []
+            self.add_candidate_moves_of_nodes((node,))
+            made_moves_count = self.count_made_moves()
+            while self.moves and self.count_made_moves() == made_moves_count:
+                self.telemetry.measure_move(lambda: self.make_move_if_possible(self.get_move()),
+                                            self.get_made_moves_counts, queue_size=len(self.moves))
+        self.moves = []
+
+    def activate_nodes(self, nodes: Tuple[int, ...]):
+        # resets don't look bits of nodes, which neighbors were changed by a move
+        for node in nodes:
+            if self.dont_look_bits[node]:
+                self.dont_look_bits[node] = False
+                self.active_nodes.append(node)
+
+    def count_made_moves(self) -> int:
+        return self.inter_nodes_exchanges_count + self.intra_two_nodes_count + self.intra_two_edges_count
+
+    def get_made_moves_counts(self) -> Tuple[int, int, int]:
+        return self.inter_nodes_exchanges_count, self.intra_two_nodes_count, self.intra_two_edges_count
+
     def add_move_if_improves(self, move: Tuple[int, MoveType, Tuple]):
         self.moves_evaluated_count += 1
         objective_change, move_type, move_specification = move
         if objective_change >= 0:
             return
         move_on_queue = (objective_change, self.moves_evaluated_count, move_type, move_specification)
-        if self.local_search_type.STEEPEST:
+        if self.local_search_type == LocalSearchType.STEEPEST:
             heapq.heappush(self.moves, move_on_queue)
         else:
             self.moves.append(move_on_queue)
 
+    def add_moves_if_improve(self, objective_changes: np.ndarray, move_type: MoveType, moves_nodes: np.ndarray):
+        # add_move_if_improves for a batch of moves evaluated at once, moves_nodes[i] are nodes of i-th move
+        first_moves_evaluated_count = self.moves_evaluated_count + 1
+        self.moves_evaluated_count += len(objective_changes)
+        improving = np.flatnonzero(objective_changes < 0)
+        for index, objective_change, nodes in zip(improving.tolist(), objective_changes[improving].tolist(),
+                                                  moves_nodes[improving].tolist()):
+            heapq.heappush(self.moves, (objective_change, first_moves_evaluated_count + index, move_type,
+                                        self.get_move_specification(move_type, nodes)))
+
+    @staticmethod
+    def get_move_specification(move_type: MoveType, nodes: List[int]) -> Tuple:
+        match move_type:
+            case MoveType.INTER_NODES_EXCHANGE:
+                node_in_cycle, non_cycle_node, *neighbors = nodes
+                return node_in_cycle, non_cycle_node, tuple(neighbors)
+            case MoveType.INTRA_TWO_NODES:
+                node1, node2, *neighbors = nodes
+                return node1, node2, tuple(neighbors[:2]), tuple(neighbors[2:])
+            case MoveType.INTRA_TWO_EDGES:
+                return tuple(nodes[:2]), tuple(nodes[2:])
+            case _:
+                raise Exception('no such move_type')
+
     def add_move_without_evaluation(self, move: Tuple[int, MoveType, Tuple]):
         objective_change, move_type, move_specification = move
         move_on_queue = (objective_change, self.moves_evaluated_count, move_type, move_specification)
         self.moves.append(move_on_queue)
 
     def get_connected_nodes(self, node: int):
-        place_in_cycle = self.cycle.index(node)
+        place_in_cycle = self.node_positions[node]
         if place_in_cycle == 0:
             return self.cycle[-1], self.cycle[1]
         elif place_in_cycle == self.last_cycle_idx:
@@ -129,107 +210,207 @@ class LocalSearchCandidateMoves:
         else:
             return self.cycle[place_in_cycle - 1], self.cycle[place_in_cycle + 1]
 
+    def exchange_node(self, old_node: int, new_node: int):
+        exchange_idx = self.node_positions[old_node]
+        self.cycle[exchange_idx] = new_node
+        self.node_positions[new_node], self.node_positions[old_node] = exchange_idx, -1
+        self.is_selected[new_node], self.is_selected[old_node] = True, False
+        del self.not_selected_nodes[new_node]
+        self.not_selected_nodes[old_node] = None
+
+    def swap_nodes(self, node1: int, node2: int):
+        node1_idx, node2_idx = self.node_positions[node1], self.node_positions[node2]
+        self.cycle[node1_idx], self.cycle[node2_idx] = node2, node1
+        self.node_positions[node1], self.node_positions[node2] = node2_idx, node1_idx
+
+    def update_node_positions(self, start_idx: int, end_idx: int):
+        # after nodes in cycle[start_idx:end_idx] changed places
+        for idx in range(start_idx, end_idx):
+            self.node_positions[self.cycle[idx]] = idx
+
     def initialize_moves(self):
-        for origin_node in self.cycle:
-            for close_node in self.vertices_closest_to[origin_node]:
-                if close_node in self.cycle:
-                    origin_node_neighbors = self.get_connected_nodes(origin_node)
-                    close_node_neighbors = self.get_connected_nodes(close_node)
-                    if self.intra_route_move_type == IntraRouteMovesType.TWO_NODES:
-                        self.add_intra_nodes(node1=origin_node, node1_neighbors=origin_node_neighbors,
-                                             node2=close_node, node2_neighbors=close_node_neighbors)
-                    if self.intra_route_move_type == IntraRouteMovesType.TWO_EDGES:
-                        if origin_node in close_node_neighbors:
-                            continue
-                        origin_edges = ((origin_node_neighbors[0], origin_node), (origin_node, origin_node_neighbors[1]))
-                        close_edges = ((close_node_neighbors[0], close_node), (close_node, close_node_neighbors[1]))
-                        for origin_edge, close_edge in product(origin_edges, close_edges):
-                            self.add_intra_edges(edge1_nodes=origin_edge, edge2_nodes=close_edge)
-                else:
-                    origin_node_neighbors = self.get_connected_nodes(origin_node)
-                    self.add_inter_node_move(node_in_cycle=origin_node, neighbors=origin_node_neighbors,
-                                             non_cycle_node=close_node)
+        self.add_candidate_moves([(origin_node, close_node) for origin_node in self.cycle
+                                  for close_node in self.vertices_closest_to[origin_node]])
 
-    def make_move_if_possible(self, move: Tuple[int, MoveType, Tuple]):
-        objective_change, move_type, move_specification = move
+    def add_candidate_moves(self, pairs: Sequence[tuple[int, int]]):
+        """
+        add_candidate_move of each (origin_node, close_node) pair, in turn.
+        With steepest, all of them are evaluated at once - by numpy, separately for exchanges and intra moves.
+        """
+        if self.local_search_type != LocalSearchType.STEEPEST:
+            for origin_node, close_node in pairs:
+                self.add_candidate_move(origin_node, close_node)
+            return
+        inter_rows, intra_rows = [], []
+        for origin_node, close_node in pairs:
+            origin_node_neighbors = self.get_connected_nodes(origin_node)
+            if self.is_selected[close_node]:
+                intra_rows.append((origin_node, close_node, *origin_node_neighbors,
+                                   *self.get_connected_nodes(close_node)))
+            else:
+                inter_rows.append((origin_node, close_node, *origin_node_neighbors))
+        if inter_rows:
+            moves_nodes = np.array(inter_rows)
+            origin_node, close_node, *origin_node_neighbors = moves_nodes.T
+            self.add_moves_if_improve(
+                self.calculate_inter_nodes_move_objective_change(origin_node, close_node, origin_node_neighbors),
+                MoveType.INTER_NODES_EXCHANGE, moves_nodes)
+        if not intra_rows:
+            return
+        moves_nodes = np.array(intra_rows)
+        origin_node, close_node, *neighbors = moves_nodes.T
+        origin_node_neighbors, close_node_neighbors = neighbors[:2], neighbors[2:]
+        if self.intra_route_move_type == IntraRouteMovesType.TWO_NODES:
+            self.add_moves_if_improve(
+                self.calculate_intra_nodes_objective_changes(origin_node, origin_node_neighbors,
+                                                             close_node, close_node_neighbors),
+                MoveType.INTRA_TWO_NODES, moves_nodes)
+        if self.intra_route_move_type == IntraRouteMovesType.TWO_EDGES:
+            is_not_neighbor = (origin_node != close_node_neighbors[0]) & (origin_node != close_node_neighbors[1])
+            origin_node, close_node = origin_node[is_not_neighbor], close_node[is_not_neighbor]
+            origin_node_neighbors = [neighbors[is_not_neighbor] for neighbors in origin_node_neighbors]
+            close_node_neighbors = [neighbors[is_not_neighbor] for neighbors in close_node_neighbors]
+            origin_edges = ((origin_node_neighbors[0], origin_node), (origin_node, origin_node_neighbors[1]))
+            close_edges = ((close_node_neighbors[0], close_node), (close_node, close_node_neighbors[1]))
+            # [pair][origin edge, close edge] - flattened in the same order as they would be added one by one
+            objective_changes = np.stack([
+                self.calculate_intra_edges_objective_change(origin_edge, close_edge)
+                for origin_edge, close_edge in product(origin_edges, close_edges)
+            ], axis=1)
+            moves_nodes = np.stack([
+                np.stack((*origin_edge, *close_edge), axis=-1)
+                for origin_edge, close_edge in product(origin_edges, close_edges)
+            ], axis=1)
+            self.add_moves_if_improve(objective_changes.reshape(-1), MoveType.INTRA_TWO_EDGES,
+                                      moves_nodes.reshape(-1, 4))
+
+    def add_candidate_move(self, origin_node: int, close_node: int):
+        if self.is_selected[close_node]:
+            origin_node_neighbors = self.get_connected_nodes(origin_node)
+            close_node_neighbors = self.get_connected_nodes(close_node)
+            if self.intra_route_move_type == IntraRouteMovesType.TWO_NODES:
+                self.add_intra_nodes(node1=origin_node, node1_neighbors=origin_node_neighbors,
+                                     node2=close_node, node2_neighbors=close_node_neighbors)
+            if self.intra_route_move_type == IntraRouteMovesType.TWO_EDGES:
+                if origin_node in close_node_neighbors:
+                    return
+                origin_edges = ((origin_node_neighbors[0], origin_node), (origin_node, origin_node_neighbors[1]))
+                close_edges = ((close_node_neighbors[0], close_node), (close_node, close_node_neighbors[1]))
+                for origin_edge, close_edge in product(origin_edges, close_edges):
+                    self.add_intra_edges(edge1_nodes=origin_edge, edge2_nodes=close_edge)
+        else:
+            origin_node_neighbors = self.get_connected_nodes(origin_node)
+            self.add_inter_node_move(node_in_cycle=origin_node, neighbors=origin_node_neighbors,
+                                     non_cycle_node=close_node)
+
+    def make_move_if_possible(self, move: Tuple[int, int, MoveType, Tuple]):
+        objective_change, _, move_type, move_specification = move
         match move_type:
             case MoveType.INTER_NODES_EXCHANGE:
                 old_node, new_node, move_neighbors = move_specification
-                try:
-                    current_neighbors = self.get_connected_nodes(old_node)
-                except ValueError:
-                    return
                 # check if still valid
-                if True:#(old_node in self.cycle) and (new_node not in self.cycle) and \
-                   #(move_neighbors == current_neighbors):
-                    if self.local_search_type == LocalSearchType.GREEDY:
-                        objective_change = self.calculate_inter_nodes_move_objective_change(old_node, new_node, move_neighbors)
-                        self.moves_evaluated_count += 1
-                        if objective_change >= 0:
-                            return
-                    # make move
-                    exchange_idx = self.cycle.index(old_node)
-                    self.cycle[exchange_idx] = new_node
-                    self.not_selected_nodes.remove(new_node)
-                    self.not_selected_nodes.append(old_node)
-                    self.objective += objective_change
-                    self.inter_nodes_exchanges_count += 1
-                    # add resulting new moves
-                    self.moves = []
-                    self.initialize_moves()
+                if not (self.is_selected[old_node] and (not self.is_selected[new_node]) and
+                        self.are_neighbors_same(move_neighbors, self.get_connected_nodes(old_node))):
+                    return
+                if self.local_search_type == LocalSearchType.GREEDY:
+                    objective_change = self.calculate_inter_nodes_move_objective_change(old_node, new_node, move_neighbors)
+                    self.moves_evaluated_count += 1
+                    if objective_change >= 0:
+                        return
+                # make move
+                self.exchange_node(old_node, new_node)
+                self.objective += objective_change
+                self.inter_nodes_exchanges_count += 1
+                changed_nodes = (new_node, *move_neighbors, old_node)
             case MoveType.INTRA_TWO_NODES:
                 node1, node2, node1_neighbors, node2_neighbors = move_specification
-                try:
-                    current_node1_neighbors = self.get_connected_nodes(node1)
-                    current_node2_neighbors = self.get_connected_nodes(node2)
-                except ValueError:
-                    return
                 # check if still valid
-                if True: #(node1 in self.cycle) and (node2 in self.cycle) and \
-                   #(node1_neighbors == current_node1_neighbors) and (node2_neighbors == current_node2_neighbors):
-                    if self.local_search_type == LocalSearchType.GREEDY:
-                        objective_change = self.calculate_intra_nodes_objective_change(node1, node1_neighbors, node2, node2_neighbors)
-                        self.moves_evaluated_count += 1
-                        if objective_change >= 0:
-                            return
-                    # make move
-                    node1_idx, node2_idx = self.cycle.index(node1), self.cycle.index(node2)
-                    self.cycle[node1_idx], self.cycle[node2_idx] = node2, node1
-                    self.objective += objective_change
-                    self.intra_two_nodes_count += 1
-                    # add resulting new moves
-                    self.moves = []
-                    self.initialize_moves()
+                if not (self.is_selected[node1] and self.is_selected[node2] and
+                        self.are_neighbors_same(node1_neighbors, self.get_connected_nodes(node1)) and
+                        self.are_neighbors_same(node2_neighbors, self.get_connected_nodes(node2))):
+                    return
+                if self.local_search_type == LocalSearchType.GREEDY:
+                    objective_change = self.calculate_intra_nodes_objective_change(node1, node1_neighbors, node2, node2_neighbors)
+                    self.moves_evaluated_count += 1
+                    if objective_change >= 0:
+                        return
+                # make move
+                self.swap_nodes(node1, node2)
+                self.objective += objective_change
+                self.intra_two_nodes_count += 1
+                changed_nodes = (node1, node2, *node1_neighbors, *node2_neighbors)
             case MoveType.INTRA_TWO_EDGES:
                 edge1_nodes, edge2_nodes = move_specification
-                cycle_edges = list(pairwise(self.cycle + [self.cycle[-1]]))
-                # check if still valid
-                if True: #(edge1_nodes in cycle_edges) and (edge2_nodes in cycle_edges):
-                    if self.local_search_type == LocalSearchType.GREEDY:
-                        objective_change = self.calculate_intra_edges_objective_change(edge1_nodes, edge2_nodes)
-                        self.moves_evaluated_count += 1
-                        if objective_change >= 0:
-                            return
-                    # make move
-                    edge1_idx, edge2_idx = self.cycle.index(edge1_nodes[0]), self.cycle.index(edge2_nodes[0])
-                    if edge1_idx < edge2_idx:
-                        left_idx, right_idx = edge1_idx, edge2_idx
-                    else:
-                        left_idx, right_idx = edge2_idx, edge1_idx
-                    left, middle, right = [], [], []
-                    for i, node in enumerate(self.cycle):
-                        if i <= left_idx:
-                            left.append(node)
-                        elif i <= right_idx:
-                            middle.append(node)
-                        else:
-                            right.append(node)
-                    self.cycle = left + middle[::-1] + right
-                    self.objective += objective_change
-                    self.intra_two_edges_count += 1
-                    # add resulting new moves
-                    self.moves = []
-                    self.initialize_moves()
+                # check if still valid - both edges in cycle, in the same relative direction as they were
+                edge1_in_cycle, edge1_reversed_in_cycle = self.get_edge_presence(edge1_nodes)
+                edge2_in_cycle, edge2_reversed_in_cycle = self.get_edge_presence(edge2_nodes)
+                if (edge1_in_cycle and edge2_reversed_in_cycle) or (edge1_reversed_in_cycle and edge2_in_cycle):
+                    # note - may get valid again after some other reversal
+                    self.preserved_moves.append(move)
+                    return
+                if edge1_reversed_in_cycle and edge2_reversed_in_cycle:
+                    # the same edges get exchanged, just in the direction of cycle
+                    edge1_nodes, edge2_nodes = edge1_nodes[::-1], edge2_nodes[::-1]
+                elif not (edge1_in_cycle and edge2_in_cycle):
+                    return
+                if self.local_search_type == LocalSearchType.GREEDY:
+                    objective_change = self.calculate_intra_edges_objective_change(edge1_nodes, edge2_nodes)
+                    self.moves_evaluated_count += 1
+                    if objective_change >= 0:
+                        return
+                # make move
+                edge1_idx, edge2_idx = self.node_positions[edge1_nodes[0]], self.node_positions[edge2_nodes[0]]
+                if edge1_idx < edge2_idx:
+                    left_idx, right_idx = edge1_idx, edge2_idx
+                else:
+                    left_idx, right_idx = edge2_idx, edge1_idx
+                self.cycle[left_idx + 1:right_idx + 1] = self.cycle[left_idx + 1:right_idx + 1][::-1]
+                self.update_node_positions(left_idx + 1, right_idx + 1)
+                self.objective += objective_change
+                self.intra_two_edges_count += 1
+                changed_nodes = (*edge1_nodes, *edge2_nodes)
+            case _:
+                raise Exception('no such move_type')
+        # add resulting new moves
+        if self.use_dont_look_bits:
+            self.activate_nodes(changed_nodes)
+            return
+        self.add_preserved_moves_back()
+        self.add_candidate_moves_of_nodes(changed_nodes)
+
+    def add_candidate_moves_of_nodes(self, nodes: Sequence[int]):
+        # candidate moves with any of the nodes as origin or as close node - each pair once
+        # note - dict as ordered set
+        pairs = dict()
+        for node in nodes:
+            if self.is_selected[node]:
+                for close_node in self.vertices_closest_to[node]:
+                    pairs[(node, close_node)] = None
+            for origin_node in self.vertices_having_as_closest[node]:
+                if self.is_selected[origin_node]:
+                    pairs[(origin_node, node)] = None
+        self.add_candidate_moves(list(pairs))
+
+    def add_preserved_moves_back(self):
+        for move in self.preserved_moves:
+            if self.local_search_type == LocalSearchType.STEEPEST:
+                heapq.heappush(self.moves, move)
+            else:
+                self.moves.append(move)
+        self.preserved_moves = []
+
+    @staticmethod
+    def are_neighbors_same(move_neighbors: tuple[int, int], current_neighbors: tuple[int, int]) -> bool:
+        # note - distances are symmetric, so objective change stays the same also after the node got reversed
+        return move_neighbors == current_neighbors or move_neighbors[::-1] == current_neighbors
+
+    def get_edge_presence(self, edge_nodes: tuple[int, int]) -> tuple[bool, bool]:
+        # (edge_nodes in cycle edges, edge_nodes[::-1] in cycle edges) - including the edge closing the cycle
+        a, b = edge_nodes
+        if not (self.is_selected[a] and self.is_selected[b]):
+            return False, False
+        a_neighbors = self.get_connected_nodes(a)
+        return a_neighbors[1] == b, a_neighbors[0] == b
 
     def calculate_intra_nodes_objective_change(self, node1, node1_neighbors, node2, node2_neighbors) -> int:
         # ..., node1_neighbors[0], node1, node2, node2_neighbors[1]
@@ -242,12 +423,12 @@ class LocalSearchCandidateMoves:
         # correct = - n1n[0]_n1 - n1_n2 - n2_n2n[1]
         #           + n1n[0]_n2 + n2_n1 + n1_n2n[1]
         if node1 == node2_neighbors[0]:
-            return - self.tsp.distances_matrix[node1_neighbors[0]][node1] \
-                   - self.tsp.distances_matrix[node1][node2] \
-                   - self.tsp.distances_matrix[node2][node2_neighbors[1]] \
-                   + self.tsp.distances_matrix[node1_neighbors[0]][node2] \
-                   + self.tsp.distances_matrix[node2][node1] \
-                   + self.tsp.distances_matrix[node1][node2_neighbors[1]]
+            return - self.tsp.distances_matrix[node1_neighbors[0], node1] \
+                   - self.tsp.distances_matrix[node1, node2] \
+                   - self.tsp.distances_matrix[node2, node2_neighbors[1]] \
+                   + self.tsp.distances_matrix[node1_neighbors[0], node2] \
+                   + self.tsp.distances_matrix[node2, node1] \
+                   + self.tsp.distances_matrix[node1, node2_neighbors[1]]
         # ..., node2_neighbors[0], node2, node1, node1_neighbors[1]
         # 1                - n2n[0]_n2   - n2_n1
         # 2                              - n2_n1 (2x!) - n1_n1n[1]
@@ -257,21 +438,39 @@ class LocalSearchCandidateMoves:
         # correct = - n2n[0]_n2 - n2_n1 - n1_n1n[1]
         #           + n2n[0]_n1 + n1_n2 + n2_n1n[1]
         if node2 == node1_neighbors[0]:
-            return - self.tsp.distances_matrix[node2_neighbors[0]][node2] \
-                   - self.tsp.distances_matrix[node2][node1] \
-                   - self.tsp.distances_matrix[node1][node1_neighbors[1]] \
-                   + self.tsp.distances_matrix[node2_neighbors[0]][node1] \
-                   + self.tsp.distances_matrix[node1][node2] \
-                   + self.tsp.distances_matrix[node2][node1_neighbors[1]]
-
-        return - (self.tsp.distances_matrix[node1_neighbors[0]][node1] +
-                  self.tsp.distances_matrix[node1][node1_neighbors[1]]) \
-               - (self.tsp.distances_matrix[node2_neighbors[0]][node2] +
-                  self.tsp.distances_matrix[node2][node2_neighbors[1]]) \
-               + (self.tsp.distances_matrix[node1_neighbors[0]][node2] +
-                  self.tsp.distances_matrix[node2][node1_neighbors[1]]) \
-               + (self.tsp.distances_matrix[node2_neighbors[0]][node1] +
-                  self.tsp.distances_matrix[node1][node2_neighbors[1]])
+            return - self.tsp.distances_matrix[node2_neighbors[0], node2] \
+                   - self.tsp.distances_matrix[node2, node1] \
+                   - self.tsp.distances_matrix[node1, node1_neighbors[1]] \
+                   + self.tsp.distances_matrix[node2_neighbors[0], node1] \
+                   + self.tsp.distances_matrix[node1, node2] \
+                   + self.tsp.distances_matrix[node2, node1_neighbors[1]]
+
+        return - (self.tsp.distances_matrix[node1_neighbors[0], node1] +
+                  self.tsp.distances_matrix[node1, node1_neighbors[1]]) \
+               - (self.tsp.distances_matrix[node2_neighbors[0], node2] +
+                  self.tsp.distances_matrix[node2, node2_neighbors[1]]) \
+               + (self.tsp.distances_matrix[node1_neighbors[0], node2] +
+                  self.tsp.distances_matrix[node2, node1_neighbors[1]]) \
+               + (self.tsp.distances_matrix[node2_neighbors[0], node1] +
+                  self.tsp.distances_matrix[node1, node2_neighbors[1]])
+
+    def calculate_intra_nodes_objective_changes(self, node1, node1_neighbors, node2, node2_neighbors) -> np.ndarray:
+        # calculate_intra_nodes_objective_change for (broadcast) arrays of nodes, cases picked elementwise
+        d = self.tsp.distances_matrix
+        return np.where(
+            node1 == node2_neighbors[0],
+            - d[node1_neighbors[0], node1] - d[node1, node2] - d[node2, node2_neighbors[1]]
+            + d[node1_neighbors[0], node2] + d[node2, node1] + d[node1, node2_neighbors[1]],
+            np.where(
+                node2 == node1_neighbors[0],
+                - d[node2_neighbors[0], node2] - d[node2, node1] - d[node1, node1_neighbors[1]]
+                + d[node2_neighbors[0], node1] + d[node1, node2] + d[node2, node1_neighbors[1]],
+                - (d[node1_neighbors[0], node1] + d[node1, node1_neighbors[1]])
+                - (d[node2_neighbors[0], node2] + d[node2, node2_neighbors[1]])
+                + (d[node1_neighbors[0], node2] + d[node2, node1_neighbors[1]])
+                + (d[node2_neighbors[0], node1] + d[node1, node2_neighbors[1]])
+            )
+        )
 
     def add_intra_nodes(self, node1, node1_neighbors, node2, node2_neighbors):
         if self.local_search_type == LocalSearchType.STEEPEST:
@@ -287,10 +486,10 @@ class LocalSearchCandidateMoves:
             ))
 
     def calculate_intra_edges_objective_change(self, edge1_nodes, edge2_nodes) -> int:
-        return - self.tsp.distances_matrix[edge1_nodes[0]][edge1_nodes[1]] \
-               - self.tsp.distances_matrix[edge2_nodes[0]][edge2_nodes[1]] \
-               + self.tsp.distances_matrix[edge1_nodes[0]][edge2_nodes[0]] \
-               + self.tsp.distances_matrix[edge1_nodes[1]][edge2_nodes[1]]
+        return - self.tsp.distances_matrix[edge1_nodes[0], edge1_nodes[1]] \
+               - self.tsp.distances_matrix[edge2_nodes[0], edge2_nodes[1]] \
+               + self.tsp.distances_matrix[edge1_nodes[0], edge2_nodes[0]] \
+               + self.tsp.distances_matrix[edge1_nodes[1], edge2_nodes[1]]
 
     def add_intra_edges(self, edge1_nodes, edge2_nodes):
         """
@@ -316,11 +515,11 @@ class LocalSearchCandidateMoves:
     def calculate_inter_nodes_move_objective_change(
             self, node_in_cycle: int, non_cycle_node: int, neighbors: tuple[int, int]) -> int:
         return - (self.tsp.additional_costs[node_in_cycle] +
-                  self.tsp.distances_matrix[neighbors[0]][node_in_cycle] +
-                  self.tsp.distances_matrix[node_in_cycle][neighbors[1]]) \
+                  self.tsp.distances_matrix[neighbors[0], node_in_cycle] +
+                  self.tsp.distances_matrix[node_in_cycle, neighbors[1]]) \
                + (self.tsp.additional_costs[non_cycle_node] +
-                  self.tsp.distances_matrix[neighbors[0]][non_cycle_node] +
-                  self.tsp.distances_matrix[non_cycle_node][neighbors[1]])
+                  self.tsp.distances_matrix[neighbors[0], non_cycle_node] +
+                  self.tsp.distances_matrix[non_cycle_node, neighbors[1]])
 
     def add_inter_node_move(self, node_in_cycle: int, neighbors: tuple[int, int], non_cycle_node: int):
         if self.local_search_type == LocalSearchType.STEEPEST:
@@ -335,14 +534,18 @@ class LocalSearchCandidateMoves:
                 (node_in_cycle, non_cycle_node, neighbors)
             ))
 
-    def get_move(self) -> Tuple[int, MoveType, Tuple]:
+    def pop_random_move(self):
+        # note - the move gets swapped with the last one first, so that popping it is O(1)
+        move_idx = randrange(len(self.moves))
+        self.moves[move_idx], self.moves[-1] = self.moves[-1], self.moves[move_idx]
+        return self.moves.pop()
+
+    def get_move(self) -> Tuple[int, int, MoveType, Tuple]:
         match self.local_search_type:
             case LocalSearchType.STEEPEST:
-                objective_change, _, move_type, move_specification = heapq.heappop(self.moves)
-                return objective_change, move_type, move_specification
+                return heapq.heappop(self.moves)
             case LocalSearchType.GREEDY:
-                objective_change, _, move_type, move_specification = self.moves.pop(choice(range(len(self.moves))))
-                return objective_change, move_type, move_specification
+                return self.pop_random_move()
             case _:
                 raise Exception('no such local_search_type')
 
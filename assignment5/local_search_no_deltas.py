@@ -1,5 +1,5 @@
 from data_loader import TSP, SolutionTSP
-from random import choice
+from random import randrange
 from itertools import combinations, pairwise
 import heapq
 from typing import List, Tuple
@@ -13,6 +13,7 @@ from assignment3.local_search_types import (
     IntraRouteMovesType,
     MoveType,
 )
+from assignment3.local_search_telemetry import LocalSearchTelemetry
 
 
 def local_search_no_deltas_solve(
@@ -22,13 +23,15 @@ def local_search_no_deltas_solve(
         intra_route_move_type: IntraRouteMovesType = IntraRouteMovesType.TWO_NODES,
         starting_node: int = None,  # in case of RANDOM start - initial seed
         starting_solution: SolutionTSP | None = None,  # in case provided, used instead of generating starting solution
+        collect_telemetry: bool = False,
 ) -> tuple[SolutionTSP, dict]:
     return LocalSearchNoDeltas(tsp=tsp,
                                local_search_type=local_search_type,
                                starting_solution_type=starting_solution_type,
                                intra_route_move_type=intra_route_move_type,
                                starting_node=starting_node,
-                               starting_solution=starting_solution).solve()
+                               starting_solution=starting_solution,
+                               collect_telemetry=collect_telemetry).solve()
 
 
 class LocalSearchNoDeltas:
@@ -38,6 +41,7 @@ class LocalSearchNoDeltas:
                  intra_route_move_type: IntraRouteMovesType = IntraRouteMovesType.TWO_NODES,
                  starting_node: int = None,  # in case of RANDOM start - initial seed
                  starting_solution: SolutionTSP | None = None,  # in case provided, used instead of generating starting solution
+                 collect_telemetry: bool = False,
                  ):
         self.tsp: TSP = tsp
         self.local_search_type: LocalSearchType = local_search_type
@@ -59,23 +63,37 @@ class LocalSearchNoDeltas:
 
         self.cycle = self.initial_solution.nodes
         self.objective = self.initial_solution.objective_function
-        self.not_selected_nodes = [node for node in tsp.nodes if node not in self.cycle]
         self.last_cycle_idx = len(self.cycle) - 1
+        # note - position of every node in cycle (-1 if not selected) and selected nodes bitmap, kept up to date
+        #  with every move made, so that cycle is never searched
+        self.node_positions: List[int] = [-1] * len(tsp.nodes)
+        self.is_selected = bytearray(len(tsp.nodes))
+        for position, node in enumerate(self.cycle):
+            self.node_positions[node] = position
+            self.is_selected[node] = True
+        # note - dict as ordered set, iterated in the same order as the list used to be
+        self.not_selected_nodes = dict.fromkeys(node for node in tsp.nodes if not self.is_selected[node])
         self.moves: List[Tuple[int, int, MoveType, Tuple]] = list()
 
         self.inter_nodes_exchanges_count: int = 0
         self.intra_two_nodes_count: int = 0
         self.intra_two_edges_count: int = 0
         self.moves_evaluated_count: int = 0
+        self.telemetry = LocalSearchTelemetry(enabled=collect_telemetry)
 
     def solve(self) -> tuple[SolutionTSP, dict]:
+        timer_start = self.telemetry.start_timer()
         self.initialize_moves()
+        self.telemetry.stop_timer('initialize_moves', timer_start)
+        timer_start = self.telemetry.start_timer()
         while self.moves:
-            self.make_move(self.get_move())
+            self.telemetry.measure_move(lambda: self.make_move(self.get_move()),
+                                        self.get_made_moves_counts, queue_size=len(self.moves))
+        self.telemetry.stop_timer('main_loop', timer_start)
 
         total_moves = self.inter_nodes_exchanges_count + self.intra_two_nodes_count + self.intra_two_edges_count
 
-        return self.tsp.calculate_solution(self.cycle), {
+        return self.tsp.calculate_solution(self.cycle, objective_function=self.objective), {
             'total_moves': total_moves,
             'moves_evaluated': self.moves_evaluated_count,
             'inter_nodes_exchanges_count': self.inter_nodes_exchanges_count,
@@ -84,15 +102,19 @@ class LocalSearchNoDeltas:
             'inter_nodes_exchanges_percentage': None if total_moves == 0 else round(self.inter_nodes_exchanges_count / total_moves, 2),
             'intra_two_nodes_percentage': None if total_moves == 0 else round(self.intra_two_nodes_count / total_moves, 2),
             'intra_two_edges_percentage': None if total_moves == 0 else round(self.intra_two_edges_count / total_moves, 2),
+            **self.telemetry.get_stats(self.moves_evaluated_count),
         }
 
+    def get_made_moves_counts(self) -> Tuple[int, int, int]:
+        return self.inter_nodes_exchanges_count, self.intra_two_nodes_count, self.intra_two_edges_count
+
     def add_move_if_improves(self, move: Tuple[int, MoveType, Tuple]):
         self.moves_evaluated_count += 1
         objective_change, move_type, move_specification = move
         if objective_change >= 0:
             return
         move_on_queue = (objective_change, self.moves_evaluated_count, move_type, move_specification)
-        if self.local_search_type.STEEPEST:
+        if self.local_search_type == LocalSearchType.STEEPEST:
             heapq.heappush(self.moves, move_on_queue)
         else:
             self.moves.append(move_on_queue)
@@ -103,7 +125,7 @@ class LocalSearchNoDeltas:
         self.moves.append(move_on_queue)
 
     def get_connected_nodes(self, node: int):
-        place_in_cycle = self.cycle.index(node)
+        place_in_cycle = self.node_positions[node]
         if place_in_cycle == 0:
             return self.cycle[-1], self.cycle[1]
         elif place_in_cycle == self.last_cycle_idx:
@@ -111,6 +133,24 @@ class LocalSearchNoDeltas:
         else:
             return self.cycle[place_in_cycle - 1], self.cycle[place_in_cycle + 1]
 
+    def exchange_node(self, old_node: int, new_node: int):
+        exchange_idx = self.node_positions[old_node]
+        self.cycle[exchange_idx] = new_node
+        self.node_positions[new_node], self.node_positions[old_node] = exchange_idx, -1
+        self.is_selected[new_node], self.is_selected[old_node] = True, False
+        del self.not_selected_nodes[new_node]
+        self.not_selected_nodes[old_node] = None
+
+    def swap_nodes(self, node1: int, node2: int):
+        node1_idx, node2_idx = self.node_positions[node1], self.node_positions[node2]
+        self.cycle[node1_idx], self.cycle[node2_idx] = node2, node1
+        self.node_positions[node1], self.node_positions[node2] = node2_idx, node1_idx
+
+    def update_node_positions(self, start_idx: int, end_idx: int):
+        # after nodes in cycle[start_idx:end_idx] changed places
+        for idx in range(start_idx, end_idx):
+            self.node_positions[self.cycle[idx]] = idx
+
     def initialize_moves(self):
         # - generate all possible inter nodes exchange
         for node_in_cycle in self.cycle:
@@ -132,23 +172,19 @@ class LocalSearchNoDeltas:
             case MoveType.INTER_NODES_EXCHANGE:
                 old_node, new_node, move_neighbors = move_specification
                 # make move
-                exchange_idx = self.cycle.index(old_node)
-                self.cycle[exchange_idx] = new_node
-                self.not_selected_nodes.remove(new_node)
-                self.not_selected_nodes.append(old_node)
+                self.exchange_node(old_node, new_node)
                 self.objective += objective_change
                 self.inter_nodes_exchanges_count += 1
             case MoveType.INTRA_TWO_NODES:
                 node1, node2, node1_neighbors, node2_neighbors = move_specification
                 # make move
-                node1_idx, node2_idx = self.cycle.index(node1), self.cycle.index(node2)
-                self.cycle[node1_idx], self.cycle[node2_idx] = node2, node1
+                self.swap_nodes(node1, node2)
                 self.objective += objective_change
                 self.intra_two_nodes_count += 1
             case MoveType.INTRA_TWO_EDGES:
                 edge1_nodes, edge2_nodes = move_specification
                 # make move
-                edge1_idx, edge2_idx = self.cycle.index(edge1_nodes[0]), self.cycle.index(edge2_nodes[0])
+                edge1_idx, edge2_idx = self.node_positions[edge1_nodes[0]], self.node_positions[edge2_nodes[0]]
                 if edge1_idx < edge2_idx:
                     left_idx, right_idx = edge1_idx, edge2_idx
                 else:
@@ -162,6 +198,7 @@ class LocalSearchNoDeltas:
                     else:
                         right.append(node)
                 self.cycle = left + middle[::-1] + right
+                self.update_node_positions(left_idx + 1, right_idx + 1)
                 self.objective += objective_change
                 self.intra_two_edges_count += 1
         # re-initialize all moves
@@ -273,13 +310,19 @@ class LocalSearchNoDeltas:
                     (node_in_cycle, non_cycle_node, neighbors)
                 ))
 
+    def pop_random_move(self):
+        # note - the move gets swapped with the last one first, so that popping it is O(1)
+        move_idx = randrange(len(self.moves))
+        self.moves[move_idx], self.moves[-1] = self.moves[-1], self.moves[move_idx]
+        return self.moves.pop()
+
     def get_move(self) -> Tuple[int, MoveType, Tuple]:
         match self.local_search_type:
             case LocalSearchType.STEEPEST:
                 objective_change, _, move_type, move_specification = heapq.heappop(self.moves)
                 return objective_change, move_type, move_specification
             case LocalSearchType.GREEDY:
-                objective_change, _, move_type, move_specification = self.moves.pop(choice(range(len(self.moves))))
+                objective_change, _, move_type, move_specification = self.pop_random_move()
                 return objective_change, move_type, move_specification
             case _:
                 raise Exception('no such local_search_type')
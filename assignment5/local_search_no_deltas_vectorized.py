@@ -0,0 +1,216 @@
+from data_loader import TSP, SolutionTSP
+import numpy as np
+from time import time
+
+from assignment1.random_solution import random_solve
+from assignment1.nearest_neighbor_at_any import nearest_neighbor_at_any_solve
+from assignment3.local_search_types import (
+    LocalSearchType,
+    StartingSolutionType,
+    IntraRouteMovesType,
+    MoveType,
+)
+from assignment3.local_search_telemetry import LocalSearchTelemetry
+
+# objective change of moves that are not in the neighborhood (e.g. lower triangle of symmetric intra moves)
+NOT_A_MOVE = np.iinfo(np.int64).max
+
+
+def local_search_no_deltas_vectorized_solve(
+        tsp: TSP,
+        starting_solution_type: StartingSolutionType = StartingSolutionType.RANDOM,
+        intra_route_move_type: IntraRouteMovesType = IntraRouteMovesType.TWO_NODES,
+        starting_node: int = None,  # in case of RANDOM start - initial seed
+        starting_solution: SolutionTSP | None = None,  # in case provided, used instead of generating starting solution
+        collect_telemetry: bool = False,
+) -> tuple[SolutionTSP, dict]:
+    return LocalSearchNoDeltasVectorized(tsp=tsp,
+                                         starting_solution_type=starting_solution_type,
+                                         intra_route_move_type=intra_route_move_type,
+                                         starting_node=starting_node,
+                                         starting_solution=starting_solution,
+                                         collect_telemetry=collect_telemetry).solve()
+
+
+class LocalSearchNoDeltasVectorized:
+    """
+    Steepest local search, which evaluates the whole neighborhood of the current cycle at every iteration - but
+    as matrices of objective changes computed by numpy, instead of move by move:
+    - inter nodes exchanges, [position in cycle][not selected node]
+    - two nodes swaps or two edges exchanges, [position in cycle][position in cycle] (upper triangle)
+    The best move (first one of them, in case of ties) is made, until none of them improves.
+
+    Unlike LocalSearchNoDeltas, edges include the one closing the cycle, and moves are evaluated with the actual
+    neighbors of both nodes - the neighborhood is exactly all 2-node swaps / 2-opt moves of the cycle.
+    Matrices take O(n^2) memory.
+    """
+    def __init__(self, tsp: TSP,
+                 starting_solution_type: StartingSolutionType = StartingSolutionType.RANDOM,
+                 intra_route_move_type: IntraRouteMovesType = IntraRouteMovesType.TWO_NODES,
+                 starting_node: int = None,  # in case of RANDOM start - initial seed
+                 starting_solution: SolutionTSP | None = None,  # in case provided, used instead of generating starting solution
+                 collect_telemetry: bool = False,
+                 ):
+        self.tsp: TSP = tsp
+        self.local_search_type: LocalSearchType = LocalSearchType.STEEPEST
+        self.starting_solution_type: StartingSolutionType = starting_solution_type
+        self.intra_route_move_type: IntraRouteMovesType = intra_route_move_type
+        self.starting_node: int = starting_node
+
+        self.initial_solution: SolutionTSP
+        if starting_solution:
+            self.initial_solution = starting_solution
+        else:
+            match starting_solution_type:
+                case StartingSolutionType.RANDOM:
+                    self.initial_solution = random_solve(tsp, initial_seed=starting_node)
+                case StartingSolutionType.GREEDY:
+                    self.initial_solution = nearest_neighbor_at_any_solve(tsp, starting_node=starting_node)
+                case _:
+                    raise Exception('no such starting_solution_type')
+
+        self.cycle: np.ndarray = np.array(self.initial_solution.nodes, dtype=np.int64)
+        self.objective = self.initial_solution.objective_function
+        is_selected = np.zeros(len(tsp.nodes), dtype=bool)
+        is_selected[self.cycle] = True
+        self.not_selected_nodes: np.ndarray = np.flatnonzero(~is_selected)
+        self.additional_costs: np.ndarray = np.asarray(tsp.additional_costs, dtype=np.int64)
+        # note - positions of moves made by intra moves, [i][j] for i < j
+        self.upper_triangle: np.ndarray = np.triu(np.ones((len(self.cycle),) * 2, dtype=bool), k=1)
+
+        self.inter_nodes_exchanges_count: int = 0
+        self.intra_two_nodes_count: int = 0
+        self.intra_two_edges_count: int = 0
+        self.moves_evaluated_count: int = 0
+        self.telemetry = LocalSearchTelemetry(enabled=collect_telemetry)
+
+    def solve(self) -> tuple[SolutionTSP, dict]:
+        timer_start = self.telemetry.start_timer()
+        while self.telemetry.measure_move(self.make_best_move_if_improves, self.get_made_moves_counts):
+            pass
+        self.telemetry.stop_timer('main_loop', timer_start)
+
+        total_moves = self.inter_nodes_exchanges_count + self.intra_two_nodes_count + self.intra_two_edges_count
+
+        return self.tsp.calculate_solution(self.cycle.tolist(), objective_function=self.objective), {
+            'total_moves': total_moves,
+            'moves_evaluated': self.moves_evaluated_count,
+            'inter_nodes_exchanges_count': self.inter_nodes_exchanges_count,
+            'intra_two_nodes_count': self.intra_two_nodes_count,
+            'intra_two_edges_count': self.intra_two_edges_count,
+            'inter_nodes_exchanges_percentage': None if total_moves == 0 else round(self.inter_nodes_exchanges_count / total_moves, 2),
+            'intra_two_nodes_percentage': None if total_moves == 0 else round(self.intra_two_nodes_count / total_moves, 2),
+            'intra_two_edges_percentage': None if total_moves == 0 else round(self.intra_two_edges_count / total_moves, 2),
+            **self.telemetry.get_stats(self.moves_evaluated_count),
+        }
+
+    def get_made_moves_counts(self) -> tuple[int, int, int]:
+        return self.inter_nodes_exchanges_count, self.intra_two_nodes_count, self.intra_two_edges_count
+
+    def make_best_move_if_improves(self) -> bool:
+        # distances between nodes of cycle, [position][position], with the previous / next node of each
+        cycle_distances = np.asarray(
+            self.tsp.distances_matrix[self.cycle[:, None], self.cycle[None, :]], dtype=np.int64)
+        previous_cycle_distances = np.roll(cycle_distances, 1, axis=0)  # [i][j] from node before i to j
+        next_cycle_distances = np.roll(cycle_distances, -1, axis=1)  # [i][j] from i to node after j
+
+        inter_objective_changes = self.calculate_inter_nodes_objective_changes(
+            previous_cycle_distances, next_cycle_distances)
+        match self.intra_route_move_type:
+            case IntraRouteMovesType.TWO_NODES:
+                intra_move_type = MoveType.INTRA_TWO_NODES
+                intra_objective_changes = self.calculate_intra_nodes_objective_changes(
+                    cycle_distances, previous_cycle_distances, next_cycle_distances)
+            case IntraRouteMovesType.TWO_EDGES:
+                intra_move_type = MoveType.INTRA_TWO_EDGES
+                intra_objective_changes = self.calculate_intra_edges_objective_changes(
+                    cycle_distances, next_cycle_distances)
+            case _:
+                raise Exception('no such intra_route_move_type')
+        intra_objective_changes = np.where(self.upper_triangle, intra_objective_changes, NOT_A_MOVE)
+        self.moves_evaluated_count += inter_objective_changes.size + int(np.count_nonzero(self.upper_triangle))
+
+        # note - inter nodes exchanges first, as they would be evaluated move by move
+        inter_best = np.unravel_index(np.argmin(inter_objective_changes), inter_objective_changes.shape)
+        intra_best = np.unravel_index(np.argmin(intra_objective_changes), intra_objective_changes.shape)
+        if inter_objective_changes[inter_best] <= intra_objective_changes[intra_best]:
+            move_type, (i, j), objective_change = MoveType.INTER_NODES_EXCHANGE, inter_best, inter_objective_changes[inter_best]
+        else:
+            move_type, (i, j), objective_change = intra_move_type, intra_best, intra_objective_changes[intra_best]
+        if objective_change >= 0:
+            return False
+
+        match move_type:
+            case MoveType.INTER_NODES_EXCHANGE:
+                self.cycle[i], self.not_selected_nodes[j] = self.not_selected_nodes[j], self.cycle[i]
+                self.inter_nodes_exchanges_count += 1
+            case MoveType.INTRA_TWO_NODES:
+                self.cycle[[i, j]] = self.cycle[[j, i]]
+                self.intra_two_nodes_count += 1
+            case MoveType.INTRA_TWO_EDGES:
+                # edges after positions i and j get exchanged - nodes in between are reversed
+                self.cycle[i + 1:j + 1] = self.cycle[i + 1:j + 1][::-1]
+                self.intra_two_edges_count += 1
+        self.objective += int(objective_change)
+        return True
+
+    def calculate_inter_nodes_objective_changes(self, previous_cycle_distances: np.ndarray,
+                                                next_cycle_distances: np.ndarray) -> np.ndarray:
+        # [position in cycle][index of not selected node]
+        previous_nodes, next_nodes = np.roll(self.cycle, 1), np.roll(self.cycle, -1)
+        removal_objective_changes = \
+            - (self.additional_costs[self.cycle] +
+               np.diagonal(previous_cycle_distances) +
+               np.diagonal(next_cycle_distances))
+        insertion_objective_changes = \
+            self.additional_costs[self.not_selected_nodes][None, :] + \
+            np.asarray(self.tsp.distances_matrix[previous_nodes[:, None], self.not_selected_nodes[None, :]],
+                       dtype=np.int64) + \
+            np.asarray(self.tsp.distances_matrix[self.not_selected_nodes[None, :], next_nodes[:, None]],
+                       dtype=np.int64)
+        return removal_objective_changes[:, None] + insertion_objective_changes
+
+    @staticmethod
+    def calculate_intra_nodes_objective_changes(cycle_distances: np.ndarray, previous_cycle_distances: np.ndarray,
+                                                next_cycle_distances: np.ndarray) -> np.ndarray:
+        """
+        [position i][position j] - node i gets between neighbors of node j and vice versa:
+        - (prev_i_i + i_next_i) - (prev_j_j + j_next_j) + (prev_i_j + j_next_i) + (prev_j_i + i_next_j)
+
+        For neighboring i and j, edge between them is subtracted twice and nodes "connect to themselves", so it is
+        added back (both ways).
+        """
+        node_edges = np.diagonal(previous_cycle_distances) + np.diagonal(next_cycle_distances)
+        # [i][j] = prev_i_j + i_next_j
+        crossed_edges = previous_cycle_distances + next_cycle_distances
+        objective_changes = - node_edges[:, None] - node_edges[None, :] + crossed_edges + crossed_edges.T
+        positions = np.arange(len(cycle_distances))
+        for i, j in ((positions, np.roll(positions, -1)), (np.roll(positions, -1), positions)):
+            objective_changes[i, j] += cycle_distances[i, j] + cycle_distances[j, i]
+        return objective_changes
+
+    @staticmethod
+    def calculate_intra_edges_objective_changes(cycle_distances: np.ndarray,
+                                                next_cycle_distances: np.ndarray) -> np.ndarray:
+        """
+        [position i][position j] - edges (i, next_i) and (j, next_j) get replaced with (i, j) and (next_i, next_j)
+        """
+        edges = np.diagonal(next_cycle_distances)
+        # [i][j] = next_i_next_j
+        next_nodes_distances = np.roll(next_cycle_distances, -1, axis=0)
+        return - edges[:, None] - edges[None, :] + cycle_distances + next_nodes_distances
+
+
+if __name__ == "__main__":
+    tsp = TSP.load_tspa(data_folder='../data')
+    t0 = time()
+    solution, stats = local_search_no_deltas_vectorized_solve(
+        tsp,
+        starting_solution_type=StartingSolutionType.GREEDY,
+        intra_route_move_type=IntraRouteMovesType.TWO_EDGES,
+    )
+    t1 = time()
+    print(f'execution_time: {t1 - t0}')
+    print(stats)
+    print(solution)
+    tsp.visualize_solution(solution, method_name='local_search_no_deltas_vectorized')
@@ -1,8 +1,11 @@
 from data_loader import TSP, SolutionTSP
-from random import choice
-from itertools import combinations, pairwise
+from tour import ArrayTour, TwoLevelListTour
+from random import randrange
+from collections import deque
+from itertools import combinations
 import heapq
-from typing import List, Tuple
+import numpy as np
+from typing import List, Sequence, Tuple
 from time import time
 
 from assignment1.random_solution import random_solve
@@ -13,6 +16,26 @@ from assignment3.local_search_types import (
     IntraRouteMovesType,
     MoveType,
 )
+from assignment3.local_search_telemetry import LocalSearchTelemetry
+
+
+# from this number of nodes in cycle, it's kept as two-level list - reversals are cheaper than list rebuilding
+TWO_LEVEL_LIST_MIN_NODES = 2_000
+
+# move on queue is a single int: objective_change | moves_evaluated_count | nodes | move type (from most significant
+# bits) - so ints compare just like (objective_change, moves_evaluated_count) tuples used to, and are not tracked by GC
+MOVE_TYPE_BITS = 2
+MOVES_EVALUATED_COUNT_BITS = 40
+MOVE_TYPES = (None, *MoveType)  # by value
+MOVE_NODES_COUNT = {MoveType.INTER_NODES_EXCHANGE: 4, MoveType.INTRA_TWO_NODES: 6, MoveType.INTRA_TWO_EDGES: 4}
+MOVES_EVALUATED_COUNT_MASK = (1 << MOVES_EVALUATED_COUNT_BITS) - 1
+
+# queue of moves gets rebuilt from the moves still valid, once more than this part of it is stale - estimated every
+# QUEUE_COMPACTION_CHECK_INTERVAL popped moves, from a sample of moves evenly spread over the heap
+QUEUE_COMPACTION_STALE_RATIO = 0.5
+QUEUE_COMPACTION_CHECK_INTERVAL = 256
+QUEUE_COMPACTION_SAMPLE_SIZE = 16
+QUEUE_COMPACTION_MIN_SIZE = 1_024
 
 
 def local_search_with_deltas_solve(
@@ -22,13 +45,21 @@ def local_search_with_deltas_solve(
         intra_route_move_type: IntraRouteMovesType = IntraRouteMovesType.TWO_NODES,
         starting_node: int | None = None,  # in case of RANDOM start - initial seed
         starting_solution: SolutionTSP | None = None,  # in case provided, used instead of generating starting solution
+        use_two_level_list: bool | None = None,  # by default, depending on TWO_LEVEL_LIST_MIN_NODES
+        use_dont_look_bits: bool = False,
+        max_queue_size: int | None = None,  # in case provided, only the best moves are kept in queue above it (steepest)
+        collect_telemetry: bool = False,
 ) -> tuple[SolutionTSP, dict]:
     return LocalSearchWithDeltas(tsp=tsp,
                                  local_search_type=local_search_type,
                                  starting_solution_type=starting_solution_type,
                                  intra_route_move_type=intra_route_move_type,
                                  starting_node=starting_node,
-                                 starting_solution=starting_solution).solve()
+                                 starting_solution=starting_solution,
+                                 use_two_level_list=use_two_level_list,
+                                 use_dont_look_bits=use_dont_look_bits,
+                                 max_queue_size=max_queue_size,
+                                 collect_telemetry=collect_telemetry).solve()
 
 #TODO - check both ways AND if value is still the same?? (not value same - but if neighbors are also the same)
 class LocalSearchWithDeltas:
@@ -38,6 +69,10 @@ class LocalSearchWithDeltas:
                  intra_route_move_type: IntraRouteMovesType = IntraRouteMovesType.TWO_NODES,
                  starting_node: int = None,  # in case of RANDOM start - initial seed
                  starting_solution: SolutionTSP | None = None,  # in case provided, used instead of generating starting solution
+                 use_two_level_list: bool | None = None,  # by default, depending on TWO_LEVEL_LIST_MIN_NODES
+                 use_dont_look_bits: bool = False,
+                 max_queue_size: int | None = None,  # in case provided, only the best moves are kept in queue above it (steepest)
+                 collect_telemetry: bool = False,
                  ):
         self.tsp: TSP = tsp
         self.local_search_type: LocalSearchType = local_search_type
@@ -57,28 +92,70 @@ class LocalSearchWithDeltas:
                 case _:
                     raise Exception('no such starting_solution_type')
 
-        self.cycle = self.initial_solution.nodes
+        cycle = [int(node) for node in self.initial_solution.nodes]  # note - python ints, they get packed into moves
+        if use_two_level_list is None:
+            use_two_level_list = len(cycle) >= TWO_LEVEL_LIST_MIN_NODES
+        # note - tour knows position, next and previous node of every node in cycle, selected nodes bitmap is kept
+        #  up to date with it, so that cycle is never searched
+        self.tour: ArrayTour | TwoLevelListTour = (TwoLevelListTour if use_two_level_list else ArrayTour)(
+            cycle, len(tsp.nodes))
         self.objective = self.initial_solution.objective_function
-        self.not_selected_nodes = [node for node in tsp.nodes if node not in self.cycle]
-        self.last_cycle_idx = len(self.cycle) - 1
-        self.moves: List[Tuple[int, int, MoveType, Tuple]] = list()
-        self.preserved_moves: List[Tuple[int, int, MoveType, Tuple]] = list()
+        self.is_selected = bytearray(len(tsp.nodes))
+        for node in cycle:
+            self.is_selected[node] = True
+        # note - dict as ordered set, iterated in the same order as the list used to be
+        self.not_selected_nodes = dict.fromkeys(node for node in tsp.nodes if not self.is_selected[node])
+        self.moves: List[int] = list()  # encoded, see MOVE_TYPE_BITS
+        self.preserved_moves: List[int] = list()
+        self.node_bits: int = max(len(tsp.nodes) - 1, 1).bit_length()
+        self.node_mask: int = (1 << self.node_bits) - 1
+        self.nodes_shift: int = MOVE_TYPE_BITS + max(MOVE_NODES_COUNT.values()) * self.node_bits
+        self.objective_change_shift: int = self.nodes_shift + MOVES_EVALUATED_COUNT_BITS
 
         self.inter_nodes_exchanges_count: int = 0
         self.intra_two_nodes_count: int = 0
         self.intra_two_edges_count: int = 0
         self.moves_evaluated_count: int = 0
+        self.telemetry = LocalSearchTelemetry(enabled=collect_telemetry)
+
+        # don't look bits - instead of keeping all improving moves, moves of a single active node are evaluated at
+        # a time. Node stays inactive (its bit set) until a move changes its neighbors, or takes it out of cycle
+        self.use_dont_look_bits: bool = use_dont_look_bits
+        self.dont_look_bits = bytearray(len(tsp.nodes))
+        self.active_nodes: deque[int] = deque(cycle)
+
+        # version stamp of every node - moves_evaluated_count at the time a move changed its neighbors (or took it in
+        # or out of cycle). Moves evaluated before that are stale, see is_node_move_valid
+        self.node_versions: List[int] = [0] * len(tsp.nodes)
+        if max_queue_size is not None and local_search_type != LocalSearchType.STEEPEST:
+            raise Exception('max_queue_size is supported only with steepest local search')
+        self.max_queue_size: int | None = max_queue_size
+        self.pops_to_compaction_check: int = QUEUE_COMPACTION_CHECK_INTERVAL
 
     def solve(self) -> tuple[SolutionTSP, dict]:
-        self.initialize_moves()
-        # print()
-        while self.moves:
-            self.make_move_if_possible()
-            # print(f'\r{self.tsp.calculate_solution(self.cycle).objective_function}', end='', flush=True)
+        if self.use_dont_look_bits:
+            timer_start = self.telemetry.start_timer()
+            self.search_active_nodes()
+            self.telemetry.stop_timer('main_loop', timer_start)
+        else:
+            timer_start = self.telemetry.start_timer()
+            self.initialize_moves()
+            if self.max_queue_size is not None and len(self.moves) > self.max_queue_size:
+                self.compact_moves()
+            self.telemetry.stop_timer('initialize_moves', timer_start)
+            timer_start = self.telemetry.start_timer()
+            # print()
+            while self.moves:
+                self.telemetry.measure_move(self.make_move_if_possible, self.get_made_moves_counts,
+                                            queue_size=len(self.moves))
+                if self.local_search_type == LocalSearchType.STEEPEST:
+                    self.compact_moves_if_needed()
+                # print(f'\r{self.tsp.calculate_solution(self.tour.sequence()).objective_function}', end='', flush=True)
+            self.telemetry.stop_timer('main_loop', timer_start)
 
         total_moves = self.inter_nodes_exchanges_count + self.intra_two_nodes_count + self.intra_two_edges_count
 
-        return self.tsp.calculate_solution(self.cycle), {
+        return self.tsp.calculate_solution(self.tour.sequence(), objective_function=self.objective), {
             'total_moves': total_moves,
             'moves_evaluated': self.moves_evaluated_count,
             'inter_nodes_exchanges_count': self.inter_nodes_exchanges_count,
@@ -87,192 +164,326 @@ class LocalSearchWithDeltas:
             'inter_nodes_exchanges_percentage': None if total_moves == 0 else round(self.inter_nodes_exchanges_count / total_moves, 2),
             'intra_two_nodes_percentage': None if total_moves == 0 else round(self.intra_two_nodes_count / total_moves, 2),
             'intra_two_edges_percentage': None if total_moves == 0 else round(self.intra_two_edges_count / total_moves, 2),
+            **self.telemetry.get_stats(self.moves_evaluated_count),
         }
 
+    def search_active_nodes(self):
+        while self.active_nodes:
+            node = self.active_nodes.popleft()
+            self.dont_look_bits[node] = True
+            # all moves of the node - the best one is made (or random improving one, with greedy)
+            self.moves, self.preserved_moves = list(), list()
+            if not self.is_selected[node]:
+                self.add_inter_nodes_moves_of_non_cycle_node(node)
+            else:
+                self.add_inter_nodes_moves(node_in_cycle=node, neighbors=self.get_connected_nodes(node))
+                if self.intra_route_move_type == IntraRouteMovesType.TWO_NODES:
+                    self.add_intra_nodes_moves(((node, self.get_connected_nodes(node)),))
+                if self.intra_route_move_type == IntraRouteMovesType.TWO_EDGES:
+                    previous_node, next_node = self.get_connected_nodes(node)
+                    self.add_intra_edges_moves(((previous_node, node), (node, next_node)))
+            made_moves_count = self.count_made_moves()
+            while self.moves and self.count_made_moves() == made_moves_count:
+                self.telemetry.measure_move(self.make_move_if_possible, self.get_made_moves_counts,
+                                            queue_size=len(self.moves))
+        self.moves = list()
+
+    def activate_nodes(self, nodes: Sequence[int]):
+        # resets don't look bits of nodes, which neighbors were changed by a move
+        for node in nodes:
+            if self.dont_look_bits[node]:
+                self.dont_look_bits[node] = False
+                self.active_nodes.append(node)
+
+    def count_made_moves(self) -> int:
+        return self.inter_nodes_exchanges_count + self.intra_two_nodes_count + self.intra_two_edges_count
+
+    def get_made_moves_counts(self) -> Tuple[int, int, int]:
+        return self.inter_nodes_exchanges_count, self.intra_two_nodes_count, self.intra_two_edges_count
+
+    def stamp_nodes(self, nodes: Sequence[int]):
+        # new versions of nodes, which neighbors were changed by a move
+        for node in nodes:
+            self.node_versions[node] = self.moves_evaluated_count
+
+    def is_node_move_valid(self, move: int, move_type: MoveType, nodes: List[int]) -> bool:
+        """
+        Inter nodes exchange or two nodes swap stays valid (with the same objective change), while both of its nodes
+        are in / out of cycle and have the same neighbors as when it was evaluated - in any order, as distances are
+        symmetric. With steepest, that's checked by version stamps of both nodes in O(1).
+        Moves of greedy are not evaluated when queued (and share moves_evaluated_count), so they are checked against
+        the cycle itself - with neighbors in the same order.
+        """
+        if self.local_search_type == LocalSearchType.STEEPEST:
+            moves_evaluated_count = (move >> self.nodes_shift) & MOVES_EVALUATED_COUNT_MASK
+            return self.node_versions[nodes[0]] < moves_evaluated_count > self.node_versions[nodes[1]]
+        node1, node2, *neighbors = nodes
+        if move_type == MoveType.INTER_NODES_EXCHANGE:
+            return self.is_selected[node1] and (not self.is_selected[node2]) and \
+                tuple(neighbors) == self.get_connected_nodes(node1)
+        return self.is_selected[node1] and self.is_selected[node2] and \
+            tuple(neighbors[:2]) == self.get_connected_nodes(node1) and \
+            tuple(neighbors[2:]) == self.get_connected_nodes(node2)
+
+    def is_move_stale(self, move: int) -> bool:
+        # note - two edges exchange with an edge reversed isn't stale, it may get valid again
+        _, move_type, nodes = self.decode_move(move)
+        if move_type == MoveType.INTRA_TWO_EDGES:
+            return not (any(self.get_edge_presence(tuple(nodes[:2]))) and any(self.get_edge_presence(tuple(nodes[2:]))))
+        return not self.is_node_move_valid(move, move_type, nodes)
+
+    def compact_moves_if_needed(self):
+        """
+        Stale moves are otherwise found only when popped - queue gets rebuilt from valid moves once most of it is
+        stale, or it's above max_queue_size (then only the best max_queue_size moves are kept).
+        note - max_queue_size is kept after initialization of moves and then checked every
+        QUEUE_COMPACTION_CHECK_INTERVAL popped moves, in between queue may get above it
+        Only with steepest - moves of greedy are not evaluated (and not ordered) when queued, so there are no best
+        ones to keep, and they get checked against the cycle when popped at random anyway.
+        """
+        self.pops_to_compaction_check -= 1
+        if self.pops_to_compaction_check > 0:
+            return
+        self.pops_to_compaction_check = QUEUE_COMPACTION_CHECK_INTERVAL
+        is_above_max_size = self.max_queue_size is not None and len(self.moves) > self.max_queue_size
+        if len(self.moves) < QUEUE_COMPACTION_MIN_SIZE and not is_above_max_size:
+            return
+        sampled_moves = [self.moves[i * len(self.moves) // QUEUE_COMPACTION_SAMPLE_SIZE]
+                         for i in range(QUEUE_COMPACTION_SAMPLE_SIZE)]
+        stale_ratio = sum(map(self.is_move_stale, sampled_moves)) / QUEUE_COMPACTION_SAMPLE_SIZE
+        if stale_ratio > QUEUE_COMPACTION_STALE_RATIO or is_above_max_size:
+            self.compact_moves()
+
+    def compact_moves(self):
+        self.moves = [move for move in self.moves if not self.is_move_stale(move)]
+        heapq.heapify(self.moves)
+        if self.max_queue_size is not None and len(self.moves) > self.max_queue_size:
+            self.moves = heapq.nsmallest(self.max_queue_size, self.moves)  # note - sorted list is a heap
+
     def add_preserved_moves_back(self):
-        self.moves = self.preserved_moves + self.moves
+        # note - pushed one by one, so that the heap stays a heap (and steepest pops the best move) - each of them was
+        #  popped since the last move made, so it's O(log n) per preserved move, no copying of the whole queue
+        if self.local_search_type == LocalSearchType.STEEPEST:
+            for move in self.preserved_moves:
+                heapq.heappush(self.moves, move)
+        else:
+            self.moves.extend(self.preserved_moves)
         self.preserved_moves = list()
 
-    def add_move_if_improves(self, move: Tuple[int, MoveType, Tuple]):
+    def encode_move(self, objective_change: int, move_type: MoveType, nodes: Sequence[int],
+                    moves_evaluated_count: int) -> int:
+        encoded_nodes = 0
+        for node in reversed(nodes):
+            encoded_nodes = (encoded_nodes << self.node_bits) | node
+        return (((int(objective_change) << MOVES_EVALUATED_COUNT_BITS) | moves_evaluated_count)
+                << self.nodes_shift) | (encoded_nodes << MOVE_TYPE_BITS) | move_type.value
+
+    def decode_move(self, move: int) -> Tuple[int, MoveType, List[int]]:
+        move_type = MOVE_TYPES[move & ((1 << MOVE_TYPE_BITS) - 1)]
+        encoded_nodes = move >> MOVE_TYPE_BITS
+        nodes = list()
+        for _ in range(MOVE_NODES_COUNT[move_type]):
+            nodes.append(encoded_nodes & self.node_mask)
+            encoded_nodes >>= self.node_bits
+        # note - arithmetic shift, negative objective_change comes back as it was
+        return move >> self.objective_change_shift, move_type, nodes
+
+    def add_move_if_improves(self, objective_change: int, move_type: MoveType, nodes: Sequence[int]):
         self.moves_evaluated_count += 1
-        objective_change, move_type, move_specification = move
         if objective_change >= 0:
             return
-        move_on_queue = (objective_change, self.moves_evaluated_count, move_type, move_specification)
-        if self.local_search_type.STEEPEST:
+        move_on_queue = self.encode_move(objective_change, move_type, nodes, self.moves_evaluated_count)
+        if self.local_search_type == LocalSearchType.STEEPEST:
             heapq.heappush(self.moves, move_on_queue)
         else:
             self.moves.append(move_on_queue)
 
-    def add_move_without_evaluation(self, move: Tuple[int, MoveType, Tuple]):
-        objective_change, move_type, move_specification = move
-        move_on_queue = (objective_change, self.moves_evaluated_count, move_type, move_specification)
-        self.moves.append(move_on_queue)
+    def add_moves_if_improve(self, objective_changes: np.ndarray, move_type: MoveType, moves_nodes: np.ndarray):
+        # add_move_if_improves for a batch of moves evaluated at once, moves_nodes[i] are nodes of i-th move
+        first_moves_evaluated_count = self.moves_evaluated_count + 1
+        self.moves_evaluated_count += len(objective_changes)
+        improving = np.flatnonzero(objective_changes < 0)
+        for index, objective_change, nodes in zip(improving.tolist(), objective_changes[improving].tolist(),
+                                                  moves_nodes[improving].tolist()):
+            heapq.heappush(self.moves, self.encode_move(
+                objective_change, move_type, nodes, first_moves_evaluated_count + index))
+
+    def add_move_without_evaluation(self, move_type: MoveType, nodes: Sequence[int]):
+        self.moves.append(self.encode_move(0, move_type, nodes, self.moves_evaluated_count))
 
     def get_connected_nodes(self, node: int):
-        place_in_cycle = self.cycle.index(node)
-        if place_in_cycle == 0:
-            return self.cycle[-1], self.cycle[1]
-        elif place_in_cycle == self.last_cycle_idx:
-            return self.cycle[-2], self.cycle[0]
-        else:
-            return self.cycle[place_in_cycle - 1], self.cycle[place_in_cycle + 1]
+        return self.tour.prev(node), self.tour.next(node)
+
+    def get_cycle_edges_arrays(self) -> tuple[np.ndarray, np.ndarray]:
+        # start and end nodes of edges - note - without the edge closing the cycle, but with (last, last) one
+        starts = np.array(self.tour.sequence())
+        return starts, np.append(starts[1:], starts[-1])
+
+    def get_edge_presence(self, edge_nodes: tuple[int, int]) -> tuple[bool, bool]:
+        # (edge_nodes among cycle edges, edge_nodes[::-1] among cycle edges) in O(1)
+        a, b = edge_nodes
+        if a == b:
+            is_last_edge = self.is_selected[a] and a == self.tour.last
+            return is_last_edge, is_last_edge
+        direction = self.tour.edge_direction(a, b)
+        if direction == 0:
+            return False, False
+        # note - the edge closing the cycle is not among cycle edges
+        last = self.tour.last
+        return direction == 1 and a != last, direction == -1 and b != last
+
+    def exchange_node(self, old_node: int, new_node: int):
+        self.tour.replace(old_node, new_node)
+        self.is_selected[new_node], self.is_selected[old_node] = True, False
+        del self.not_selected_nodes[new_node]
+        self.not_selected_nodes[old_node] = None
 
     def initialize_moves(self):
         # - generate all possible inter nodes exchange
-        for node_in_cycle in self.cycle:
+        for node_in_cycle in self.tour.sequence():
             self.add_inter_nodes_moves(node_in_cycle=node_in_cycle, neighbors=self.get_connected_nodes(node_in_cycle))
         # - generate all possible relevant intra moves todo - could try using both at the same time
         if self.intra_route_move_type == IntraRouteMovesType.TWO_NODES:
-            for node1, node2 in combinations(self.cycle, 2):
-                node1_neighbors, node2_neighbors = self.get_connected_nodes(node1), self.get_connected_nodes(node2)
-                self.add_intra_nodes(node1=node1, node1_neighbors=node2_neighbors,
-                                     node2=node2, node2_neighbors=node2_neighbors,)
+            if self.local_search_type == LocalSearchType.STEEPEST:
+                # note - row by row of combinations, so that arrays stay O(n)
+                nodes = np.array(self.tour.sequence())
+                nodes_neighbors = (np.roll(nodes, 1), np.roll(nodes, -1))
+                for index in range(len(nodes) - 1):
+                    node2, node2_neighbors = nodes[index + 1:], tuple(neighbors[index + 1:] for neighbors in nodes_neighbors)
+                    self.add_moves_if_improve(
+                        self.calculate_intra_nodes_objective_changes(nodes[index], node2_neighbors, node2, node2_neighbors),
+                        MoveType.INTRA_TWO_NODES,
+                        np.stack(np.broadcast_arrays(nodes[index], node2, *node2_neighbors, *node2_neighbors), axis=-1))
+            else:
+                for node1, node2 in combinations(self.tour.sequence(), 2):
+                    node1_neighbors, node2_neighbors = self.get_connected_nodes(node1), self.get_connected_nodes(node2)
+                    self.add_intra_nodes(node1=node1, node1_neighbors=node2_neighbors,
+                                         node2=node2, node2_neighbors=node2_neighbors,)
         if self.intra_route_move_type == IntraRouteMovesType.TWO_EDGES:
-            for edge1_nodes, edge2_nodes in combinations(pairwise(self.cycle + [self.cycle[-1]]), 2):
-                self.add_intra_edges(edge1_nodes=edge1_nodes, edge2_nodes=edge2_nodes)
+            starts, ends = self.get_cycle_edges_arrays()
+            for index, edge1_nodes in enumerate(zip(starts.tolist(), ends.tolist())):
+                self.add_intra_edges_moves((edge1_nodes,), cycle_edges=(starts[index + 1:], ends[index + 1:]))
 
     def make_move_if_possible(self):
-        objective_change, moves_evaluated_count, move_type, move_specification = self.get_move()
+        move = self.get_move()
+        objective_change, move_type, nodes = self.decode_move(move)
         match move_type:
             case MoveType.INTER_NODES_EXCHANGE:
-                old_node, new_node, move_neighbors = move_specification
-                try:
-                    current_neighbors = self.get_connected_nodes(old_node)
-                except ValueError:
-                    return
+                old_node, new_node = nodes[:2]
                 # check if still valid
-                if (old_node in self.cycle) and (new_node not in self.cycle) and \
-                   (move_neighbors == current_neighbors):
+                if self.is_node_move_valid(move, move_type, nodes):
+                    move_neighbors = self.get_connected_nodes(old_node)  # note - may be reversed, with version stamps
                     if self.local_search_type == LocalSearchType.GREEDY:
                         objective_change = self.calculate_inter_nodes_move_objective_change(old_node, new_node, move_neighbors)
                         self.moves_evaluated_count += 1
                         if objective_change >= 0:
                             return
                     # make move
-                    exchange_idx = self.cycle.index(old_node)
-                    self.cycle[exchange_idx] = new_node
-                    self.not_selected_nodes.remove(new_node)
-                    self.not_selected_nodes.append(old_node)
+                    self.exchange_node(old_node, new_node)
                     self.objective += objective_change
                     self.inter_nodes_exchanges_count += 1
 
                     # add resulting new moves
+                    self.stamp_nodes((new_node, *move_neighbors, old_node))
+                    if self.use_dont_look_bits:
+                        self.activate_nodes((new_node, *move_neighbors, old_node))
+                        return
                     self.add_preserved_moves_back()
                     self.add_inter_nodes_moves(node_in_cycle=new_node, neighbors=move_neighbors)
                     if self.intra_route_move_type == IntraRouteMovesType.TWO_NODES:
-                        for node2 in self.cycle:
-                            if node2 == new_node:
-                                continue
-                            node2_neighbors = self.get_connected_nodes(node2)
-                            self.add_intra_nodes(node1=new_node, node1_neighbors=move_neighbors,
-                                                 node2=node2, node2_neighbors=node2_neighbors)
+                        self.add_intra_nodes_moves(((new_node, move_neighbors),))
                     if self.intra_route_move_type == IntraRouteMovesType.TWO_EDGES:
-                        for new_edge_nodes in ((move_neighbors[0], new_node), (new_node, move_neighbors[1])):
-                            for edge_nodes in pairwise(self.cycle + [self.cycle[-1]]):
-                                if new_edge_nodes == edge_nodes:
-                                    continue
-                                self.add_intra_edges(edge1_nodes=new_edge_nodes, edge2_nodes=edge_nodes)
+                        self.add_intra_edges_moves(((move_neighbors[0], new_node), (new_node, move_neighbors[1])))
             case MoveType.INTRA_TWO_NODES:
-                node1, node2, node1_neighbors, node2_neighbors = move_specification
-                try:
-                    current_node1_neighbors = self.get_connected_nodes(node1)
-                    current_node2_neighbors = self.get_connected_nodes(node2)
-                except ValueError:
-                    return
+                node1, node2 = nodes[:2]
                 # check if still valid
-                if (node1 in self.cycle) and (node2 in self.cycle) and \
-                   (node1_neighbors == current_node1_neighbors) and (node2_neighbors == current_node2_neighbors):
+                if self.is_node_move_valid(move, move_type, nodes):
+                    # note - may be reversed, with version stamps
+                    node1_neighbors, node2_neighbors = self.get_connected_nodes(node1), self.get_connected_nodes(node2)
                     if self.local_search_type == LocalSearchType.GREEDY:
                         objective_change = self.calculate_intra_nodes_objective_change(node1, node1_neighbors, node2, node2_neighbors)
                         self.moves_evaluated_count += 1
                         if objective_change >= 0:
                             return
                     # make move
-                    node1_idx, node2_idx = self.cycle.index(node1), self.cycle.index(node2)
-                    self.cycle[node1_idx], self.cycle[node2_idx] = node2, node1
+                    self.tour.swap(node1, node2)
                     self.objective += objective_change
                     self.intra_two_nodes_count += 1
                     # update neighbors
                     current_node1_neighbors = self.get_connected_nodes(node1)
                     current_node2_neighbors = self.get_connected_nodes(node2)
                     # add resulting new moves
+                    self.stamp_nodes((node1, node2, *node1_neighbors, *node2_neighbors))
+                    if self.use_dont_look_bits:
+                        self.activate_nodes((node1, node2, *node1_neighbors, *node2_neighbors))
+                        return
                     self.add_preserved_moves_back()
-                    self.add_inter_nodes_moves(node_in_cycle=node1, neighbors=node2_neighbors)
-                    self.add_inter_nodes_moves(node_in_cycle=node2, neighbors=node1_neighbors)
+                    # note - current neighbors, for swapped neighboring nodes they are not the ones of the other node
+                    self.add_inter_nodes_moves(node_in_cycle=node1, neighbors=current_node1_neighbors)
+                    self.add_inter_nodes_moves(node_in_cycle=node2, neighbors=current_node2_neighbors)
                     if self.intra_route_move_type == IntraRouteMovesType.TWO_NODES:
-                        for other_node in self.cycle:
-                            if (other_node == node1) or (other_node == node2):
-                                continue  # doesn't make sense to repeat the same exact move
-                            other_node_neighbors = self.get_connected_nodes(other_node)
-                            self.add_intra_nodes(node1=node1, node1_neighbors=node2_neighbors,
-                                                 node2=other_node, node2_neighbors=other_node_neighbors)
-                            self.add_intra_nodes(node1=node2, node1_neighbors=node1_neighbors,
-                                                 node2=other_node, node2_neighbors=other_node_neighbors)
+                        # note - other node being node1 or node2 doesn't make sense, it would repeat the same exact move
+                        self.add_intra_nodes_moves(((node1, current_node1_neighbors), (node2, current_node2_neighbors)))
                     if self.intra_route_move_type == IntraRouteMovesType.TWO_EDGES:
-                        for edge in pairwise(self.cycle + [self.cycle[-1]]):
-                            for node1_edge in ((current_node2_neighbors[0], node1), (node1, current_node2_neighbors[1])):
-                                if edge == node1_edge:
-                                    continue
-                                self.add_intra_edges(edge1_nodes=node1_edge, edge2_nodes=edge)
-                            for node2_edge in ((current_node1_neighbors[0], node2), (node2, current_node1_neighbors[1])):
-                                if edge == node2_edge:
-                                    continue
-                                self.add_intra_edges(edge1_nodes=node2_edge, edge2_nodes=edge)
+                        self.add_intra_edges_moves(((current_node2_neighbors[0], node1), (node1, current_node2_neighbors[1]),
+                                                    (current_node1_neighbors[0], node2), (node2, current_node1_neighbors[1])),
+                                                   cycle_edges_first=True)
             case MoveType.INTRA_TWO_EDGES:
-                edge1_nodes, edge2_nodes = move_specification
-                cycle_edges = list(pairwise(self.cycle + [self.cycle[-1]]))
+                edge1_nodes, edge2_nodes = tuple(nodes[:2]), tuple(nodes[2:])
+                # note - checked before the move is made
+                edge1_in_cycle, edge1_reversed_in_cycle = self.get_edge_presence(edge1_nodes)
+                edge2_in_cycle, edge2_reversed_in_cycle = self.get_edge_presence(edge2_nodes)
                 # check if still valid
-                if (((edge1_nodes in cycle_edges) and (edge2_nodes in cycle_edges)) or
-                        ((edge1_nodes[::-1] in cycle_edges) and (edge2_nodes[::-1] in cycle_edges))):
+                if ((edge1_in_cycle and edge2_in_cycle) or
+                        (edge1_reversed_in_cycle and edge2_reversed_in_cycle)):
                     if self.local_search_type == LocalSearchType.GREEDY:
                         objective_change = self.calculate_intra_edges_objective_change(edge1_nodes, edge2_nodes)
                         self.moves_evaluated_count += 1
                         if objective_change >= 0:
                             return
                     # make move
-                    edge1_idx, edge2_idx = self.cycle.index(edge1_nodes[0]), self.cycle.index(edge2_nodes[0])
-                    if edge1_idx < edge2_idx:
-                        left_idx, right_idx = edge1_idx, edge2_idx
+                    # cycle = left + middle + right, middle (after left_node, up to right_node) gets reversed
+                    if self.tour.position(edge1_nodes[0]) < self.tour.position(edge2_nodes[0]):
+                        left_node, right_node = edge1_nodes[0], edge2_nodes[0]
                     else:
-                        left_idx, right_idx = edge2_idx, edge1_idx
-                    left, middle, right = [], [], []
-                    for i, node in enumerate(self.cycle):
-                        if i <= left_idx:
-                            left.append(node)
-                        elif i <= right_idx:
-                            middle.append(node)
-                        else:
-                            right.append(node)
-                    middle = middle[::-1]
-                    self.cycle = left + middle + right
-                    self.objective += objective_change
+                        left_node, right_node = edge2_nodes[0], edge1_nodes[0]
+                    if left_node == right_node:
+                        raise Exception('wrong index error stuff')  # empty middle
+                    middle_first, right_first = self.tour.next(left_node), self.tour.next(right_node)
+                    is_right_empty = right_node == self.tour.last
+                    # note - move may have been accepted with reversed edges, then its objective_change is not
+                    # the one of the reversal actually made
+                    self.objective += self.calculate_reversal_objective_change(left_node, right_node)
+                    self.tour.reverse(middle_first, right_node)
                     self.intra_two_edges_count += 1
 
                     # add resulting new moves
-                    self.add_preserved_moves_back()
                     # inter nodes exchanges do not stay the same - neighbors at "shifting points" changed
-                    try:
-                        l, ml, mr, r = left[-1], middle[0], middle[-1], right[0]
-                    except IndexError:
-                        if len(left) == 0:
-                            l, ml, mr, r = middle[0], middle[-1], right[0], right[-1]
-                        elif len(right) == 0:
-                            l, ml, mr, r = left[0], left[-1], middle[0], middle[-1]
-                        else:
-                            raise Exception('wrong index error stuff')
+                    if is_right_empty:
+                        l, ml, mr, r = self.tour.first, left_node, right_node, middle_first
+                    else:
+                        l, ml, mr, r = left_node, right_node, middle_first, right_first
+                    self.stamp_nodes((l, ml, mr, r))
+                    if self.use_dont_look_bits:
+                        self.activate_nodes((l, ml, mr, r))
+                        return
+                    self.add_preserved_moves_back()
                     for node in (l, ml, mr, r):
                         self.add_inter_nodes_moves(node, self.get_connected_nodes(node))
                     # edges on "shifting points" changed
-                    for new_edge_nodes in ((l, ml), (mr, r)):
-                        for edge_nodes in pairwise(self.cycle + [self.cycle[-1]]):
-                            if new_edge_nodes == edge_nodes:
-                                continue
-                            self.add_intra_edges(edge1_nodes=new_edge_nodes, edge2_nodes=edge_nodes)
+                    self.add_intra_edges_moves(((l, ml), (mr, r)))
                 # note - wrong relative order is handled after flipping them right
-                if (((edge1_nodes[::-1] in cycle_edges) and (edge2_nodes in cycle_edges)) or
-                        ((edge1_nodes in cycle_edges) and (edge2_nodes[::-1] in cycle_edges))):
-                    self.preserved_moves.append((objective_change, moves_evaluated_count, move_type, move_specification))
+                if ((edge1_reversed_in_cycle and edge2_in_cycle) or
+                        (edge1_in_cycle and edge2_reversed_in_cycle)):
+                    self.preserved_moves.append(move)
+
+    def calculate_reversal_objective_change(self, left_node: int, right_node: int) -> int:
+        # reversing the path after left_node up to right_node replaces just the edges at its both ends
+        if left_node == right_node:
+            return 0
+        l, ml, mr, r = left_node, self.tour.next(left_node), right_node, self.tour.next(right_node)
+        return self.tsp.distances_matrix[l, mr] + self.tsp.distances_matrix[ml, r] \
+            - self.tsp.distances_matrix[l, ml] - self.tsp.distances_matrix[mr, r]
 
     def calculate_intra_nodes_objective_change(self, node1, node1_neighbors, node2, node2_neighbors) -> int:
         # ..., node1_neighbors[0], node1, node2, node2_neighbors[1]
@@ -285,12 +496,12 @@ class LocalSearchWithDeltas:
         # correct = - n1n[0]_n1 - n1_n2 - n2_n2n[1]
         #           + n1n[0]_n2 + n2_n1 + n1_n2n[1]
         if node1 == node2_neighbors[0]:
-            return - self.tsp.distances_matrix[node1_neighbors[0]][node1] \
-                   - self.tsp.distances_matrix[node1][node2] \
-                   - self.tsp.distances_matrix[node2][node2_neighbors[1]] \
-                   + self.tsp.distances_matrix[node1_neighbors[0]][node2] \
-                   + self.tsp.distances_matrix[node2][node1] \
-                   + self.tsp.distances_matrix[node1][node2_neighbors[1]]
+            return - self.tsp.distances_matrix[node1_neighbors[0], node1] \
+                   - self.tsp.distances_matrix[node1, node2] \
+                   - self.tsp.distances_matrix[node2, node2_neighbors[1]] \
+                   + self.tsp.distances_matrix[node1_neighbors[0], node2] \
+                   + self.tsp.distances_matrix[node2, node1] \
+                   + self.tsp.distances_matrix[node1, node2_neighbors[1]]
         # ..., node2_neighbors[0], node2, node1, node1_neighbors[1]
         # 1                - n2n[0]_n2   - n2_n1
         # 2                              - n2_n1 (2x!) - n1_n1n[1]
@@ -300,40 +511,84 @@ class LocalSearchWithDeltas:
         # correct = - n2n[0]_n2 - n2_n1 - n1_n1n[1]
         #           + n2n[0]_n1 + n1_n2 + n2_n1n[1]
         if node2 == node1_neighbors[0]:
-            return - self.tsp.distances_matrix[node2_neighbors[0]][node2] \
-                   - self.tsp.distances_matrix[node2][node1] \
-                   - self.tsp.distances_matrix[node1][node1_neighbors[1]] \
-                   + self.tsp.distances_matrix[node2_neighbors[0]][node1] \
-                   + self.tsp.distances_matrix[node1][node2] \
-                   + self.tsp.distances_matrix[node2][node1_neighbors[1]]
-
-        return - (self.tsp.distances_matrix[node1_neighbors[0]][node1] +
-                  self.tsp.distances_matrix[node1][node1_neighbors[1]]) \
-               - (self.tsp.distances_matrix[node2_neighbors[0]][node2] +
-                  self.tsp.distances_matrix[node2][node2_neighbors[1]]) \
-               + (self.tsp.distances_matrix[node1_neighbors[0]][node2] +
-                  self.tsp.distances_matrix[node2][node1_neighbors[1]]) \
-               + (self.tsp.distances_matrix[node2_neighbors[0]][node1] +
-                  self.tsp.distances_matrix[node1][node2_neighbors[1]])
+            return - self.tsp.distances_matrix[node2_neighbors[0], node2] \
+                   - self.tsp.distances_matrix[node2, node1] \
+                   - self.tsp.distances_matrix[node1, node1_neighbors[1]] \
+                   + self.tsp.distances_matrix[node2_neighbors[0], node1] \
+                   + self.tsp.distances_matrix[node1, node2] \
+                   + self.tsp.distances_matrix[node2, node1_neighbors[1]]
+
+        return - (self.tsp.distances_matrix[node1_neighbors[0], node1] +
+                  self.tsp.distances_matrix[node1, node1_neighbors[1]]) \
+               - (self.tsp.distances_matrix[node2_neighbors[0], node2] +
+                  self.tsp.distances_matrix[node2, node2_neighbors[1]]) \
+               + (self.tsp.distances_matrix[node1_neighbors[0], node2] +
+                  self.tsp.distances_matrix[node2, node1_neighbors[1]]) \
+               + (self.tsp.distances_matrix[node2_neighbors[0], node1] +
+                  self.tsp.distances_matrix[node1, node2_neighbors[1]])
 
     def add_intra_nodes(self, node1, node1_neighbors, node2, node2_neighbors):
         if self.local_search_type == LocalSearchType.STEEPEST:
             objective_change = self.calculate_intra_nodes_objective_change(node1, node1_neighbors, node2, node2_neighbors)
-            self.add_move_if_improves((
-                objective_change, MoveType.INTRA_TWO_NODES,
-                (node1, node2, node1_neighbors, node2_neighbors)
-            ))
+            self.add_move_if_improves(objective_change, MoveType.INTRA_TWO_NODES,
+                                      (node1, node2, *node1_neighbors, *node2_neighbors))
         else:
-            self.add_move_without_evaluation((
-                0, MoveType.INTRA_TWO_NODES,
-                (node1, node2, node1_neighbors, node2_neighbors)
-            ))
+            self.add_move_without_evaluation(MoveType.INTRA_TWO_NODES, (node1, node2, *node1_neighbors, *node2_neighbors))
+
+    def calculate_intra_nodes_objective_changes(self, node1, node1_neighbors, node2, node2_neighbors) -> np.ndarray:
+        # calculate_intra_nodes_objective_change for (broadcast) arrays of nodes, cases picked elementwise
+        d = self.tsp.distances_matrix
+        return np.where(
+            node1 == node2_neighbors[0],
+            - d[node1_neighbors[0], node1] - d[node1, node2] - d[node2, node2_neighbors[1]]
+            + d[node1_neighbors[0], node2] + d[node2, node1] + d[node1, node2_neighbors[1]],
+            np.where(
+                node2 == node1_neighbors[0],
+                - d[node2_neighbors[0], node2] - d[node2, node1] - d[node1, node1_neighbors[1]]
+                + d[node2_neighbors[0], node1] + d[node1, node2] + d[node2, node1_neighbors[1]],
+                - (d[node1_neighbors[0], node1] + d[node1, node1_neighbors[1]])
+                - (d[node2_neighbors[0], node2] + d[node2, node2_neighbors[1]])
+                + (d[node1_neighbors[0], node2] + d[node2, node1_neighbors[1]])
+                + (d[node2_neighbors[0], node1] + d[node1, node2_neighbors[1]])
+            )
+        )
+
+    def add_intra_nodes_moves(self, nodes1_with_neighbors: Sequence[tuple[int, tuple[int, int]]]):
+        """
+        add_intra_nodes of each (node1, node1_neighbors) with every other node of cycle, in order of the cycle.
+        With steepest, all of them are evaluated at once - by numpy, over the whole cycle.
+        """
+        nodes1 = [node1 for node1, _ in nodes1_with_neighbors]
+        if self.local_search_type != LocalSearchType.STEEPEST:
+            for node2 in self.tour.sequence():
+                if node2 in nodes1:
+                    continue
+                node2_neighbors = self.get_connected_nodes(node2)
+                for node1, node1_neighbors in nodes1_with_neighbors:
+                    self.add_intra_nodes(node1=node1, node1_neighbors=node1_neighbors,
+                                         node2=node2, node2_neighbors=node2_neighbors)
+            return
+        nodes = np.array(self.tour.sequence())
+        is_other_node = ~np.isin(nodes, nodes1)
+        node2 = nodes[is_other_node]
+        node2_neighbors = (np.roll(nodes, 1)[is_other_node], np.roll(nodes, -1)[is_other_node])
+        # [node2][node1] - so that moves are flattened in the same order as they would be added one by one
+        objective_changes = np.stack([
+            self.calculate_intra_nodes_objective_changes(node1, node1_neighbors, node2, node2_neighbors)
+            for node1, node1_neighbors in nodes1_with_neighbors
+        ], axis=1)
+        moves_nodes = np.stack([
+            np.stack(np.broadcast_arrays(node1, node2, *node1_neighbors, *node2_neighbors), axis=-1)
+            for node1, node1_neighbors in nodes1_with_neighbors
+        ], axis=1)
+        self.add_moves_if_improve(objective_changes.reshape(-1), MoveType.INTRA_TWO_NODES,
+                                  moves_nodes.reshape(-1, moves_nodes.shape[-1]))
 
     def calculate_intra_edges_objective_change(self, edge1_nodes, edge2_nodes) -> int:
-        return - self.tsp.distances_matrix[edge1_nodes[0]][edge1_nodes[1]] \
-               - self.tsp.distances_matrix[edge2_nodes[0]][edge2_nodes[1]] \
-               + self.tsp.distances_matrix[edge1_nodes[0]][edge2_nodes[0]] \
-               + self.tsp.distances_matrix[edge1_nodes[1]][edge2_nodes[1]]
+        return - self.tsp.distances_matrix[edge1_nodes[0], edge1_nodes[1]] \
+               - self.tsp.distances_matrix[edge2_nodes[0], edge2_nodes[1]] \
+               + self.tsp.distances_matrix[edge1_nodes[0], edge2_nodes[0]] \
+               + self.tsp.distances_matrix[edge1_nodes[1], edge2_nodes[1]]
 
     def add_intra_edges(self, edge1_nodes, edge2_nodes):
         """
@@ -347,45 +602,87 @@ class LocalSearchWithDeltas:
         """
         if self.local_search_type == LocalSearchType.STEEPEST:
             objective_change = self.calculate_intra_edges_objective_change(edge1_nodes, edge2_nodes)
-            self.add_move_if_improves((
-                objective_change, MoveType.INTRA_TWO_EDGES,
-                (edge1_nodes, edge2_nodes)
-            ))
+            self.add_move_if_improves(objective_change, MoveType.INTRA_TWO_EDGES, (*edge1_nodes, *edge2_nodes))
         else:
-            self.add_move_without_evaluation((
-                0, MoveType.INTRA_TWO_EDGES,
-                (edge1_nodes, edge2_nodes)
-            ))
+            self.add_move_without_evaluation(MoveType.INTRA_TWO_EDGES, (*edge1_nodes, *edge2_nodes))
+
+    def add_intra_edges_moves(self, new_edges_nodes: Sequence[tuple[int, int]], cycle_edges_first: bool = False,
+                              cycle_edges: tuple[np.ndarray, np.ndarray] | None = None):
+        """
+        add_intra_edges of each new edge with every (other) edge of cycle - for each new edge in turn, or with
+        cycle_edges_first, for each edge of cycle in turn. cycle_edges (as from get_cycle_edges_arrays) may be given.
+        With steepest, all of them are evaluated at once - by numpy, over the whole cycle.
+        """
+        starts, ends = cycle_edges if cycle_edges is not None else self.get_cycle_edges_arrays()
+        if self.local_search_type != LocalSearchType.STEEPEST:
+            cycle_edges_nodes = list(zip(starts.tolist(), ends.tolist()))
+            edges_pairs = ((new_edge_nodes, edge_nodes) for edge_nodes in cycle_edges_nodes
+                           for new_edge_nodes in new_edges_nodes) if cycle_edges_first else \
+                ((new_edge_nodes, edge_nodes) for new_edge_nodes in new_edges_nodes
+                 for edge_nodes in cycle_edges_nodes)
+            for new_edge_nodes, edge_nodes in edges_pairs:
+                if new_edge_nodes == edge_nodes:
+                    continue
+                self.add_intra_edges(edge1_nodes=new_edge_nodes, edge2_nodes=edge_nodes)
+            return
+        # [new edge][edge of cycle]
+        new_starts, new_ends = np.array(new_edges_nodes).T[:, :, None]
+        objective_changes = self.calculate_intra_edges_objective_change((new_starts, new_ends), (starts, ends))
+        is_other_edge = (new_starts != starts) | (new_ends != ends)
+        moves_nodes = np.stack(np.broadcast_arrays(new_starts, new_ends, starts, ends), axis=-1)
+        if cycle_edges_first:
+            objective_changes, is_other_edge, moves_nodes = \
+                objective_changes.T, is_other_edge.T, moves_nodes.transpose(1, 0, 2)
+        self.add_moves_if_improve(objective_changes[is_other_edge], MoveType.INTRA_TWO_EDGES,
+                                  moves_nodes[is_other_edge])
 
     def calculate_inter_nodes_move_objective_change(
             self, node_in_cycle: int, non_cycle_node: int, neighbors: tuple[int, int]) -> int:
         return - (self.tsp.additional_costs[node_in_cycle] +
-                  self.tsp.distances_matrix[neighbors[0]][node_in_cycle] +
-                  self.tsp.distances_matrix[node_in_cycle][neighbors[1]]) \
+                  self.tsp.distances_matrix[neighbors[0], node_in_cycle] +
+                  self.tsp.distances_matrix[node_in_cycle, neighbors[1]]) \
                + (self.tsp.additional_costs[non_cycle_node] +
-                  self.tsp.distances_matrix[neighbors[0]][non_cycle_node] +
-                  self.tsp.distances_matrix[non_cycle_node][neighbors[1]])
+                  self.tsp.distances_matrix[neighbors[0], non_cycle_node] +
+                  self.tsp.distances_matrix[non_cycle_node, neighbors[1]])
 
     def add_inter_nodes_moves(self, node_in_cycle: int, neighbors: tuple[int, int]):
+        if self.local_search_type == LocalSearchType.STEEPEST:
+            # all exchanges evaluated at once, by numpy
+            non_cycle_nodes = np.fromiter(self.not_selected_nodes, dtype=np.int64, count=len(self.not_selected_nodes))
+            self.add_moves_if_improve(
+                self.calculate_inter_nodes_move_objective_change(node_in_cycle, non_cycle_nodes, neighbors),
+                MoveType.INTER_NODES_EXCHANGE,
+                np.stack(np.broadcast_arrays(node_in_cycle, non_cycle_nodes, *neighbors), axis=-1))
+            return
         for non_cycle_node in self.not_selected_nodes:
-            if self.local_search_type == LocalSearchType.STEEPEST:
-                objective_change = self.calculate_inter_nodes_move_objective_change(node_in_cycle, non_cycle_node, neighbors)
-                self.add_move_if_improves((
-                    objective_change, MoveType.INTER_NODES_EXCHANGE,
-                    (node_in_cycle, non_cycle_node, neighbors)
-                ))
-            else:
-                self.add_move_without_evaluation((
-                    0, MoveType.INTER_NODES_EXCHANGE,
-                    (node_in_cycle, non_cycle_node, neighbors)
-                ))
+            self.add_move_without_evaluation(MoveType.INTER_NODES_EXCHANGE, (node_in_cycle, non_cycle_node, *neighbors))
+
+    def add_inter_nodes_moves_of_non_cycle_node(self, non_cycle_node: int):
+        # exchanges of every node in cycle with the given one
+        if self.local_search_type == LocalSearchType.STEEPEST:
+            nodes = np.array(self.tour.sequence())
+            neighbors = (np.roll(nodes, 1), np.roll(nodes, -1))
+            self.add_moves_if_improve(
+                self.calculate_inter_nodes_move_objective_change(nodes, non_cycle_node, neighbors),
+                MoveType.INTER_NODES_EXCHANGE,
+                np.stack(np.broadcast_arrays(nodes, non_cycle_node, *neighbors), axis=-1))
+            return
+        for node_in_cycle in self.tour.sequence():
+            self.add_move_without_evaluation(MoveType.INTER_NODES_EXCHANGE,
+                                             (node_in_cycle, non_cycle_node, *self.get_connected_nodes(node_in_cycle)))
+
+    def pop_random_move(self):
+        # note - the move gets swapped with the last one first, so that popping it is O(1)
+        move_idx = randrange(len(self.moves))
+        self.moves[move_idx], self.moves[-1] = self.moves[-1], self.moves[move_idx]
+        return self.moves.pop()
 
-    def get_move(self) -> Tuple[int, int, MoveType, Tuple]:
+    def get_move(self) -> int:
         match self.local_search_type:
             case LocalSearchType.STEEPEST:
                 return heapq.heappop(self.moves)
             case LocalSearchType.GREEDY:
-                return self.moves.pop(choice(range(len(self.moves))))
+                return self.pop_random_move()
             case _:
                 raise Exception('no such local_search_type')
 
@@ -3,6 +3,7 @@ import copy
 from data_loader import TSP, SolutionTSP
 from random import seed, sample, shuffle, choice
 from time import time
+import numpy as np
 
 from assignment3.local_search_types import (
     LocalSearchType,
@@ -160,17 +161,9 @@ def iterated_local_search_solve(
         nodes_in_cycle = input_solution.nodes
         nodes_outside_cycle = list(set(tsp.nodes) - set(nodes_in_cycle))
 
-        # note - these could be calculated beforehand, once
-        closest_nodes = {
-            node: sorted([destination for destination in tsp.nodes
-                          if destination is not node],
-                         key=lambda destination: tsp.total_move_costs[node][destination])
-            for node in tsp.nodes
-        }
-        neighborhood_costs = {
-            node: sum(closest_nodes_list[:neighborhood_size])
-            for node, closest_nodes_list in closest_nodes.items()
-        }
+        # note - sums the closest nodes themselves (their numbers), not costs to them
+        neighborhood_costs = dict(enumerate(
+            tsp.get_nearest_nodes(neighborhood_size).sum(axis=1, dtype=np.int64).tolist()))
 
         highest_cost_nodes_in_cycle = sorted(nodes_in_cycle, key=lambda n: neighborhood_costs[n],
                                              reverse=True)
@@ -4,6 +4,7 @@ from math import ceil
 from data_loader import TSP, SolutionTSP
 from random import seed
 from numpy.random import choice
+import numpy as np
 from time import time
 
 from assignment3.local_search_types import (
@@ -52,18 +53,12 @@ def large_scale_neighborhood_search_solve(
     nodes_to_destroy = ceil(len(solution.nodes) * percentage_destroyed / 100)
     neighborhood_size = 10
     # neighborhood costs are respectively, weights for picking the given node for destruction
-    costs_to_all_nodes = {
-        node: [
-            tsp.additional_costs[node] + tsp.distances_matrix[node][destination] + tsp.additional_costs[destination]
-            for destination in tsp.nodes
-            if destination is not node
-        ]
-        for node in tsp.nodes
-    }
-    neighborhood_costs = {
-        node: sum(sorted(costs)[:neighborhood_size])
-        for node, costs in costs_to_all_nodes.items()
-    }
+    # - sum of additional_costs[node] + distance + additional_costs[destination] over the closest destinations
+    nearest_nodes = tsp.get_nearest_nodes(neighborhood_size)
+    neighborhood_costs = dict(enumerate((
+        nearest_nodes.shape[1] * tsp.additional_costs.astype(np.int64)
+        + tsp.total_move_costs[np.arange(len(tsp.nodes))[:, None], nearest_nodes].sum(axis=1, dtype=np.int64)
+    ).tolist()))
 
     # neighborhood_costs = [
     #     sum(sorted([
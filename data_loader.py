@@ -1,23 +1,92 @@
-from pandas import DataFrame, read_csv
-from numpy import zeros, ndarray, sqrt, round, ceil
+from numpy import ndarray, sqrt, round, ceil
+from abc import ABC, abstractmethod
 from itertools import pairwise
 from typing import List
 from time import time
+from hashlib import sha256
+from multiprocessing.shared_memory import SharedMemory
+import io
+import math
+import os
+import pickle
 
 import numpy as np
-import matplotlib.pyplot as plt
-import matplotlib.colors as mcolors
 
 
 DATA_FOLDER = "data"
+CACHE_FOLDER_NAME = ".cache"  # created next to the instance csv, unless specified otherwise
+CACHE_VERSION = 2  # bump whenever the way cached matrices are calculated changes
+# matrix values times this must fit the chosen dtype - delta evaluations add / subtract a few entries before
+# the result gets promoted (tour totals are accumulated in int64 anyway)
+MATRIX_VALUES_HEADROOM = 8
+SOLUTION_NODES_DTYPE = np.int32
+SHARED_ARRAYS_ALIGNMENT = 64  # bytes, each array in shared memory starts at a multiple of it
+# debug - objective functions passed to SolutionTSP (instead of calculated) are recalculated and compared
+VERIFY_KNOWN_OBJECTIVE_FUNCTIONS = False
 
 
 class SolutionTSP:
-    def __init__(self, tsp: 'TSP', nodes: list):
-        self.nodes = nodes
-        self.cost = tsp.calculate_total_additional_cost(nodes)
-        self.edge_length = tsp.calculate_total_edge_length(nodes)
-        self.objective_function = tsp.calculate_total_objective_function(nodes)
+    """
+    Cycle of nodes, kept as a compact integer array (a copy - later changes of the passed list don't affect it).
+    cost, edge_length and objective_function are calculated on first access only, then cached.
+    objective_function can be passed when already known (e.g. tracked with deltas by local search).
+    """
+    __slots__ = ('tsp', 'nodes_array', '_nodes', '_cost', '_edge_length', '_objective_function')
+
+    def __init__(self, tsp: 'TSP', nodes: list, objective_function: int | None = None):
+        self.tsp: TSP | None = tsp
+        self.nodes_array: ndarray = np.array(nodes, dtype=SOLUTION_NODES_DTYPE)
+        self._nodes: list | None = None
+        self._cost = None
+        self._edge_length = None
+        self._objective_function = None if objective_function is None else np.int64(objective_function)
+        if objective_function is not None and VERIFY_KNOWN_OBJECTIVE_FUNCTIONS:
+            self.verify_objective_function()
+
+    def verify_objective_function(self):
+        calculated_objective_function = self.tsp.calculate_total_objective_function(self.nodes_array)
+        if self._objective_function != calculated_objective_function:
+            raise Exception(f'known objective_function {self._objective_function} differs from '
+                            f'calculated {calculated_objective_function}')
+
+    @property
+    def nodes(self) -> list:
+        # materialized once, solvers work on it as a regular list
+        if self._nodes is None:
+            self._nodes = self.nodes_array.tolist()
+        return self._nodes
+
+    @property
+    def cost(self):
+        if self._cost is None:
+            self._cost = self.tsp.calculate_total_additional_cost(self.nodes_array)
+        return self._cost
+
+    @property
+    def edge_length(self):
+        if self._edge_length is None:
+            self._edge_length = self.tsp.calculate_total_edge_length(self.nodes_array)
+        return self._edge_length
+
+    @property
+    def objective_function(self):
+        if self._objective_function is None:
+            self._objective_function = self.tsp.calculate_total_objective_function(self.nodes_array)
+        return self._objective_function
+
+    def __getstate__(self):
+        # metrics are calculated before pickling / copying, so that the whole TSP doesn't have to go along
+        return self.nodes_array, self.cost, self.edge_length, self.objective_function
+
+    def __setstate__(self, state):
+        if isinstance(state, tuple):
+            self.nodes_array, self._cost, self._edge_length, self._objective_function = state
+        else:  # pickled before the class had __slots__
+            self.nodes_array = np.array(state['nodes'], dtype=SOLUTION_NODES_DTYPE)
+            self._cost, self._edge_length, self._objective_function = (
+                state['cost'], state['edge_length'], state['objective_function'])
+        self.tsp = None
+        self._nodes = None
 
     def nodes_in_excel_format(self) -> str:
         return '\n'.join(map(str, self.nodes))
@@ -46,81 +115,362 @@ class SolutionTSP:
         return self.objective_function > other.objective_function
 
 
+class InsertionCosts:
+    """
+    [edge_start_node][edge_end_node][inserted_node] costs, computed on demand instead of stored as a dense n^3 cube.
+
+    Keeps the indexing of the dense array (`insertion_costs[start][end][node]`, also `insertion_costs[start, end, node]`
+    with broadcasting of numpy arrays), plus batch accessors for evaluating many nodes / edges at once.
+    With `is_removal`, values are changes of the objective after removing the node from between start and end.
+    """
+    def __init__(self, distances_matrix: ndarray, additional_costs: ndarray, is_removal: bool = False):
+        self.distances_matrix: ndarray = distances_matrix
+        self.additional_costs: ndarray = additional_costs
+        self.is_removal: bool = is_removal
+        self.shape: tuple[int, int, int] = (len(additional_costs),) * 3
+        self.dtype = distances_matrix.dtype
+        self._zero = self.dtype.type(0)
+
+    def __len__(self) -> int:
+        return self.shape[0]
+
+    def __getitem__(self, key):
+        if isinstance(key, tuple):
+            if len(key) == 3:
+                return self.between(*key)
+            return _InsertionCostsIndex(self, key)
+        return _InsertionCostsIndex(self, (key,))
+
+    def __array__(self, dtype=None, copy=None) -> ndarray:
+        dense = self.to_dense()
+        return dense if dtype is None else dense.astype(dtype)
+
+    def between(self, start, end, inserted):
+        if isinstance(start, (int, np.integer)) and isinstance(end, (int, np.integer)) \
+                and isinstance(inserted, (int, np.integer)):
+            return self._between_single(start, end, inserted)
+        start, end, inserted = np.asarray(start), np.asarray(end), np.asarray(inserted)
+        costs = (self.distances_matrix[start, inserted] + self.distances_matrix[inserted, end]
+                 + self.additional_costs[inserted] - self.distances_matrix[start, end])
+        # "inserting" a node next to itself costs nothing
+        costs = np.where((inserted == start) | (inserted == end), 0, costs)
+        if self.is_removal:
+            # no previous edge to go back to if the cycle is just 1 node
+            costs = np.where(start == end, 0, -costs)
+        return costs
+
+    def _between_single(self, start: int, end: int, inserted: int):
+        if inserted == start or inserted == end:
+            return self._zero
+        if self.is_removal:
+            if start == end:
+                return self._zero
+            return (self.distances_matrix[start, end] - self.distances_matrix[start, inserted]
+                    - self.distances_matrix[inserted, end] - self.additional_costs[inserted])
+        # note - for start == end (forming cycle out of 1 node) there is no previous edge, distance to itself is 0
+        return (self.distances_matrix[start, inserted] + self.distances_matrix[inserted, end]
+                + self.additional_costs[inserted] - self.distances_matrix[start, end])
+
+    def for_edge(self, start: int, end: int, inserted_nodes=None) -> ndarray:
+        """Costs of inserting each of inserted_nodes (all nodes by default) between start and end"""
+        if inserted_nodes is None:
+            inserted_nodes = np.arange(len(self))
+        return self.between(np.intp(start), np.intp(end), np.asarray(inserted_nodes, dtype=np.intp))
+
+    def for_edges(self, edges, inserted_nodes=None) -> ndarray:
+        """[edge_idx][inserted_node_idx] costs for a batch of (start, end) edges"""
+        if inserted_nodes is None:
+            inserted_nodes = np.arange(len(self))
+        edges = np.asarray(edges, dtype=np.intp).reshape(-1, 2)
+        return self.between(edges[:, 0, None], edges[:, 1, None], np.asarray(inserted_nodes, dtype=np.intp)[None, :])
+
+    def for_cycle(self, nodes) -> ndarray:
+        """Costs for each node of the cycle, between its predecessor and successor"""
+        nodes = np.asarray(nodes, dtype=np.intp)
+        return self.between(np.roll(nodes, 1), np.roll(nodes, -1), nodes)
+
+    def to_dense(self) -> ndarray:
+        nodes = np.arange(len(self))
+        return self.between(nodes[:, None, None], nodes[None, :, None], nodes[None, None, :])
+
+
+class _InsertionCostsIndex:
+    """Partially indexed InsertionCosts, e.g. `insertion_costs[start]` or `insertion_costs[start][end]`"""
+    __slots__ = ('insertion_costs', 'indices')
+
+    def __init__(self, insertion_costs: InsertionCosts, indices: tuple):
+        self.insertion_costs = insertion_costs
+        self.indices = indices
+
+    def __getitem__(self, key):
+        indices = self.indices + (key if isinstance(key, tuple) else (key,))
+        if len(indices) == 3:
+            return self.insertion_costs.between(*indices)
+        return _InsertionCostsIndex(self.insertion_costs, indices)
+
+    def __len__(self) -> int:
+        return len(self.insertion_costs)
+
+    def __array__(self, dtype=None, copy=None) -> ndarray:
+        nodes = np.arange(len(self.insertion_costs))
+        if len(self.indices) == 1:
+            costs = self.insertion_costs.between(self.indices[0], nodes[:, None], nodes[None, :])
+        else:
+            costs = self.insertion_costs.for_edge(*self.indices)
+        return costs if dtype is None else costs.astype(dtype)
+
+
+class PackedSymmetricMatrix:
+    """
+    Symmetric matrix stored as its upper triangle (with diagonal) - n(n+1)/2 values instead of n^2.
+
+    Indexed like the dense matrix: `matrix[i, j]` (also with numpy arrays, broadcast), or `matrix[i][j]` -
+    the latter gathers the whole row i first, so `[i, j]` is the fast accessor.
+    """
+    def __init__(self, values: ndarray, n: int):
+        self.values: ndarray = values
+        self.shape: tuple[int, int] = (n, n)
+        self.dtype = values.dtype
+        # (i, j), i <= j, is at values[row_starts[i] + j]
+        self.row_starts: ndarray = np.array([i * n - i * (i - 1) // 2 - i for i in range(n)], dtype=np.intp)
+        self._row_starts: list[int] = self.row_starts.tolist()  # python ints are faster for scalar access
+
+    @staticmethod
+    def from_dense(matrix: ndarray) -> 'PackedSymmetricMatrix':
+        return PackedSymmetricMatrix(np.ascontiguousarray(matrix[np.triu_indices(len(matrix))]), len(matrix))
+
+    @property
+    def nbytes(self) -> int:
+        return self.values.nbytes
+
+    def __len__(self) -> int:
+        return self.shape[0]
+
+    def __getitem__(self, key):
+        if not isinstance(key, tuple):
+            # whole row(s), as in the dense matrix
+            return self[np.asarray(key)[..., None], np.arange(self.shape[1])]
+        row, column = key
+        if isinstance(row, (int, np.integer)) and isinstance(column, (int, np.integer)):
+            if row > column:
+                row, column = column, row
+            return self.values[self._row_starts[row] + column]
+        row, column = np.asarray(row), np.asarray(column)
+        return self.values[self.row_starts[np.minimum(row, column)] + np.maximum(row, column)]
+
+    def __array__(self, dtype=None, copy=None) -> ndarray:
+        dense = self.to_dense()
+        return dense if dtype is None else dense.astype(dtype)
+
+    def to_dense(self) -> ndarray:
+        nodes = np.arange(self.shape[0])
+        return self[nodes[:, None], nodes[None, :]]
+
+
+class OnDemandMatrix(ABC):
+    """
+    Matrix with values calculated when accessed, instead of stored - for instances too large for n^2 memory.
+
+    Indexed like the dense matrix: `matrix[i, j]` (also with numpy arrays, broadcast), `matrix[i][j]`, or whole rows
+    `matrix[rows]`. Subclasses provide calculate_single (python ints, for the scalar hot path) and calculate_many.
+    """
+    def __init__(self, n: int, dtype: np.dtype):
+        self.shape: tuple[int, int] = (n, n)
+        self.dtype: np.dtype = np.dtype(dtype)
+
+    @property
+    def nbytes(self) -> int:
+        return 0
+
+    def __len__(self) -> int:
+        return self.shape[0]
+
+    def __getitem__(self, key):
+        if type(key) is tuple:
+            row, column = key
+            if _is_scalar_index(row) and _is_scalar_index(column):
+                return self.calculate_single(row, column)
+            return self.calculate_many(np.asarray(row), np.asarray(column))
+        if _is_scalar_index(key):
+            return _OnDemandMatrixRow(self, key)  # nothing calculated until indexed further
+        rows = np.arange(self.shape[0])[key] if isinstance(key, slice) else np.asarray(key)
+        return self.calculate_many(rows[..., None], np.arange(self.shape[1]))
+
+    def __array__(self, dtype=None, copy=None) -> ndarray:
+        dense = self.to_dense()
+        return dense if dtype is None else dense.astype(dtype)
+
+    def to_dense(self) -> ndarray:
+        return self[np.arange(self.shape[0])]
+
+    @abstractmethod
+    def calculate_single(self, row: int, column: int) -> int:
+        ...
+
+    @abstractmethod
+    def calculate_many(self, rows: ndarray, columns: ndarray) -> ndarray:
+        ...
+
+
+def _is_scalar_index(index) -> bool:
+    # exact type check first - on the hot path, checking against a tuple of types costs more than the lookup
+    return type(index) is int or isinstance(index, np.integer)
+
+
+class _OnDemandMatrixRow:
+    __slots__ = ('matrix', 'row')
+
+    def __init__(self, matrix: OnDemandMatrix, row: int):
+        self.matrix: OnDemandMatrix = matrix
+        self.row: int = row
+
+    def __len__(self) -> int:
+        return self.matrix.shape[1]
+
+    def __getitem__(self, column):
+        if _is_scalar_index(column):
+            return self.matrix.calculate_single(self.row, column)
+        return self.matrix[self.row, column]
+
+    def __array__(self, dtype=None, copy=None) -> ndarray:
+        row = self.matrix[self.row, np.arange(self.matrix.shape[1])]
+        return row if dtype is None else row.astype(dtype)
+
+
+class EuclideanDistancesMatrix(OnDemandMatrix):
+    """Rounded euclidean distances between points, the same values as TSP.build_distances_matrix"""
+    def __init__(self, x_coords: ndarray, y_coords: ndarray, dtype: np.dtype = np.int64):
+        super().__init__(len(x_coords), dtype)
+        self.x_coords: ndarray = np.asarray(x_coords, dtype=np.int64)
+        self.y_coords: ndarray = np.asarray(y_coords, dtype=np.int64)
+        self._x_coords: list[int] = self.x_coords.tolist()  # python ints are faster for scalar access
+        self._y_coords: list[int] = self.y_coords.tolist()
+
+    def calculate_single(self, row: int, column: int) -> int:
+        dx, dy = self._x_coords[row] - self._x_coords[column], self._y_coords[row] - self._y_coords[column]
+        # note - square root of an integer is never exactly x.5, so rounding half up is the same as numpy's round
+        return int(math.sqrt(dx * dx + dy * dy) + 0.5)
+
+    def calculate_many(self, rows: ndarray, columns: ndarray) -> ndarray:
+        return round(TSP.calculate_euclidean_distance(
+            (self.x_coords[rows], self.y_coords[rows]), (self.x_coords[columns], self.y_coords[columns])
+        ), 0).astype(self.dtype)
+
+
+class TotalMoveCostsMatrix(OnDemandMatrix):
+    """Distance plus additional cost of the destination (0 to itself), as TSP.build_total_move_costs_matrix"""
+    def __init__(self, distances_matrix: OnDemandMatrix, additional_costs: ndarray):
+        super().__init__(len(distances_matrix), distances_matrix.dtype)
+        self.distances_matrix: OnDemandMatrix = distances_matrix
+        self.additional_costs: ndarray = np.asarray(additional_costs, dtype=self.dtype)
+        self._additional_costs: list[int] = self.additional_costs.tolist()
+
+    def calculate_single(self, row: int, column: int) -> int:
+        if row == column:
+            return 0
+        return self.distances_matrix.calculate_single(row, column) + self._additional_costs[column]
+
+    def calculate_many(self, rows: ndarray, columns: ndarray) -> ndarray:
+        return np.where(rows == columns, self.dtype.type(0),
+                        self.distances_matrix.calculate_many(rows, columns) + self.additional_costs[columns])
+
+
 class TSP:
-    def __init__(self, path: str):
-        self.raw_data: DataFrame = read_csv(path, delimiter=';', header=None).rename(
-            columns={0: 'x', 1: 'y', 2: 'additional_cost'})
+    def __init__(self, path: str, use_cache: bool = True, cache_folder: str | None = None,
+                 packed_distances: bool = False, coordinates_only: bool = False):
+        # rows of x;y;additional_cost - parsed by numpy, so that solver processes don't have to import pandas
+        self.raw_data: ndarray = TSP.read_instance(path)
+        self.x_coords: ndarray = self.raw_data[:, 0]
+        self.y_coords: ndarray = self.raw_data[:, 1]
         self.nodes: List[int] = [i for i in range(len(self.raw_data))]
+        # narrowest integer type safe for the instance - less memory and cache traffic in delta evaluations
+        self.matrices_dtype: np.dtype = TSP.determine_matrices_dtype(self.x_coords, self.y_coords, self.raw_data[:, 2])
+        # same dtype as matrices - numpy scalar arithmetic on mixed dtypes is several times slower
         self.additional_costs: ndarray = self.calculate_additional_cost_array()
-        # note - distance is the same both sides, so could improve by doing only upper half
-        self.distances_matrix: ndarray = self.calculate_distances_matrix()
-        self.total_move_costs: ndarray = self.calculate_total_move_costs_matrix()
-        # note - distance is the same both sides, so could improve by doing only upper half
-        self.insertion_costs: ndarray = self.calculate_insertion_costs()
-        self.removal_changes: ndarray = self.calculate_removal_change()  # reverse operation of insertion_costs
+        # matrices are cached on disk by content of the csv, and memory-mapped (read-only) when already there
+        self.cache_folder: str = cache_folder or os.path.join(os.path.dirname(path), CACHE_FOLDER_NAME)
+        self.cache_key: str | None = TSP.calculate_cache_key(path) if use_cache and not coordinates_only else None
+        if coordinates_only:
+            if packed_distances:
+                raise Exception('packed_distances need distances_matrix, which is not stored with coordinates_only')
+            # nothing n^2 is stored - values are calculated from coordinates when accessed
+            self.distances_matrix: OnDemandMatrix = EuclideanDistancesMatrix(
+                self.x_coords, self.y_coords, dtype=self.matrices_dtype)
+            self.total_move_costs: OnDemandMatrix = TotalMoveCostsMatrix(self.distances_matrix, self.additional_costs)
+        else:
+            self.distances_matrix: ndarray = self.load_or_calculate('distances_matrix',
+                                                                    self.calculate_distances_matrix)
+            self.total_move_costs: ndarray = self.load_or_calculate('total_move_costs',
+                                                                    self.calculate_total_move_costs_matrix)
+        if packed_distances:
+            # distance is the same both sides, so only upper half is kept
+            self.distances_matrix: PackedSymmetricMatrix = PackedSymmetricMatrix.from_dense(self.distances_matrix)
+        # note - computed on demand, dense cubes would take n^3 memory
+        self.insertion_costs: InsertionCosts = self.calculate_insertion_costs()
+        self.removal_changes: InsertionCosts = self.calculate_removal_change()  # reverse operation of insertion_costs
+        # [by_distance] -> k nearest nodes of each node, built on first use and shared by all solvers
+        self.nearest_nodes: dict[bool, ndarray] = {}
+
+    def load_or_calculate(self, matrix_name: str, calculate) -> ndarray:
+        if self.cache_key is None:
+            return calculate()
+        cached_matrix_path = os.path.join(self.cache_folder, f'{self.cache_key}-{matrix_name}.npy')
+        try:
+            # note - plain (read-only) ndarray view of the mapped file, indexing np.memmap itself goes through python
+            #  and makes every scalar lookup several times slower
+            return np.asarray(np.load(cached_matrix_path, mmap_mode='r'))
+        except (OSError, ValueError):  # not cached yet (or unreadable)
+            pass
+
+        matrix = calculate()
+        try:
+            os.makedirs(self.cache_folder, exist_ok=True)
+            # renamed only once fully written, so that concurrent processes never map a partial file
+            temporary_path = f'{cached_matrix_path}.{os.getpid()}.tmp'
+            with open(temporary_path, 'wb') as file:
+                np.save(file, matrix)
+            os.replace(temporary_path, cached_matrix_path)
+        except OSError:  # e.g. read-only data folder - just go without cache
+            pass
+        return matrix
+
+    @staticmethod
+    def read_instance(path: str) -> ndarray:
+        return np.loadtxt(path, delimiter=';', dtype=np.int64, ndmin=2)
+
+    @staticmethod
+    def calculate_cache_key(path: str) -> str:
+        with open(path, 'rb') as file:
+            return sha256(file.read() + f'v{CACHE_VERSION}'.encode()).hexdigest()[:32]
 
     def calculate_additional_cost_array(self) -> ndarray:
-        return self.raw_data['additional_cost'].to_numpy()
+        return self.raw_data[:, 2].astype(self.matrices_dtype)
 
     def calculate_distances_matrix(self) -> ndarray:
-        distances_matrix = zeros((len(self.raw_data), len(self.raw_data))).astype(int)
-        for i in range(len(self.raw_data)):
-            for j in range(i+1, len(self.raw_data)):
-                point1 = (self.raw_data.loc[i, 'x'], self.raw_data.loc[i, 'y'])
-                point2 = (self.raw_data.loc[j, 'x'], self.raw_data.loc[j, 'y'])
-                distance = round(self.calculate_euclidean_distance(point1, point2), 0)
-                distances_matrix[i][j] = distance
-                distances_matrix[j][i] = distance
-        return distances_matrix
+        return TSP.build_distances_matrix(self.x_coords, self.y_coords, dtype=self.matrices_dtype)
 
     def calculate_total_move_costs_matrix(self) -> ndarray:
-        total_move_costs = self.distances_matrix.copy()
-        for i in range(len(self.raw_data)):
-            for j in range(len(self.raw_data)):
-                if i == j:
-                    continue
-                total_move_costs[i][j] += self.additional_costs[j]
-        return total_move_costs
+        return TSP.build_total_move_costs_matrix(self.distances_matrix, self.additional_costs)
 
-    def calculate_insertion_costs(self) -> ndarray:
+    def calculate_insertion_costs(self) -> InsertionCosts:
         # [edge_start_node][edge_end_node][inserted_node]
-        insertion_costs = zeros((len(self.raw_data), len(self.raw_data), len(self.raw_data))).astype(int)
-        for start in range(len(self.raw_data)):
-            for end in range(len(self.raw_data)):
-                for inserted in range(len(self.raw_data)):
-                    if inserted == start or inserted == end:
-                        continue
-                    if start == end:
-                        # "inserting node between itself" - i.e. forming cycle by appending 1 node to just 1 node
-                        # e.g. in greedy cycle method, at start
-                        insertion_costs[start][end][inserted] = (
-                                self.distances_matrix[start][inserted] + self.distances_matrix[inserted][end]
-                                + self.additional_costs[inserted])
-                        # no previous edge cost
-                        continue
-                    inserted_edge_cost = (self.distances_matrix[start][inserted] + self.distances_matrix[inserted][end]
-                                          + self.additional_costs[inserted])
-                    previous_edge_cost = self.distances_matrix[start][end]
-                    insertion_costs[start][end][inserted] = inserted_edge_cost - previous_edge_cost
-
-        return insertion_costs
-
-    def calculate_removal_change(self) -> ndarray:
+        return InsertionCosts(self.distances_matrix, self.additional_costs)
+
+    def calculate_removal_change(self) -> InsertionCosts:
         # [edge_start_node][edge_end_node][inserted_node]
-        removal_changes = zeros((len(self.raw_data), len(self.raw_data), len(self.raw_data))).astype(int)
-        for start in range(len(self.raw_data)):
-            for end in range(len(self.raw_data)):
-                for inserted in range(len(self.raw_data)):
-                    if inserted == start or inserted == end:
-                        continue
-                    if start == end:
-                        continue
-                    removed_edge_cost = (self.distances_matrix[start][inserted] + self.distances_matrix[inserted][end]
-                                          + self.additional_costs[inserted])
-                    previous_edge_cost = self.distances_matrix[start][end]
-                    removal_changes[start][end][inserted] = - removed_edge_cost + previous_edge_cost
-
-        return removal_changes
+        return InsertionCosts(self.distances_matrix, self.additional_costs, is_removal=True)
+
+    def get_nearest_nodes(self, k: int, by_distance: bool = False) -> ndarray:
+        """
+        [node][i] - i-th nearest other node, by total_move_costs (or distance only), ties broken by smaller node.
+        Built once for the largest k asked for so far, smaller k are its leading columns.
+        """
+        k = min(k, len(self.nodes) - 1)
+        nearest_nodes = self.nearest_nodes.get(by_distance)
+        if nearest_nodes is None or nearest_nodes.shape[1] < k:
+            nearest_nodes = TSP.build_nearest_nodes(self.distances_matrix if by_distance else self.total_move_costs, k)
+            self.nearest_nodes[by_distance] = nearest_nodes
+        return nearest_nodes[:, :k]
 
     def get_required_number_of_nodes_in_solution(self) -> int:
         return ceil(len(self.raw_data) / 2).astype(int)
@@ -132,81 +482,292 @@ class TSP:
                 nodes.remove(unwanted_node)
         return nodes
 
-    def calculate_solution(self, nodes) -> 'SolutionTSP':
-        return SolutionTSP(self, nodes)
-
-    def calculate_total_additional_cost(self, nodes: list) -> int:
-        return sum([self.additional_costs[node] for node in nodes])
-
-    def calculate_total_edge_length(self, nodes: list) -> int:
-        edges = TSP.determine_edges(nodes)
-        return sum([self.distances_matrix[start][end] for start, end in edges])
-
-    def calculate_total_objective_function(self, nodes: list):
-        edges = TSP.determine_edges(nodes)
-        return sum([self.total_move_costs[start][end] for start, end in edges])
-
-    def visualize_solution(self, solution: 'SolutionTSP', method_name: str, path_to_save: str = None):
-        nodes = solution.nodes
+    def calculate_solution(self, nodes, objective_function: int | None = None) -> 'SolutionTSP':
+        return SolutionTSP(self, nodes, objective_function=objective_function)
+
+    def calculate_total_additional_cost(self, nodes: list | ndarray) -> int:
+        # accumulated in int64 - matrices may be stored in a narrower dtype
+        return self.additional_costs[np.asarray(nodes)].sum(dtype=np.int64)
+
+    def calculate_total_edge_length(self, nodes: list | ndarray) -> int:
+        starts, ends = TSP.determine_edges_arrays(nodes)
+        return self.distances_matrix[starts, ends].sum(dtype=np.int64)
+
+    def calculate_total_objective_function(self, nodes: list | ndarray):
+        starts, ends = TSP.determine_edges_arrays(nodes)
+        return self.total_move_costs[starts, ends].sum(dtype=np.int64)
+
+    def evaluate_many(self, tours) -> tuple[ndarray, ndarray, ndarray]:
+        """
+        Objective functions, edge lengths and additional costs of many cycles of the same length at once.
+        Tours are rows of a 2D array of nodes - all their edges are gathered from distances_matrix in one go.
+        note - cycles need at least 2 nodes, a single node has no edge (total_move_costs has zeros on the diagonal)
+        """
+        tours = np.asarray(tours, dtype=np.intp)
+        if tours.ndim != 2:
+            raise Exception('tours have to be a 2D array, with one cycle per row')
+        if tours.shape[1] < 2:
+            raise Exception('tours have to have at least 2 nodes')
+        edge_lengths = self.distances_matrix[tours, np.roll(tours, -1, axis=1)].sum(axis=1, dtype=np.int64)
+        costs = self.additional_costs[tours].sum(axis=1, dtype=np.int64)
+        return edge_lengths + costs, edge_lengths, costs
+
+    def visualize_solution(self, solution: 'SolutionTSP', method_name: str, path_to_save: str = None,
+                           renderer: 'SolutionRenderer | None' = None):
+        render_arguments = (self.x_coords, self.y_coords, self.raw_data[:, 2], solution.nodes_array,
+                            method_name, path_to_save)
+        if renderer is None:
+            render_solution(*render_arguments)
+        else:
+            renderer.submit(*render_arguments)
 
-        x_coords = self.raw_data.loc[nodes, 'x'].to_numpy()
-        y_coords = self.raw_data.loc[nodes, 'y'].to_numpy()
-        additional_costs = self.raw_data.loc[nodes, 'additional_cost'].to_numpy()
+    @staticmethod
+    def determine_edges(nodes: list) -> list:
+        return pairwise(nodes + [nodes[0]])
 
-        cmap = plt.cm.viridis
+    @staticmethod
+    def determine_edges_arrays(nodes: list | ndarray) -> tuple[ndarray, ndarray]:
+        # same edges as determine_edges, as arrays of start and end nodes
+        starts = np.asarray(nodes)
+        return starts, np.roll(starts, -1)
 
-        x_coords_all = self.raw_data['x'].to_numpy()
-        y_coords_all = self.raw_data['y'].to_numpy()
-        additional_costs_all = self.raw_data['additional_cost'].to_numpy()
+    @staticmethod
+    def determine_matrices_dtype(x_coords: ndarray, y_coords: ndarray, additional_costs: ndarray) -> np.dtype:
+        # upper bound of distances and total move costs, from ranges of coordinates and costs
+        max_distance = int(np.ceil(np.hypot(np.ptp(x_coords), np.ptp(y_coords))))
+        max_value = max_distance + int(np.abs(additional_costs).max())
+        for dtype in (np.int16, np.int32):
+            if max_value * MATRIX_VALUES_HEADROOM <= np.iinfo(dtype).max:
+                return np.dtype(dtype)
+        return np.dtype(np.int64)
 
-        all_additional_costs = np.concatenate((additional_costs_all, additional_costs))
-        normalize_costs = mcolors.Normalize(vmin=all_additional_costs.min(), vmax=all_additional_costs.max())
+    @staticmethod
+    def build_distances_matrix(x_coords: ndarray, y_coords: ndarray, rows_per_block: int = 1024,
+                               dtype: np.dtype = np.int64) -> ndarray:
+        """
+        Rounded euclidean distances between all pairs of points, built by broadcasting.
+        Rows are processed in blocks, so the float temporaries stay small even for large instances.
+        """
+        x_coords, y_coords = np.asarray(x_coords, dtype=np.int64), np.asarray(y_coords, dtype=np.int64)
+        distances_matrix = np.empty((len(x_coords), len(x_coords)), dtype=dtype)
+        for block_start in range(0, len(x_coords), rows_per_block):
+            block = slice(block_start, block_start + rows_per_block)
+            distances_matrix[block] = round(TSP.calculate_euclidean_distance(
+                (x_coords[block, None], y_coords[block, None]),
+                (x_coords[None, :], y_coords[None, :])
+            ), 0)
+        return distances_matrix
 
-        fig, ax = plt.subplots(figsize=(15, 12))
-        for i in range(len(x_coords_all)):
-            ax.plot(x_coords_all[i], y_coords_all[i], "o", markersize=10,
-                    color=cmap(normalize_costs(additional_costs_all[i])), zorder=1)
-
-        for i in range(len(x_coords)):
-            ax.plot(x_coords[i], y_coords[i], "o", markersize=12, color=cmap(normalize_costs(additional_costs[i])),
-                    zorder=2)
-
-        for i, j in pairwise(nodes + [nodes[0]]):
-            x_start, y_start = self.raw_data.loc[i, 'x'], self.raw_data.loc[i, 'y']
-            x_end, y_end = self.raw_data.loc[j, 'x'], self.raw_data.loc[j, 'y']
-            ax.plot((x_start, x_end), (y_start, y_end), "-", color='#36454f', zorder=1)
-
-        gradient = np.linspace(0, 1, 256).reshape(-1, 1)
-        axins = ax.inset_axes([1.05, 0.1, 0.05, 0.6], transform=ax.transAxes)
-        axins.imshow(gradient, aspect='auto', cmap=cmap, origin='lower',
-                     extent=[0, 1, additional_costs.min(), additional_costs.max()])
-        axins.xaxis.set_visible(False)
-        axins.set_ylabel('Cost', fontsize=12)
-
-        plt.xlabel('x')
-        plt.ylabel('y')
-        plt.title(f'TSP Solution: {method_name}')
-
-        if path_to_save:
-            plt.savefig(path_to_save)
-        else:
-            plt.show()
+    @staticmethod
+    def build_total_move_costs_matrix(distances_matrix: ndarray, additional_costs: ndarray) -> ndarray:
+        # moving to a node costs the edge plus the node's additional cost - except "moving" to itself
+        total_move_costs = distances_matrix + np.asarray(additional_costs, dtype=distances_matrix.dtype)[None, :]
+        np.fill_diagonal(total_move_costs, 0)
+        return total_move_costs
 
     @staticmethod
-    def determine_edges(nodes: list) -> list:
-        return pairwise(nodes + [nodes[0]])
+    def build_nearest_nodes(matrix: ndarray, k: int, rows_per_block: int = 1024) -> ndarray:
+        # partial sort (argpartition) of each row, then sorting just the k chosen - O(n^2 + n k log k)
+        n = len(matrix)
+        nodes = np.arange(n)
+        nearest_nodes = np.empty((n, k), dtype=SOLUTION_NODES_DTYPE)
+        if k == 0:
+            return nearest_nodes
+        for block_start in range(0, n, rows_per_block):
+            rows = nodes[block_start:block_start + rows_per_block]
+            # unique keys, ordered by value and then by node - ties are resolved the same as by sorting tuples
+            keys = np.asarray(matrix[rows], dtype=np.int64) * n + nodes[None, :]
+            keys[np.arange(len(rows)), rows] = np.iinfo(np.int64).max  # node is not its own neighbor
+            candidates = np.argpartition(keys, k - 1, axis=1)[:, :k]
+            order = np.argsort(np.take_along_axis(keys, candidates, axis=1), axis=1)
+            nearest_nodes[rows] = np.take_along_axis(candidates, order, axis=1)
+        return nearest_nodes
 
     @staticmethod
     def calculate_euclidean_distance(point1, point2):
         return sqrt((point2[0] - point1[0]) ** 2 + (point2[1] - point1[1]) ** 2)
 
     @staticmethod
-    def load_tspa(data_folder: str = DATA_FOLDER) -> 'TSP':
-        return TSP(f'{data_folder}/TSPA.csv')
+    def load_tspa(data_folder: str = DATA_FOLDER, use_cache: bool = True) -> 'TSP':
+        return TSP(f'{data_folder}/TSPA.csv', use_cache=use_cache)
 
     @staticmethod
-    def load_tspb(data_folder: str = DATA_FOLDER) -> 'TSP':
-        return TSP(f'{data_folder}/TSPB.csv')
+    def load_tspb(data_folder: str = DATA_FOLDER, use_cache: bool = True) -> 'TSP':
+        return TSP(f'{data_folder}/TSPB.csv', use_cache=use_cache)
+
+
+def render_solution(x_coords: ndarray, y_coords: ndarray, additional_costs: ndarray, nodes: ndarray,
+                    method_name: str, path_to_save: str = None):
+    """All nodes colored by additional cost, the solution's nodes enlarged and its cycle drawn over them"""
+    # imported only when plotting - matplotlib alone takes about a second to import
+    import matplotlib.colors as mcolors
+    from matplotlib import colormaps
+    from matplotlib.collections import LineCollection
+
+    if path_to_save:
+        from matplotlib.figure import Figure
+        fig = Figure(figsize=(15, 12))  # not registered with pyplot - nothing to close, works in any process
+        ax = fig.subplots()
+    else:
+        import matplotlib.pyplot as plt
+        fig, ax = plt.subplots(figsize=(15, 12))
+
+    nodes = np.asarray(nodes)
+    cmap = colormaps['viridis']
+    normalize_costs = mcolors.Normalize(vmin=additional_costs.min(), vmax=additional_costs.max())
+
+    # note - scatter sizes are areas, so squares of plot's markersize
+    ax.scatter(x_coords, y_coords, s=10 ** 2, c=additional_costs, cmap=cmap, norm=normalize_costs, zorder=1)
+    points = np.column_stack((x_coords[nodes], y_coords[nodes]))
+    ax.add_collection(LineCollection(np.stack((points, np.roll(points, -1, axis=0)), axis=1),
+                                     colors='#36454f', zorder=1))
+    ax.scatter(points[:, 0], points[:, 1], s=12 ** 2, c=additional_costs[nodes], cmap=cmap, norm=normalize_costs,
+               zorder=2)
+
+    gradient = np.linspace(0, 1, 256).reshape(-1, 1)
+    axins = ax.inset_axes([1.05, 0.1, 0.05, 0.6], transform=ax.transAxes)
+    axins.imshow(gradient, aspect='auto', cmap=cmap, origin='lower',
+                 extent=[0, 1, additional_costs[nodes].min(), additional_costs[nodes].max()])
+    axins.xaxis.set_visible(False)
+    axins.set_ylabel('Cost', fontsize=12)
+
+    ax.set_xlabel('x')
+    ax.set_ylabel('y')
+    ax.set_title(f'TSP Solution: {method_name}')
+
+    if path_to_save:
+        fig.savefig(path_to_save)
+    else:
+        plt.show()
+
+
+class SolutionRenderer:
+    """
+    Takes rendering of solutions out of the solver loop - pass it to TSP.visualize_solution.
+    With background, plots are rendered by a separate process pool as they come, otherwise they are deferred until
+    render_all(). close() (or leaving the context manager) renders what is left and waits for it.
+    """
+    def __init__(self, background: bool = True, max_workers: int = 1):
+        self.background: bool = background
+        self.max_workers: int = max_workers
+        self.executor = None  # started with the first plot
+        self.futures: list = []
+        self.deferred: list[tuple] = []
+
+    def submit(self, *render_arguments):
+        if not self.background:
+            self.deferred.append(render_arguments)
+            return
+        if render_arguments[-1] is None:
+            raise Exception('solutions rendered in background have to be saved - path_to_save is required')
+        if self.executor is None:
+            from concurrent.futures import ProcessPoolExecutor
+            import multiprocessing
+            self.executor = ProcessPoolExecutor(self.max_workers, mp_context=multiprocessing.get_context('spawn'))
+        self.futures.append(self.executor.submit(render_solution, *render_arguments))
+
+    def render_all(self):
+        for render_arguments in self.deferred:
+            render_solution(*render_arguments)
+        self.deferred.clear()
+        for future in self.futures:
+            future.result()  # raises errors of rendering in background
+        self.futures.clear()
+
+    def close(self):
+        self.render_all()
+        if self.executor is not None:
+            self.executor.shutdown()
+            self.executor = None
+
+    def __enter__(self) -> 'SolutionRenderer':
+        return self
+
+    def __exit__(self, *_):
+        self.close()
+
+
+class SharedTSP:
+    """
+    TSP published once into shared memory, for process pools. All numpy arrays of the instance (matrices, costs,
+    nearest nodes, ...) are copied into a single shared memory segment, everything else is pickled.
+
+    Pickling this object (e.g. as a worker's initializer argument) sends just the segment name and the small rest,
+    attach() in the worker then gives a TSP with read-only views of the shared arrays - no copies per worker.
+    The publishing process owns the segment: close() and unlink() it when done (or use it as a context manager).
+    """
+    def __init__(self, tsp: 'TSP'):
+        arrays: list[ndarray] = []
+        array_indices: dict[int, int] = {}  # id -> index, so that arrays referenced more times are copied once
+
+        class ArraysCollectingPickler(pickle.Pickler):
+            def persistent_id(self, obj):
+                if not isinstance(obj, np.ndarray):
+                    return None
+                if id(obj) not in array_indices:
+                    array_indices[id(obj)] = len(arrays)
+                    arrays.append(obj)
+                return array_indices[id(obj)]
+
+        pickled_tsp = io.BytesIO()
+        ArraysCollectingPickler(pickled_tsp, protocol=pickle.HIGHEST_PROTOCOL).dump(tsp)
+        self.pickled_tsp: bytes = pickled_tsp.getvalue()
+
+        # (offset, shape, dtype) of each array in the segment
+        self.layout: list[tuple[int, tuple, str]] = []
+        size = 0
+        for array in arrays:
+            offset = -(-size // SHARED_ARRAYS_ALIGNMENT) * SHARED_ARRAYS_ALIGNMENT
+            self.layout.append((offset, array.shape, array.dtype.str))
+            size = offset + array.nbytes
+        self.shared_memory: SharedMemory | None = SharedMemory(create=True, size=max(size, 1))
+        self.name: str = self.shared_memory.name
+        self.is_owner: bool = True
+        for array, (offset, shape, dtype) in zip(arrays, self.layout):
+            np.ndarray(shape, dtype=dtype, buffer=self.shared_memory.buf, offset=offset)[...] = array
+
+    def __getstate__(self):
+        return self.name, self.layout, self.pickled_tsp
+
+    def __setstate__(self, state):
+        self.name, self.layout, self.pickled_tsp = state
+        self.shared_memory = None
+        self.is_owner = False
+
+    def attach(self) -> 'TSP':
+        if self.shared_memory is None:
+            self.shared_memory = SharedMemory(name=self.name)
+        shared_arrays = []
+        for offset, shape, dtype in self.layout:
+            shared_array = np.ndarray(shape, dtype=dtype, buffer=self.shared_memory.buf, offset=offset)
+            shared_array.flags.writeable = False
+            shared_arrays.append(shared_array)
+
+        class SharedArraysUnpickler(pickle.Unpickler):
+            def persistent_load(self, pid):
+                return shared_arrays[pid]
+
+        tsp = SharedArraysUnpickler(io.BytesIO(self.pickled_tsp)).load()
+        # the views are valid only while the segment is mapped
+        tsp.shared_memory = self.shared_memory
+        return tsp
+
+    def close(self):
+        # note - only once TSPs attached in this process are not used anymore
+        if self.shared_memory is not None:
+            self.shared_memory.close()
+
+    def unlink(self):
+        # segment is freed once all processes close it
+        if self.is_owner:
+            self.shared_memory.unlink()
+
+    def __enter__(self) -> 'SharedTSP':
+        return self
+
+    def __exit__(self, *_):
+        self.close()
+        self.unlink()
 
 
 if __name__ == "__main__":
@@ -214,8 +775,8 @@ if __name__ == "__main__":
     tsp = TSP.load_tspa()
     t1 = time()
     print(f'execution_time: {t1 - t0}')
-    print(tsp.raw_data.head())
+    print(tsp.raw_data[:5])
     print(tsp.distances_matrix)
     print(tsp.additional_costs)
     print(tsp.total_move_costs)
-    print(tsp.insertion_costs)
+    print(tsp.insertion_costs.to_dense())
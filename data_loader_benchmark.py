@@ -0,0 +1,175 @@
+from data_loader import TSP, PackedSymmetricMatrix, SharedTSP
+
+from time import time
+from tempfile import TemporaryDirectory
+from concurrent.futures import ProcessPoolExecutor
+import multiprocessing
+import pickle
+import subprocess
+import sys
+import numpy as np
+
+SIZES = [200, 500, 1_000, 2_000, 5_000, 10_000]
+REFERENCE_CHECK_SIZE = 200
+CACHED_LOAD_SIZES = [200, 2_000, 5_000]
+IMPORT_REPEATS = 5
+EVALUATED_TOURS = 1_000
+COORDINATES_ONLY_SIZES = [10_000, 20_000]
+SCALAR_LOOKUPS = 100_000
+NEAREST_NODES = 10
+SHARED_INSTANCE_SIZE = 2_000
+POOL_WORKERS = 4
+# what data_loader used to import eagerly - for comparison with its current import time
+HEAVY_MODULES = ['pandas', 'matplotlib.pyplot', 'matplotlib.colors']
+
+
+def generate_points(n: int, rng: np.random.Generator) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    # same ranges as in TSPA / TSPB
+    return rng.integers(0, 4000, n), rng.integers(0, 2000, n), rng.integers(0, 2000, n)
+
+
+def time_load_in_new_process(path: str) -> float:
+    # fresh interpreter, so nothing is shared with the process that filled the cache
+    return float(subprocess.check_output([sys.executable, '-c', (
+        'from time import time; from data_loader import TSP; '
+        f't0 = time(); TSP({path!r}); print(time() - t0)'
+    )]))
+
+
+def time_import_in_new_process(modules: list[str]) -> float:
+    # best of a few runs, each in a fresh interpreter (so modules are not already in sys.modules)
+    return min(float(subprocess.check_output([sys.executable, '-c', (
+        f'from time import time; t0 = time(); import {", ".join(modules)}; print(time() - t0)'
+    )])) for _ in range(IMPORT_REPEATS))
+
+
+def set_worker_tsp(tsp: TSP | SharedTSP):
+    global worker_tsp
+    worker_tsp = tsp.attach() if isinstance(tsp, SharedTSP) else tsp
+
+
+def evaluate_in_worker(tour: list[int]) -> int:
+    return worker_tsp.calculate_total_objective_function(tour)
+
+
+def time_pool_evaluation(tsp: TSP | SharedTSP, tours: list[list[int]]) -> tuple[float, list[int]]:
+    # start of the workers (getting the instance there) included
+    t0 = time()
+    with ProcessPoolExecutor(POOL_WORKERS, mp_context=multiprocessing.get_context('spawn'),
+                             initializer=set_worker_tsp, initargs=(tsp,)) as executor:
+        objective_functions = list(executor.map(evaluate_in_worker, tours))
+    return time() - t0, objective_functions
+
+
+def reference_distances_matrix(x_coords: np.ndarray, y_coords: np.ndarray) -> np.ndarray:
+    # the original nested loops, kept to check the vectorized builder is bit-identical
+    distances_matrix = np.zeros((len(x_coords), len(x_coords))).astype(int)
+    for i in range(len(x_coords)):
+        for j in range(i+1, len(x_coords)):
+            distance = np.round(TSP.calculate_euclidean_distance(
+                (x_coords[i], y_coords[i]), (x_coords[j], y_coords[j])), 0)
+            distances_matrix[i][j] = distance
+            distances_matrix[j][i] = distance
+    return distances_matrix
+
+
+def reference_total_move_costs_matrix(distances_matrix: np.ndarray, additional_costs: np.ndarray) -> np.ndarray:
+    total_move_costs = distances_matrix.copy()
+    for i in range(len(additional_costs)):
+        for j in range(len(additional_costs)):
+            if i == j:
+                continue
+            total_move_costs[i][j] += additional_costs[j]
+    return total_move_costs
+
+
+if __name__ == '__main__':
+    print(f'import data_loader: {time_import_in_new_process(["data_loader"]):.4f}s,\t'
+          f'import {", ".join(HEAVY_MODULES)}: {time_import_in_new_process(HEAVY_MODULES):.4f}s')
+    assert subprocess.check_output([sys.executable, '-c', (
+        'import sys, data_loader; print(any(m in sys.modules for m in ("pandas", "matplotlib")))'
+    )]).strip() == b'False', 'data_loader should not import pandas / matplotlib'
+
+    rng = np.random.default_rng(0)
+
+    x_coords, y_coords, additional_costs = generate_points(REFERENCE_CHECK_SIZE, rng)
+    distances_matrix = TSP.build_distances_matrix(x_coords, y_coords)
+    total_move_costs = TSP.build_total_move_costs_matrix(distances_matrix, additional_costs)
+    reference_distances = reference_distances_matrix(x_coords, y_coords)
+    assert distances_matrix.dtype == reference_distances.dtype
+    assert np.array_equal(distances_matrix, reference_distances)
+    assert np.array_equal(total_move_costs, reference_total_move_costs_matrix(reference_distances, additional_costs))
+    print(f'(bit-identical to reference loops for n={REFERENCE_CHECK_SIZE})')
+
+    for n in SIZES:
+        x_coords, y_coords, additional_costs = generate_points(n, rng)
+        dtype = TSP.determine_matrices_dtype(x_coords, y_coords, additional_costs)
+        t0 = time()
+        distances_matrix = TSP.build_distances_matrix(x_coords, y_coords, dtype=dtype)
+        t1 = time()
+        total_move_costs = TSP.build_total_move_costs_matrix(distances_matrix, additional_costs)
+        t2 = time()
+        packed_distances_matrix = PackedSymmetricMatrix.from_dense(distances_matrix)
+        t3 = time()
+        print(f'n: {n},\tdistances_matrix: {t1 - t0:.4f}s,\ttotal_move_costs: {t2 - t1:.4f}s,\t'
+              f'packing: {t3 - t2:.4f}s,\tdtype: {dtype},\t'
+              f'memory: {(distances_matrix.nbytes + total_move_costs.nbytes) / 2**20:.1f} MiB '
+              f'(packed distances: {(packed_distances_matrix.nbytes + total_move_costs.nbytes) / 2**20:.1f} MiB, '
+              f'int64: {2 * n * n * 8 / 2**20:.1f} MiB)')
+        del distances_matrix, total_move_costs, packed_distances_matrix
+
+    with TemporaryDirectory() as temporary_folder:
+        for n in CACHED_LOAD_SIZES:
+            path = f'{temporary_folder}/instance-{n}.csv'
+            np.savetxt(path, np.column_stack(generate_points(n, rng)), fmt='%d', delimiter=';')
+            uncached_load_time = time_load_in_new_process(path)  # calculates and fills the cache
+            cached_load_time = time_load_in_new_process(path)  # memory-maps cached matrices
+            print(f'n: {n},\tTSP load (cold cache): {uncached_load_time:.4f}s,\t'
+                  f'TSP load (warm cache): {cached_load_time:.4f}s')
+
+    tsp = TSP.load_tspa()
+    tours = np.array([rng.permutation(len(tsp.nodes))[:tsp.get_required_number_of_nodes_in_solution()]
+                      for _ in range(EVALUATED_TOURS)])
+    t0 = time()
+    solutions = [tsp.calculate_solution(tour.tolist()) for tour in tours]
+    # metrics of solutions are calculated lazily, on first access
+    metrics = [(solution.objective_function, solution.edge_length, solution.cost) for solution in solutions]
+    t1 = time()
+    objective_functions, edge_lengths, costs = tsp.evaluate_many(tours)
+    t2 = time()
+    assert list(zip(objective_functions.tolist(), edge_lengths.tolist(), costs.tolist())) == metrics
+    print(f'{EVALUATED_TOURS} tours,\tcalculate_solution one by one: {t1 - t0:.4f}s,\tevaluate_many: {t2 - t1:.4f}s')
+
+    with TemporaryDirectory() as temporary_folder:
+        for n in COORDINATES_ONLY_SIZES:
+            path = f'{temporary_folder}/instance-{n}.csv'
+            np.savetxt(path, np.column_stack(generate_points(n, rng)), fmt='%d', delimiter=';')
+            t0 = time()
+            tsp = TSP(path, coordinates_only=True)
+            t1 = time()
+            nearest_nodes = tsp.get_nearest_nodes(NEAREST_NODES, by_distance=True)
+            t2 = time()
+            lookups = rng.integers(0, n, (SCALAR_LOOKUPS, 2)).tolist()
+            t3 = time()
+            for i, j in lookups:
+                tsp.distances_matrix[i, j]
+            t4 = time()
+            print(f'n: {n},\tcoordinates_only TSP: {t1 - t0:.4f}s,\t{NEAREST_NODES} nearest nodes: {t2 - t1:.4f}s '
+                  f'({nearest_nodes.nbytes / 2**20:.1f} MiB),\t'
+                  f'distance lookup: {(t4 - t3) / SCALAR_LOOKUPS * 1e9:.0f}ns,\t'
+                  f'dense matrices would take: {2 * n * n * tsp.matrices_dtype.itemsize / 2**20:.1f} MiB')
+
+    with TemporaryDirectory() as temporary_folder:
+        path = f'{temporary_folder}/instance-{SHARED_INSTANCE_SIZE}.csv'
+        np.savetxt(path, np.column_stack(generate_points(SHARED_INSTANCE_SIZE, rng)), fmt='%d', delimiter=';')
+        tsp = TSP(path, use_cache=False)
+        tours = [rng.permutation(SHARED_INSTANCE_SIZE)[:SHARED_INSTANCE_SIZE // 2].tolist()
+                 for _ in range(POOL_WORKERS)]
+        pickled_time, pickled_objective_functions = time_pool_evaluation(tsp, tours)
+        with SharedTSP(tsp) as shared_tsp:
+            shared_time, shared_objective_functions = time_pool_evaluation(shared_tsp, tours)
+            shared_tsp_size = len(pickle.dumps(shared_tsp))
+        assert pickled_objective_functions == shared_objective_functions
+        print(f'n: {SHARED_INSTANCE_SIZE},\t{POOL_WORKERS} workers,\t'
+              f'pickled TSP: {len(pickle.dumps(tsp)) / 2**20:.1f} MiB per worker, {pickled_time:.4f}s,\t'
+              f'SharedTSP: {shared_tsp_size / 2**10:.1f} KiB per worker, {shared_time:.4f}s')
@@ -0,0 +1,66 @@
+from enum import Enum
+import os
+
+import numpy as np
+from numpy import ndarray
+
+
+GENERATED_DATA_FOLDER = 'data/generated'
+# same ranges as in TSPA / TSPB
+WIDTH = 4000
+HEIGHT = 2000
+MAX_ADDITIONAL_COST = 2000
+
+
+class InstanceDistribution(Enum):
+    UNIFORM = 0  # points and additional costs uniform, independent of each other
+    CLUSTERED = 1  # points normally distributed around a few uniform cluster centers
+    CORRELATED_COSTS = 2  # uniform points, additional costs growing along x (plus noise)
+
+
+def generate_instance(n: int, distribution: InstanceDistribution = InstanceDistribution.UNIFORM,
+                      seed: int | None = None, clusters: int = 8,
+                      cluster_spread: float = 0.05) -> tuple[ndarray, ndarray, ndarray]:
+    """
+    x, y and additional costs of n nodes, integer as in the provided instances.
+    cluster_spread - standard deviation of points around their cluster center, relative to the width / height.
+    """
+    rng = np.random.default_rng(seed)
+    match distribution:
+        case InstanceDistribution.UNIFORM:
+            x_coords, y_coords = rng.integers(0, WIDTH, n), rng.integers(0, HEIGHT, n)
+            additional_costs = rng.integers(0, MAX_ADDITIONAL_COST, n)
+        case InstanceDistribution.CLUSTERED:
+            centers = rng.integers(0, (WIDTH, HEIGHT), (clusters, 2))
+            points = centers[rng.integers(0, clusters, n)] + rng.normal(0, cluster_spread, (n, 2)) * (WIDTH, HEIGHT)
+            x_coords = np.clip(np.round(points[:, 0]), 0, WIDTH - 1).astype(np.int64)
+            y_coords = np.clip(np.round(points[:, 1]), 0, HEIGHT - 1).astype(np.int64)
+            additional_costs = rng.integers(0, MAX_ADDITIONAL_COST, n)
+        case InstanceDistribution.CORRELATED_COSTS:
+            x_coords, y_coords = rng.integers(0, WIDTH, n), rng.integers(0, HEIGHT, n)
+            noise = rng.normal(0, 0.1 * MAX_ADDITIONAL_COST, n)
+            additional_costs = np.clip(np.round(x_coords / WIDTH * MAX_ADDITIONAL_COST + noise),
+                                       0, MAX_ADDITIONAL_COST - 1).astype(np.int64)
+        case _:
+            raise Exception('no such distribution')
+    return x_coords, y_coords, additional_costs
+
+
+def save_instance(path: str, x_coords: ndarray, y_coords: ndarray, additional_costs: ndarray):
+    # x;y;additional_cost rows, same as the provided instances - readable by TSP
+    np.savetxt(path, np.column_stack((x_coords, y_coords, additional_costs)), fmt='%d', delimiter=';')
+
+
+def generate_instance_file(n: int, distribution: InstanceDistribution = InstanceDistribution.UNIFORM,
+                           seed: int = 0, data_folder: str = GENERATED_DATA_FOLDER) -> str:
+    os.makedirs(data_folder, exist_ok=True)
+    path = f'{data_folder}/{distribution.name}-{n}-{seed}.csv'
+    if not os.path.exists(path):  # same parameters always give the same instance
+        save_instance(path, *generate_instance(n, distribution, seed))
+    return path
+
+
+if __name__ == '__main__':
+    for distribution in InstanceDistribution:
+        for n in [200, 1_000, 5_000]:
+            print(generate_instance_file(n, distribution, seed=0))
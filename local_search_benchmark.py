@@ -0,0 +1,58 @@
+from data_loader import TSP
+from assignment3.local_search_types import LocalSearchType, StartingSolutionType, IntraRouteMovesType
+from assignment3.local_search import local_search_solve
+from assignment4.local_search_candidate_moves import local_search_candidate_moves_solve
+from assignment5.local_search_with_deltas import local_search_with_deltas_solve
+from assignment5.local_search_no_deltas import local_search_no_deltas_solve
+from assignment5.local_search_no_deltas_vectorized import local_search_no_deltas_vectorized_solve
+
+from statistics import mean
+from time import time
+import random
+
+STARTING_NODES = [1, 2, 3]  # initial seeds of random starting solutions
+INTRA_ROUTE_MOVE_TYPES = [IntraRouteMovesType.TWO_EDGES, IntraRouteMovesType.TWO_NODES]
+COLLECT_TELEMETRY = False  # in case True, telemetry part of stats (timers, queue sizes) is printed for every run
+
+METHODS = {
+    'ls-steepest': lambda tsp, **arguments: local_search_solve(
+        tsp, local_search_type=LocalSearchType.STEEPEST, **arguments),
+    'ls-greedy': lambda tsp, **arguments: local_search_solve(
+        tsp, local_search_type=LocalSearchType.GREEDY, **arguments),
+    'ls-candidates-steepest': lambda tsp, **arguments: local_search_candidate_moves_solve(
+        tsp, local_search_type=LocalSearchType.STEEPEST, **arguments),
+    'ls-candidates-steepest-dont-look-bits': lambda tsp, **arguments: local_search_candidate_moves_solve(
+        tsp, local_search_type=LocalSearchType.STEEPEST, use_dont_look_bits=True, **arguments),
+    'ls-deltas-steepest': lambda tsp, **arguments: local_search_with_deltas_solve(
+        tsp, local_search_type=LocalSearchType.STEEPEST, **arguments),
+    'ls-deltas-steepest-dont-look-bits': lambda tsp, **arguments: local_search_with_deltas_solve(
+        tsp, local_search_type=LocalSearchType.STEEPEST, use_dont_look_bits=True, **arguments),
+    'ls-deltas-greedy': lambda tsp, **arguments: local_search_with_deltas_solve(
+        tsp, local_search_type=LocalSearchType.GREEDY, **arguments),
+    'ls-no-deltas-steepest': lambda tsp, **arguments: local_search_no_deltas_solve(
+        tsp, local_search_type=LocalSearchType.STEEPEST, **arguments),
+    'ls-no-deltas-vectorized-steepest': local_search_no_deltas_vectorized_solve,
+}
+
+
+if __name__ == '__main__':
+    problems = {'TSPA': TSP.load_tspa(), 'TSPB': TSP.load_tspb()}
+    for problem_name, tsp in problems.items():
+        for intra_route_move_type in INTRA_ROUTE_MOVE_TYPES:
+            for method_name, method in METHODS.items():
+                times, objective_functions, moves_evaluated = [], [], []
+                for starting_node in STARTING_NODES:
+                    random.seed(starting_node)  # greedy LS picks moves at random
+                    t0 = time()
+                    solution, stats = method(tsp, starting_solution_type=StartingSolutionType.RANDOM,
+                                             intra_route_move_type=intra_route_move_type, starting_node=starting_node,
+                                             collect_telemetry=COLLECT_TELEMETRY)
+                    times.append(time() - t0)
+                    objective_functions.append(solution.objective_function)
+                    moves_evaluated.append(stats['moves_evaluated'])
+                    if COLLECT_TELEMETRY:
+                        print(f'{problem_name},\t{intra_route_move_type.name},\t{method_name},\t'
+                              f'starting_node: {starting_node}:\t{stats}', flush=True)
+                print(f'{problem_name},\t{intra_route_move_type.name},\t{method_name}:\t'
+                      f'avg time: {mean(times):.4f}s,\tavg objective_function: {mean(objective_functions):.1f},\t'
+                      f'avg moves_evaluated: {mean(moves_evaluated):.0f}', flush=True)
@@ -0,0 +1,124 @@
+from data_loader import TSP
+from instance_generator import InstanceDistribution, generate_instance_file
+from assignment1.random_solution import random_solve
+from assignment1.nearest_neighbor_at_end import nearest_neighbor_at_end_solve
+from assignment1.nearest_neighbor_at_any import nearest_neighbor_at_any_solve
+from assignment1.greedy_cycle import greedy_cycle_solve
+from assignment2.greedy_2_regret import greedy_2_regret_solve
+from assignment2.greedy_2_regret_weighted_objective import greedy_2_regret_weighted_objective_solve
+from assignment2.greedy_2_regret_variation import greedy_2_regret_variation_solve
+from assignment2.greedy_2_regret_weighted_objective_variation import greedy_2_regret_weighted_objective_variation_solve
+from assignment3.local_search_types import LocalSearchType, StartingSolutionType, IntraRouteMovesType
+from assignment3.local_search import local_search_solve
+from assignment4.local_search_candidate_moves import local_search_candidate_moves_solve
+from assignment5.local_search_with_deltas import local_search_with_deltas_solve
+from assignment5.local_search_no_deltas import local_search_no_deltas_solve
+
+from time import time
+import multiprocessing
+import resource  # note - unix only, used for peak memory of measured processes
+import random
+import json
+import os
+
+
+SIZES = [200, 500, 1_000, 2_000, 5_000, 10_000, 20_000]
+DISTRIBUTION = InstanceDistribution.UNIFORM
+# once a measurement takes longer, it's stopped and the method is not run for larger instances
+TIME_LIMIT_SECONDS = 300
+EXPERIMENTS_RESULTS_FOLDER = 'experiments_results/scaling'
+TSP_CONSTRUCTION = 'tsp_construction'
+LS_ARGUMENTS = {'starting_solution_type': StartingSolutionType.RANDOM,
+                'intra_route_move_type': IntraRouteMovesType.TWO_EDGES, 'starting_node': 1}
+
+METHODS = {
+    'random': lambda tsp: random_solve(tsp, initial_seed=1),
+    'nearest_neighbor_at_end': lambda tsp: nearest_neighbor_at_end_solve(tsp, starting_node=1),
+    'nearest_neighbor_at_any': lambda tsp: nearest_neighbor_at_any_solve(tsp, starting_node=1),
+    'greedy_cycle': lambda tsp: greedy_cycle_solve(tsp, starting_node=1),
+    'greedy_2_regret': lambda tsp: greedy_2_regret_solve(tsp, starting_node=1),
+    'greedy_2_regret_weighted': lambda tsp: greedy_2_regret_weighted_objective_solve(tsp, starting_node=1),
+    'greedy_2_regret_variation': lambda tsp: greedy_2_regret_variation_solve(tsp, starting_node=1),
+    'greedy_2_regret_weighted_variation':
+        lambda tsp: greedy_2_regret_weighted_objective_variation_solve(tsp, starting_node=1),
+    'ls-steepest': lambda tsp: local_search_solve(tsp, local_search_type=LocalSearchType.STEEPEST, **LS_ARGUMENTS),
+    'ls-greedy': lambda tsp: local_search_solve(tsp, local_search_type=LocalSearchType.GREEDY, **LS_ARGUMENTS),
+    'ls-candidates-steepest': lambda tsp: local_search_candidate_moves_solve(
+        tsp, local_search_type=LocalSearchType.STEEPEST, **LS_ARGUMENTS),
+    'ls-deltas-steepest': lambda tsp: local_search_with_deltas_solve(
+        tsp, local_search_type=LocalSearchType.STEEPEST, **LS_ARGUMENTS),
+    'ls-deltas-greedy': lambda tsp: local_search_with_deltas_solve(
+        tsp, local_search_type=LocalSearchType.GREEDY, **LS_ARGUMENTS),
+    'ls-no-deltas-steepest': lambda tsp: local_search_no_deltas_solve(
+        tsp, local_search_type=LocalSearchType.STEEPEST, **LS_ARGUMENTS),
+}
+
+
+def measure(method_name: str, path: str, connection):
+    # runs in a fresh process - peak memory is of just this method (plus interpreter and the instance)
+    random.seed(1)
+    if method_name == TSP_CONSTRUCTION:
+        t0 = time()
+        TSP(path, use_cache=False)
+    else:
+        tsp = TSP(path)  # memory-mapped from cache, filled by measuring construction first
+        t0 = time()
+        METHODS[method_name](tsp)
+    execution_time = time() - t0
+    connection.send((execution_time, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 2**10))
+
+
+def run_measurement(method_name: str, path: str) -> tuple[float, float] | None:
+    """(time in seconds, peak memory in MiB), None if it didn't finish within time limit (or failed)"""
+    context = multiprocessing.get_context('spawn')
+    receiver, sender = context.Pipe(duplex=False)
+    process = context.Process(target=measure, args=(method_name, path, sender))
+    process.start()
+    sender.close()  # so that a crashed process is seen as closed pipe
+    try:
+        result = receiver.recv() if receiver.poll(TIME_LIMIT_SECONDS) else None
+    except EOFError:
+        result = None
+    process.terminate()
+    process.join()
+    return result
+
+
+def plot_results(results: dict, path_to_save: str):
+    import matplotlib.pyplot as plt
+
+    fig, (time_ax, memory_ax) = plt.subplots(1, 2, figsize=(18, 8))
+    for method_name, measurements in results.items():
+        sizes = [int(n) for n, measurement in measurements.items() if measurement is not None]
+        time_ax.plot(sizes, [measurements[n]['time'] for n in sizes], 'o-', label=method_name)
+        memory_ax.plot(sizes, [measurements[n]['peak_memory_mib'] for n in sizes], 'o-', label=method_name)
+    for ax, ylabel in ((time_ax, 'time [s]'), (memory_ax, 'peak memory [MiB]')):
+        ax.set_xscale('log')
+        ax.set_yscale('log')
+        ax.set_xlabel('number of nodes')
+        ax.set_ylabel(ylabel)
+        ax.grid(True)
+    time_ax.legend(fontsize=8)
+    plt.title(f'Scaling - {DISTRIBUTION.name}')
+    plt.savefig(path_to_save)
+
+
+if __name__ == '__main__':
+    os.makedirs(EXPERIMENTS_RESULTS_FOLDER, exist_ok=True)
+    results = {method_name: {} for method_name in [TSP_CONSTRUCTION, *METHODS]}
+    for n in SIZES:
+        path = generate_instance_file(n, DISTRIBUTION)
+        for method_name, measurements in results.items():
+            if measurements and list(measurements.values())[-1] is None:
+                measurements[n] = None  # too slow already for smaller instance
+                continue
+            result = run_measurement(method_name, path)
+            measurements[n] = None if result is None else {'time': result[0], 'peak_memory_mib': result[1]}
+            print(f'n: {n},\tmethod: {method_name},\t' + (
+                f'time: {result[0]:.4f}s,\tpeak_memory: {result[1]:.1f} MiB' if result else
+                f'did not finish in {TIME_LIMIT_SECONDS}s'), flush=True)
+
+        # saved after every size, so that partial results are there even if run is stopped
+        with open(f'{EXPERIMENTS_RESULTS_FOLDER}/{DISTRIBUTION.name}.json', 'w') as file:
+            json.dump(results, file, indent=4)
+    plot_results(results, f'{EXPERIMENTS_RESULTS_FOLDER}/{DISTRIBUTION.name}.png')
@@ -0,0 +1,316 @@
+from typing import Iterator, List
+import math
+
+
+class ArrayTour:
+    """
+    Cycle of nodes as a plain list plus node -> position, successor and predecessor indexes.
+    O(1) next / prev / position / edge_direction, O(n) reverse.
+
+    The sequence starts at `first` - reverse keeps that node at the start, replace / swap keep the start place
+    (replacing or swapping the first node makes the other one first).
+    number_of_nodes - all node ids (also of nodes added later by replace) are smaller.
+    """
+    def __init__(self, nodes: List[int], number_of_nodes: int):
+        self.nodes: List[int] = list(nodes)
+        # -1 for nodes not in the tour
+        self.positions: List[int] = [-1] * number_of_nodes
+        self.successors: List[int] = [-1] * number_of_nodes
+        self.predecessors: List[int] = [-1] * number_of_nodes
+        self.update_positions(0, len(self.nodes))
+
+    def __len__(self) -> int:
+        return len(self.nodes)
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(self.nodes)
+
+    def __contains__(self, node: int) -> bool:
+        return self.positions[node] != -1
+
+    def sequence(self) -> List[int]:
+        return list(self.nodes)
+
+    @property
+    def first(self) -> int:
+        return self.nodes[0]
+
+    @property
+    def last(self) -> int:
+        return self.nodes[-1]
+
+    def position(self, node: int) -> int:
+        return self.positions[node]
+
+    def next(self, node: int) -> int:
+        return self.successors[node]
+
+    def prev(self, node: int) -> int:
+        return self.predecessors[node]
+
+    def edge_direction(self, a: int, b: int) -> int:
+        # 1 if b is next of a, -1 if b is previous of a, 0 if a and b are not connected (or not in the tour)
+        if self.successors[a] == b:
+            return 1
+        if self.predecessors[a] == b:
+            return -1
+        return 0
+
+    def between(self, a: int, b: int, c: int) -> bool:
+        # if b is on the path going from a (through next) to c, ends included
+        a_position = self.positions[a]
+        return (self.positions[b] - a_position) % len(self.nodes) <= (self.positions[c] - a_position) % len(self.nodes)
+
+    def update_positions(self, start: int, end: int):
+        # after nodes[start:end] changed, also links to the nodes around them
+        for position in range(start, end):
+            self.positions[self.nodes[position]] = position
+        for position in range(start - 1, end):
+            self.link(position)
+
+    def link(self, position: int):
+        # nodes[position] -> nodes[position + 1] (going around)
+        node = self.nodes[position]
+        following_node = self.nodes[position + 1] if position + 1 < len(self.nodes) else self.nodes[0]
+        self.successors[node], self.predecessors[following_node] = following_node, node
+
+    def reverse(self, a: int, b: int):
+        # reverses the path going from a (through next) to b
+        a_position, b_position = self.positions[a], self.positions[b]
+        if 0 < a_position <= b_position:
+            self.nodes[a_position:b_position + 1] = self.nodes[b_position:a_position - 1:-1]
+            self.update_positions(a_position, b_position + 1)
+            return
+        # path goes through the first node - reversing the rest of the tour and then the whole tour (keeping
+        # the first node in place) gives the same
+        rest_end = a_position or len(self.nodes)
+        self.nodes[b_position + 1:rest_end] = self.nodes[b_position + 1:rest_end][::-1]
+        self.nodes[1:] = self.nodes[:0:-1]
+        self.update_positions(0, len(self.nodes))
+
+    def replace(self, old_node: int, new_node: int):
+        position = self.positions[old_node]
+        self.nodes[position] = new_node
+        self.positions[new_node], self.positions[old_node] = position, -1
+        self.link(position - 1)
+        self.link(position)
+        self.successors[old_node], self.predecessors[old_node] = -1, -1
+
+    def swap(self, node1: int, node2: int):
+        node1_position, node2_position = self.positions[node1], self.positions[node2]
+        self.nodes[node1_position], self.nodes[node2_position] = node2, node1
+        self.positions[node1], self.positions[node2] = node2_position, node1_position
+        for position in (node1_position - 1, node1_position, node2_position - 1, node2_position):
+            self.link(position)
+
+
+class _Segment:
+    __slots__ = ('nodes', 'reversed', 'rank', 'offset')
+
+    def __init__(self, nodes: List[int], is_reversed: bool = False):
+        self.nodes: List[int] = nodes
+        self.reversed: bool = is_reversed  # nodes are kept in the opposite order than they are in the tour
+        self.rank: int = 0  # index among segments
+        self.offset: int = 0  # number of nodes in all the previous segments
+
+
+class TwoLevelListTour:
+    """
+    Cycle of nodes as a two-level list (as the two-level doubly-linked list of LKH) - the same interface as ArrayTour.
+
+    Nodes are split into segments of about sqrt(n) nodes, each with a reversal bit, and the tour as a whole has
+    an orientation bit too. Reversing a path splits at most 2 segments and reverses the order (and bits) of the
+    segments in between, or just the nodes if it fits in one segment - O(sqrt(n)) instead of O(n).
+    next / prev / position / between / edge_direction stay O(1).
+    """
+    def __init__(self, nodes: List[int], number_of_nodes: int, segment_size: int | None = None):
+        self.segment_size: int = segment_size or max(int(math.sqrt(len(nodes))), 1)
+        self.segment_of: List[_Segment | None] = [None] * number_of_nodes
+        self.slot_of: List[int] = [-1] * number_of_nodes  # index in nodes of the segment
+        self.size: int = len(nodes)
+        self.reversed: bool = False  # tour goes through segments in the opposite direction
+        self._first: int = nodes[0]
+        self.segments: List[_Segment] = []
+        self.rebuild(nodes)
+
+    def rebuild(self, nodes: List[int]):
+        # note - splits done by reversals only add segments, so they are merged back from time to time
+        self.segments = [_Segment(nodes[start:start + self.segment_size])
+                         for start in range(0, len(nodes), self.segment_size)]
+        for segment in self.segments:
+            for slot, node in enumerate(segment.nodes):
+                self.segment_of[node], self.slot_of[node] = segment, slot
+        self.renumber_segments()
+        self.max_segments: int = 2 * len(self.segments) + 2
+
+    def renumber_segments(self):
+        offset = 0
+        for rank, segment in enumerate(self.segments):
+            segment.rank, segment.offset = rank, offset
+            offset += len(segment.nodes)
+
+    def __len__(self) -> int:
+        return self.size
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(self.sequence())
+
+    def __contains__(self, node: int) -> bool:
+        return self.segment_of[node] is not None
+
+    def underlying_sequence(self) -> List[int]:
+        # nodes in the order of segments, not taking orientation of the tour into account
+        return [node for segment in self.segments
+                for node in (segment.nodes[::-1] if segment.reversed else segment.nodes)]
+
+    def sequence(self) -> List[int]:
+        underlying_sequence = self.underlying_sequence()
+        start = self.underlying_offset(self._first)
+        if self.reversed:
+            return underlying_sequence[start::-1] + underlying_sequence[:start:-1]
+        return underlying_sequence[start:] + underlying_sequence[:start]
+
+    @property
+    def first(self) -> int:
+        return self._first
+
+    @property
+    def last(self) -> int:
+        return self.prev(self._first)
+
+    def underlying_offset(self, node: int) -> int:
+        segment = self.segment_of[node]
+        if segment.reversed:
+            return segment.offset + len(segment.nodes) - 1 - self.slot_of[node]
+        return segment.offset + self.slot_of[node]
+
+    def position(self, node: int) -> int:
+        if self.reversed:
+            return (self.underlying_offset(self._first) - self.underlying_offset(node)) % self.size
+        return (self.underlying_offset(node) - self.underlying_offset(self._first)) % self.size
+
+    def underlying_next(self, node: int) -> int:
+        segment, slot = self.segment_of[node], self.slot_of[node]
+        if segment.reversed:
+            if slot > 0:
+                return segment.nodes[slot - 1]
+        elif slot < len(segment.nodes) - 1:
+            return segment.nodes[slot + 1]
+        following_segment = self.segments[segment.rank + 1] if segment.rank + 1 < len(self.segments) \
+            else self.segments[0]
+        return following_segment.nodes[-1] if following_segment.reversed else following_segment.nodes[0]
+
+    def underlying_prev(self, node: int) -> int:
+        segment, slot = self.segment_of[node], self.slot_of[node]
+        if segment.reversed:
+            if slot < len(segment.nodes) - 1:
+                return segment.nodes[slot + 1]
+        elif slot > 0:
+            return segment.nodes[slot - 1]
+        preceding_segment = self.segments[segment.rank - 1]
+        return preceding_segment.nodes[0] if preceding_segment.reversed else preceding_segment.nodes[-1]
+
+    def next(self, node: int) -> int:
+        return self.underlying_prev(node) if self.reversed else self.underlying_next(node)
+
+    def prev(self, node: int) -> int:
+        return self.underlying_next(node) if self.reversed else self.underlying_prev(node)
+
+    def edge_direction(self, a: int, b: int) -> int:
+        # 1 if b is next of a, -1 if b is previous of a, 0 if a and b are not connected (or not in the tour)
+        if self.segment_of[a] is None:
+            return 0
+        if self.next(a) == b:
+            return 1
+        if self.prev(a) == b:
+            return -1
+        return 0
+
+    def between(self, a: int, b: int, c: int) -> bool:
+        # if b is on the path going from a (through next) to c, ends included
+        a_position = self.position(a)
+        return (self.position(b) - a_position) % self.size <= (self.position(c) - a_position) % self.size
+
+    def reverse(self, a: int, b: int):
+        # reverses the path going from a (through next) to b
+        start, end = (b, a) if self.reversed else (a, b)  # the same path, in the order of segments
+        if 2 * ((self.underlying_offset(end) - self.underlying_offset(start)) % self.size + 1) > self.size:
+            # reversing the rest of the tour and flipping orientation of the whole tour gives the same
+            if self.underlying_next(end) == start:
+                self.reversed = not self.reversed  # whole tour reversed
+                return
+            start, end = self.underlying_next(end), self.underlying_prev(start)
+            self.reversed = not self.reversed
+        self.reverse_underlying_path(start, end)
+
+    def reverse_underlying_path(self, start: int, end: int):
+        start_segment, end_segment = self.segment_of[start], self.segment_of[end]
+        if start_segment is end_segment and self.underlying_offset(start) <= self.underlying_offset(end):
+            # path inside a single segment, just its nodes are reversed
+            first_slot, last_slot = sorted((self.slot_of[start], self.slot_of[end]))
+            nodes = start_segment.nodes
+            nodes[first_slot:last_slot + 1] = nodes[first_slot:last_slot + 1][::-1]
+            for slot in range(first_slot, last_slot + 1):
+                self.slot_of[nodes[slot]] = slot
+            return
+        # path made of whole segments - reversing their order and each of them
+        self.split_before(start)
+        self.split_after(end)
+        start_rank, end_rank = self.segment_of[start].rank, self.segment_of[end].rank
+        if start_rank > end_rank:  # path goes through the end of segments list - rotated so that it doesn't
+            self.segments = self.segments[start_rank:] + self.segments[:start_rank]
+            start_rank, end_rank = 0, end_rank + len(self.segments) - start_rank
+        path_segments = self.segments[start_rank:end_rank + 1]
+        for segment in path_segments:
+            segment.reversed = not segment.reversed
+        self.segments[start_rank:end_rank + 1] = path_segments[::-1]
+        if len(self.segments) > self.max_segments:
+            self.rebuild_keeping_orientation()
+        else:
+            self.renumber_segments()
+
+    def rebuild_keeping_orientation(self):
+        # underlying sequence stays the same, just split into segments of the initial size again
+        self.rebuild(self.underlying_sequence())
+
+    def split(self, segment: _Segment, slot: int):
+        # nodes of the segment from slot on are moved to a new segment, next to it in the tour
+        moved_segment = _Segment(segment.nodes[slot:], segment.reversed)
+        del segment.nodes[slot:]
+        for moved_slot, node in enumerate(moved_segment.nodes):
+            self.segment_of[node], self.slot_of[node] = moved_segment, moved_slot
+        self.segments.insert(segment.rank if segment.reversed else segment.rank + 1, moved_segment)
+        self.renumber_segments()
+
+    def split_before(self, node: int):
+        # so that node starts its segment (in the order of segments)
+        segment, slot = self.segment_of[node], self.slot_of[node]
+        if segment.reversed and slot < len(segment.nodes) - 1:
+            self.split(segment, slot + 1)
+        elif not segment.reversed and slot > 0:
+            self.split(segment, slot)
+
+    def split_after(self, node: int):
+        # so that node ends its segment (in the order of segments)
+        segment, slot = self.segment_of[node], self.slot_of[node]
+        if segment.reversed and slot > 0:
+            self.split(segment, slot)
+        elif not segment.reversed and slot < len(segment.nodes) - 1:
+            self.split(segment, slot + 1)
+
+    def replace(self, old_node: int, new_node: int):
+        segment, slot = self.segment_of[old_node], self.slot_of[old_node]
+        segment.nodes[slot] = new_node
+        self.segment_of[new_node], self.slot_of[new_node] = segment, slot
+        self.segment_of[old_node], self.slot_of[old_node] = None, -1
+        if self._first == old_node:
+            self._first = new_node
+
+    def swap(self, node1: int, node2: int):
+        segment1, slot1 = self.segment_of[node1], self.slot_of[node1]
+        segment2, slot2 = self.segment_of[node2], self.slot_of[node2]
+        segment1.nodes[slot1], segment2.nodes[slot2] = node2, node1
+        self.segment_of[node1], self.slot_of[node1] = segment2, slot2
+        self.segment_of[node2], self.slot_of[node2] = segment1, slot1
+        if self._first in (node1, node2):
+            self._first = node2 if self._first == node1 else node1
@@ -28,7 +28,7 @@ if __name__ == '__main__':
                 'max_additional_cost': max_additional_cost,
                 'min_additional_cost': min_additional_cost,
                 'avg_additional_cost': avg_additional_cost,
-            }, json_file, indent=4, default=lambda x: int(x) if isinstance(x, numpy.int64) else x)
+            }, json_file, indent=4, default=lambda x: int(x) if isinstance(x, numpy.integer) else x)
 
         # histogram of additional costs
         plt.figure(figsize=(10, 6))
@@ -58,7 +58,7 @@ if __name__ == '__main__':
         plt.savefig(f'{EXPERIMENTS_RESULTS_FOLDER}/{problem_name}/total-move-costs-heatmap.png')
 
         # mean along 3rd dimension of insertion costs
-        mean_insertion_costs = numpy.mean(tsp.insertion_costs, axis=-1)
+        mean_insertion_costs = numpy.mean(tsp.insertion_costs.to_dense(), axis=-1)
 
         # Plot and save heatmap of the mean insertion costs
         plt.figure(figsize=(10, 8))